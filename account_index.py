@@ -0,0 +1,113 @@
+"""Account → row-offset index for pulling up an account's transactions.
+
+    python account_index.py history.csv C1231006815 [--direction sent|received|both]
+
+For each side (``nameOrig`` sends, ``nameDest`` receives) the 64-bit account
+hashes (``velocity.account_keys``) are sorted once together with their row
+offsets, so an account's rows are one binary search away instead of a scan
+over the name column. The index for a cached dataset is saved as
+``<key>.accounts.npy`` next to its Arrow files (see dataset_cache.py) and
+memory-mapped on later opens. Rows are checked against the actual names, so
+a hash collision can never return another account's transactions.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import CACHE_DIR
+from velocity import account_key, account_keys
+
+DIRECTIONS = {"sent": "nameOrig", "received": "nameDest"}
+
+
+class AccountIndex:
+    """Sorted (hash, row) pairs per direction over one dataset."""
+
+    def __init__(self, table):
+        # rows: orig hashes, orig row offsets, dest hashes, dest row offsets
+        self.table = table
+        t = np.asarray(table)   # plain views; searchsorted on a memmap subclass is slower
+        self._sides = {"sent": (t[0], t[1]), "received": (t[2], t[3])}
+
+    @classmethod
+    def build(cls, df):
+        table = np.empty((4, len(df)), dtype=np.uint64)
+        for i, col in enumerate(DIRECTIONS.values()):
+            keys = account_keys(df[col])
+            order = np.argsort(keys, kind="stable")
+            table[2 * i] = keys[order]
+            table[2 * i + 1] = order
+        return cls(table)
+
+    def save(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp, self.table)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls(np.load(path, mmap_mode="r"))
+
+    def rows(self, account, direction="both"):
+        """Ascending row offsets whose account hash matches ``account``."""
+        key = account_key(account)
+        sides = list(DIRECTIONS) if direction == "both" else [direction]
+        found = []
+        for side in sides:
+            keys, rows = self._sides[side]
+            lo, hi = np.searchsorted(keys, key, "left"), np.searchsorted(keys, key, "right")
+            found.append(np.asarray(rows[lo:hi], dtype=np.int64))
+        return np.unique(np.concatenate(found))
+
+    def lookup(self, df, account, direction="both"):
+        """``df``'s transactions for ``account``, with a ``direction`` column."""
+        rows = self.rows(account, direction)
+        sent = df["nameOrig"].array.take(rows).to_numpy() == account
+        received = df["nameDest"].array.take(rows).to_numpy() == account
+        keep = {"sent": sent, "received": received}.get(direction, sent | received)
+        hits = df.take(rows[keep])
+        hits.insert(len(hits.columns), "direction", np.where(sent[keep], "sent", "received"))
+        return hits
+
+
+def load_index(key, df, cache_dir=CACHE_DIR):
+    """The ``AccountIndex`` for cached dataset ``key``; built from ``df`` on first use."""
+    path = os.path.join(cache_dir, f"{key}.accounts.npy")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        AccountIndex.build(df).save(path)
+    return AccountIndex.load(path)
+
+
+def main(argv=None):
+    from dataset_cache import load_dataset
+
+    parser = argparse.ArgumentParser(description="Look up one account's transactions")
+    parser.add_argument("source", help="PaySim-format CSV")
+    parser.add_argument("account", help="nameOrig / nameDest id")
+    parser.add_argument("--direction", choices=["both", *DIRECTIONS], default="both")
+    args = parser.parse_args(argv)
+
+    key, df = load_dataset(args.source)
+    t0 = time.perf_counter()
+    index = load_index(key, df)
+    t_index = time.perf_counter() - t0
+
+    t0 = time.perf_counter_ns()
+    hits = index.lookup(df, args.account, args.direction)
+    lookup_us = (time.perf_counter_ns() - t0) / 1e3
+    t0 = time.perf_counter_ns()
+    scan = df[(df["nameOrig"] == args.account) | (df["nameDest"] == args.account)]
+    scan_us = (time.perf_counter_ns() - t0) / 1e3
+
+    with pd.option_context("display.width", 160, "display.max_columns", None):
+        print(hits.to_string() if len(hits) else f"no transactions for {args.account}")
+    print(f"\n{len(hits):,} transaction(s) — index open {t_index * 1e3:.1f} ms, "
+          f"lookup {lookup_us:,.0f} µs (full scan {scan_us:,.0f} µs, {len(scan):,} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Pre-aggregated cube behind the Analytics page.
+
+``build_cube`` makes one vectorized pass over a dataset and keeps, for every
+``type`` × ``isFraud`` × ``step`` bucket cell:
+
+- the row count and the sum of each ``VALUE_COLS`` column,
+- a ``HIST_BINS``-bin histogram per column over the column's full range.
+
+Per class it also keeps each column's Tukey box (``box_stats``): exact
+quartiles, 1.5 IQR whiskers and at most ``MAX_OUTLIERS`` outlier points.
+
+``density_sample`` thins the balance scatter plots the same way, keeping
+every fraud row.
+
+Charts then sum a few hundred cells instead of touching the rows, so they
+render in milliseconds whatever the dataset size, and Plotly is handed bin
+counts and box statistics rather than every value of a column.
+"""
+import numpy as np
+import pandas as pd
+
+VALUE_COLS = ["amount", "oldbalanceOrg", "newbalanceOrig", "oldbalanceDest", "newbalanceDest"]
+
+STEP_BUCKET  = 24      # steps per bucket (PaySim steps are hours)
+HIST_BINS    = 60
+MAX_OUTLIERS = 500     # outlier points kept per box; the extremes are always kept
+
+
+def box_stats(x, max_outliers=MAX_OUTLIERS, seed=42):
+    """Plotly's default box for ``x``: linear quartiles, 1.5 IQR whiskers, outliers.
+
+    Returns None for empty input. At most ``max_outliers`` outliers are kept
+    (the minimum, the maximum and a random sample of the rest);
+    ``n_outliers`` is the full count.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if not len(x):
+        return None
+    q1, median, q3 = np.percentile(x, [25, 50, 75])
+    lo, hi = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    outside = (x < lo) | (x > hi)
+    inside = x[~outside]
+    out = x[outside]
+    n_out = len(out)
+    if n_out > max_outliers:
+        keep = np.random.default_rng(seed).choice(n_out, max_outliers - 2, replace=False)
+        out = np.r_[out.min(), out.max(), out[keep]]
+    return {"q1": q1, "median": median, "q3": q3,
+            "lowerfence": inside.min(), "upperfence": inside.max(),
+            "outliers": out, "n_outliers": n_out, "count": len(x)}
+
+
+class AnalyticsCube:
+    """Counts, sums and histograms per ``type`` × ``isFraud`` × step bucket."""
+
+    def __init__(self, types, n_buckets, step_bucket, count, sums, hist_edges, hists, boxes):
+        self.types       = list(types)
+        self.n_buckets   = n_buckets
+        self.step_bucket = step_bucket
+        self.count       = count        # (cells,)
+        self.sums        = sums         # {col: (cells,)}
+        self.hist_edges  = hist_edges   # {col: (bins + 1,)}
+        self.hists       = hists        # {col: (cells, bins)}
+        self.boxes       = boxes        # {(col, isFraud): box_stats}
+        cells = np.arange(len(count))
+        self._type  = cells // (2 * n_buckets)
+        self._fraud = cells // n_buckets % 2
+        self._step  = cells % n_buckets
+
+    def _mask(self, types=None, is_fraud=None, step_buckets=None):
+        m = np.ones(len(self.count), dtype=bool)
+        if types is not None:
+            m &= np.isin(self._type, [self.types.index(t) for t in types])
+        if is_fraud is not None:
+            m &= self._fraud == int(is_fraud)
+        if step_buckets is not None:
+            m &= np.isin(self._step, step_buckets)
+        return m
+
+    def by_type(self):
+        """Transactions, fraud cases and fraud rate (%) per type."""
+        count = np.bincount(self._type, self.count, len(self.types))
+        fraud = np.bincount(self._type, self.count * self._fraud, len(self.types))
+        return pd.DataFrame({"count": count.astype(np.int64), "fraud": fraud.astype(np.int64),
+                             "fraud_rate": np.divide(fraud * 100, count, out=np.zeros(len(self.types)),
+                                                     where=count > 0)},
+                            index=pd.Index(self.types, name="type"))
+
+    def by_step(self):
+        """Transactions, fraud cases and fraud amount per step bucket."""
+        n = self.n_buckets
+        fraud = self._fraud == 1
+        return pd.DataFrame({
+            "step":         np.arange(n) * self.step_bucket,
+            "count":        np.bincount(self._step, self.count, n).astype(np.int64),
+            "fraud":        np.bincount(self._step[fraud], self.count[fraud], n).astype(np.int64),
+            "fraud_amount": np.bincount(self._step[fraud], self.sums["amount"][fraud], n),
+        })
+
+    def histogram(self, col, **where):
+        """``(edges, counts)`` of ``col`` over the selected cells."""
+        return self.hist_edges[col], self.hists[col][self._mask(**where)].sum(axis=0)
+
+    def box(self, col, is_fraud):
+        """``box_stats`` of ``col`` for one class (None if the class is absent)."""
+        return self.boxes[(col, int(is_fraud))]
+
+
+def density_sample(df, x, y, label="isFraud", grid=200, max_minority=50_000):
+    """Scatter points for ``x`` vs ``y`` that keep every minority-class row.
+
+    Majority rows are binned on a ``grid`` × ``grid`` raster over the data
+    range and each occupied cell is drawn once (its first row), so dense
+    regions shrink to one point per pixel-sized cell while sparse ones keep
+    their points. Minority rows are all kept unless there are more than
+    ``max_minority``; then they are thinned the same way on a 4× finer grid.
+    Returns ``x``, ``y``, ``label`` and ``rows`` (rows each point stands for),
+    majority points first so the minority is drawn on top.
+    """
+    xs = df[x].to_numpy(dtype=np.float64)
+    ys = df[y].to_numpy(dtype=np.float64)
+    labels = df[label].to_numpy()
+    minority = labels == 1
+
+    def thin(idx, n):
+        cells = np.zeros(len(idx), dtype=np.int64)
+        for v in (xs[idx], ys[idx]):
+            lo, hi = (v.min(), v.max()) if len(v) else (0.0, 0.0)
+            cells = cells * n + np.clip(((v - lo) / (hi - lo or 1) * n).astype(np.int64), 0, n - 1)
+        _, first, rows = np.unique(cells, return_index=True, return_counts=True)
+        return idx[first], rows
+
+    major, major_rows = thin(np.flatnonzero(~minority), grid)
+    minor = np.flatnonzero(minority)
+    if len(minor) > max_minority:
+        minor, minor_rows = thin(minor, grid * 4)
+    else:
+        minor_rows = np.ones(len(minor), dtype=np.int64)
+    keep = np.r_[major, minor]
+    return pd.DataFrame({x: xs[keep], y: ys[keep], label: labels[keep],
+                         "rows": np.r_[major_rows, minor_rows]})
+
+
+def build_cube(df, step_bucket=STEP_BUCKET, bins=HIST_BINS):
+    """Aggregate ``df`` (PaySim columns) into an ``AnalyticsCube``."""
+    type_codes, types = pd.factorize(df["type"], sort=True)
+    fraud = df["isFraud"].to_numpy(dtype=np.int64)
+    step = df["step"].to_numpy(dtype=np.int64)
+    n_buckets = int(step.max()) // step_bucket + 1 if len(step) else 1
+    cell = (type_codes * 2 + fraud) * n_buckets + step // step_bucket
+    n_cells = len(types) * 2 * n_buckets
+
+    count = np.bincount(cell, minlength=n_cells).astype(np.int64)
+    sums, edges, hists, boxes = {}, {}, {}, {}
+    for col in VALUE_COLS:
+        x = df[col].to_numpy(dtype=np.float64)
+        sums[col] = np.bincount(cell, x, n_cells)
+        lo, hi = (float(x.min()), float(x.max())) if len(x) else (0.0, 1.0)
+        edges[col] = np.linspace(lo, hi if hi > lo else lo + 1, bins + 1)
+        b = np.clip(((x - lo) / (edges[col][-1] - lo) * bins).astype(np.int64), 0, bins - 1)
+        hists[col] = np.bincount(cell * bins + b, minlength=n_cells * bins
+                                 ).reshape(n_cells, bins).astype(np.int64)
+        for f in (0, 1):
+            boxes[(col, f)] = box_stats(x[fraud == f])
+    return AnalyticsCube(types, n_buckets, step_bucket, count, sums, edges, hists, boxes)
@@ -0,0 +1,242 @@
+"""Reproducible model-comparison benchmark (the notebook's evaluate_model, headless).
+
+    python benchmark.py                                  # base CSV, every candidate
+    python benchmark.py --rows 1000000 10000000 --models XGBoost "Random Forest"
+
+Each candidate from the notebook is trained on ``Fraud_Analysis_Dataset.csv``
+and on synthetic PaySim-like datasets of ``--rows`` rows: base rows resampled
+with one ±10% factor per row applied to all money columns, which keeps the
+balance identities the ``errorBalance*`` features rely on. The base rows are
+split into train and test before resampling, so no test row has
+near-duplicates in training.
+Every (dataset, model) run happens in a fresh process so its peak RSS is its
+own. Alongside the usual accuracy metrics the report records fit time,
+rows/sec scored at batch sizes 1 / 100 / 10k, serialized model size and
+peak RSS, and is written as JSON and Markdown to ``--out``.
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import pickle
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+BASE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Fraud_Analysis_Dataset.csv")
+
+BATCH_SIZES = [1, 100, 10_000]
+# Rows scored per batch size, enough for a stable rate without dominating the run
+_SCORE_ROWS = {1: 2_000, 100: 50_000, 10_000: 500_000}
+
+_MONEY_COLS = ["amount", "oldbalanceOrg", "newbalanceOrig", "oldbalanceDest", "newbalanceDest"]
+
+
+def candidates():
+    """Notebook models by name, as zero-argument factories (LightGBM only if installed)."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.tree import DecisionTreeClassifier
+    from xgboost import XGBClassifier
+
+    models = {
+        "XGBoost": lambda: XGBClassifier(
+            n_estimators=200, max_depth=8, learning_rate=0.1, subsample=0.8,
+            colsample_bytree=0.8, gamma=1, reg_alpha=0.1, reg_lambda=1,
+            random_state=42, n_jobs=-1, eval_metric="logloss"),
+        "Random Forest": lambda: RandomForestClassifier(
+            n_estimators=200, max_depth=20, min_samples_split=5, min_samples_leaf=2,
+            max_features="sqrt", random_state=42, n_jobs=-1, class_weight="balanced"),
+        "Decision Tree": lambda: DecisionTreeClassifier(
+            max_depth=10, min_samples_split=10, min_samples_leaf=5, max_features="sqrt",
+            class_weight="balanced", random_state=42),
+        # Scaled so lbfgs converges on raw balances
+        "Logistic Regression": lambda: make_pipeline(StandardScaler(), LogisticRegression(
+            C=1.0, max_iter=1000, class_weight="balanced", random_state=42)),
+    }
+    try:
+        from lightgbm import LGBMClassifier
+    except ImportError:
+        pass
+    else:
+        models["LightGBM"] = lambda: LGBMClassifier(n_estimators=200, random_state=42,
+                                                    n_jobs=-1, verbose=-1)
+    return models
+
+
+def resample_paysim(base, n_rows, seed=42):
+    """``n_rows`` rows drawn from ``base``, each scaled by one ±10% money factor.
+
+    Scaling all money columns of a row together keeps ``old - amount = new``
+    style relations (and zero balances) intact.
+    """
+    rng = np.random.default_rng(seed)
+    df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+    factor = rng.uniform(0.9, 1.1, n_rows)
+    for col in _MONEY_COLS:
+        df[col] = (df[col].to_numpy(dtype=np.float64) * factor).astype(np.float32)
+    return df
+
+
+def synthetic_paysim(n_rows, base_csv=BASE_CSV, seed=42):
+    """``n_rows`` PaySim-format rows resampled from ``base_csv`` (see ``resample_paysim``)."""
+    from ingest import read_csv_chunks
+
+    return resample_paysim(pd.concat(read_csv_chunks(base_csv), ignore_index=True), n_rows, seed)
+
+
+def load_benchmark_data(rows, base_csv=BASE_CSV, test_size=0.2):
+    """``(X_train, y_train, X_test, y_test)`` for the base CSV (``rows=None``) or a
+    synthetic set of ``rows`` rows.
+
+    The base rows are split first and a synthetic set resamples each side
+    on its own, so resampled copies never leak across the split.
+    """
+    from features import FEATURE_COLS, feature_matrix, paysim_encoder
+    from ingest import read_csv_chunks
+    from training import split
+
+    base = pd.concat(read_csv_chunks(base_csv), ignore_index=True)
+    train, test = split(base, base["isFraud"], test_size)[:2]
+    if rows is not None:
+        n_test = round(rows * test_size)
+        train = resample_paysim(train, rows - n_test, seed=42)
+        test = resample_paysim(test, n_test, seed=43)
+
+    def xy(df):
+        X = pd.DataFrame(feature_matrix(df, paysim_encoder()), columns=FEATURE_COLS, copy=False)
+        return X, df["isFraud"].astype(np.int8).reset_index(drop=True)
+
+    return (*xy(train), *xy(test))
+
+
+def model_bytes(model):
+    """Serialized size: UBJSON for XGBoost, pickle for everything else."""
+    if hasattr(model, "get_booster"):
+        return len(model.get_booster().save_raw("ubj"))
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def scoring_rates(model, X, batch_sizes=BATCH_SIZES):
+    """Rows/sec of ``predict_proba`` at each batch size over (a cycle of) ``X``.
+
+    ``X`` is tiled when it has fewer rows than a batch, so every batch
+    really has ``b`` rows.
+    """
+    rates = {}
+    for b in batch_sizes:
+        pool = X if len(X) >= b else X.iloc[np.resize(np.arange(len(X)), b)]
+        n_batches = max(1, min(_SCORE_ROWS[b], len(pool)) // b)
+        starts = [(i * b) % (len(pool) - b + 1) for i in range(n_batches)]
+        t0 = time.perf_counter()
+        for s in starts:
+            model.predict_proba(pool.iloc[s:s + b])
+        rates[b] = n_batches * b / (time.perf_counter() - t0)
+    return rates
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_trial(name, rows, rebalance_mode="SMOTE", ratio=0.5, base_csv=BASE_CSV):
+    """Train and measure one candidate; meant to run in its own process."""
+    from rebalance import rebalance
+    from training import score_metrics
+
+    X_train, y_train, X_test, y_test = load_benchmark_data(rows, base_csv)
+    X_bal, y_bal, weights, balance = rebalance(X_train, y_train, rebalance_mode, ratio)
+    rss_before_fit = _peak_rss_mb()
+
+    model = candidates()[name]()
+    t0 = time.perf_counter()
+    if weights is None:
+        model.fit(X_bal, y_bal)
+    else:
+        fit_key = "logisticregression__sample_weight" if hasattr(model, "steps") else "sample_weight"
+        model.fit(X_bal, y_bal, **{fit_key: weights})
+    fit_seconds = time.perf_counter() - t0
+
+    y_prob = model.predict_proba(X_test)[:, 1]
+    return {
+        "model":          name,
+        "dataset":        "Fraud_Analysis_Dataset.csv" if rows is None else f"synthetic {rows:,}",
+        "rows":           len(X_train) + len(X_test),
+        "train_rows":     balance["rows_out"],
+        "rebalance":      rebalance_mode,
+        **score_metrics(y_test, y_prob),
+        "fit_seconds":    fit_seconds,
+        "rows_per_sec":   {str(b): r for b, r in scoring_rates(model, X_test).items()},
+        "model_bytes":    model_bytes(model),
+        "peak_rss_mb":    _peak_rss_mb(),
+        "rss_before_fit_mb": rss_before_fit,
+    }
+
+
+def run_benchmark(models, row_counts, rebalance_mode="SMOTE", ratio=0.5, on_result=None):
+    """Run every model on every dataset, one process per run; returns result dicts."""
+    results = []
+    for rows in row_counts:
+        for name in models:
+            with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as pool:
+                result = pool.submit(run_trial, name, rows, rebalance_mode, ratio).result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+def to_markdown(results):
+    head = ["Model", "Dataset", "F1", "ROC-AUC", "Avg Prec", "Fit s",
+            *[f"rows/s @{b:,}" for b in BATCH_SIZES], "Size KB", "Peak RSS MB"]
+    lines = ["| " + " | ".join(head) + " |", "|" + "---|" * len(head)]
+    for r in results:
+        cells = [r["model"], r["dataset"], f"{r['F1-Score']:.4f}", f"{r['ROC-AUC']:.4f}",
+                 f"{r['Average Precision']:.4f}", f"{r['fit_seconds']:.2f}",
+                 *[f"{r['rows_per_sec'][str(b)]:,.0f}" for b in BATCH_SIZES],
+                 f"{r['model_bytes'] / 1024:,.0f}", f"{r['peak_rss_mb']:,.0f}"]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark candidate fraud models")
+    parser.add_argument("--models", nargs="+", help="default: every available candidate")
+    parser.add_argument("--rows", nargs="*", type=int, default=[],
+                        help="synthetic dataset sizes to add, e.g. 1000000 10000000")
+    parser.add_argument("--skip-base", action="store_true", help="don't run on the base CSV")
+    parser.add_argument("--rebalance", default="SMOTE",
+                        help="rebalancing mode (see rebalance.REBALANCE_MODES)")
+    parser.add_argument("--ratio", type=float, default=0.5)
+    parser.add_argument("--out", default="benchmark_report",
+                        help="writes <out>.json and <out>.md")
+    args = parser.parse_args(argv)
+
+    available = candidates()
+    models = args.models or list(available)
+    unknown = set(models) - set(available)
+    if unknown:
+        parser.error(f"unknown model(s): {', '.join(sorted(unknown))}")
+    row_counts = ([] if args.skip_base else [None]) + args.rows
+
+    def progress(r):
+        print(f"{r['model']:<20} {r['dataset']:<28} F1 {r['F1-Score']:.4f}  "
+              f"fit {r['fit_seconds']:.2f}s  peak RSS {r['peak_rss_mb']:.0f} MB", flush=True)
+
+    results = run_benchmark(models, row_counts, args.rebalance, args.ratio, progress)
+    report = {"created": time.time(), "cpu_count": os.cpu_count(),
+              "rebalance": args.rebalance, "ratio": args.ratio, "results": results}
+    with open(args.out + ".json", "w") as f:
+        json.dump(report, f, indent=2)
+    with open(args.out + ".md", "w") as f:
+        f.write(to_markdown(results))
+    print(f"wrote {args.out}.json and {args.out}.md")
+
+
+if __name__ == "__main__":
+    main()
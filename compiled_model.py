@@ -0,0 +1,257 @@
+"""Compact NumPy-only inference artifact for registered XGBoost models.
+
+    python compiled_model.py export [--model MODEL_ID]
+    python compiled_model.py bench  [--model MODEL_ID] [-n 5000]
+
+``export`` flattens the booster's trees into a handful of arrays (split
+feature, threshold, child indices, default direction, leaf value) and saves
+them as the model's ``compiled.npz`` registry artifact. ``CompiledModel``
+evaluates every tree at once with vectorized index walks, so scoring only
+needs NumPy: neither xgboost nor scikit-learn is imported on this path.
+
+It is meant for cold start and single transactions (``scoring_service.py
+--compiled``, small ``--max-batch``): a fresh process loads it in a fraction
+of the xgboost stack's import time and a single row scores faster than
+through the booster. Large batches are much slower than XGBoost's native
+predictor, so batch scoring should keep using ``batch_score.py``.
+
+``bench`` compares cold import + load time and single-row / batch latency
+against the ``XGBClassifier`` and raw-booster paths.
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import model_registry
+from features import FEATURE_COLS, records_matrix
+
+ARTIFACT = "compiled"
+
+_BATCH_ROWS = 8192   # rows walked at once; bounds the (rows × trees) index matrix
+
+
+def _base_margin(learner):
+    base = float(learner["learner_model_param"]["base_score"].strip("[]"))
+    if learner["objective"]["name"] != "binary:logistic":
+        raise ValueError(f"unsupported objective {learner['objective']['name']!r}")
+    return math.log(base / (1 - base))
+
+
+def compile_booster(booster):
+    """Flatten a binary:logistic ``Booster`` into the arrays ``CompiledModel`` walks."""
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    trees = learner["gradient_booster"]["model"]["trees"]
+    sizes = [len(t["left_children"]) for t in trees]
+    offsets = np.r_[0, np.cumsum(sizes)[:-1]].astype(np.int32)
+
+    left, right, feature, threshold, value, default_left = [], [], [], [], [], []
+    depth = 0
+    for t, off in zip(trees, offsets):
+        lc = np.asarray(t["left_children"], dtype=np.int32)
+        rc = np.asarray(t["right_children"], dtype=np.int32)
+        cond = np.asarray(t["split_conditions"], dtype=np.float32)
+        leaf = lc == -1
+        own = np.arange(len(lc), dtype=np.int32)
+        # leaves point at themselves, so extra walk steps are no-ops
+        left.append(np.where(leaf, own, lc) + off)
+        right.append(np.where(leaf, own, rc) + off)
+        feature.append(np.where(leaf, 0, t["split_indices"]).astype(np.int16))
+        threshold.append(np.where(leaf, np.inf, cond).astype(np.float32))
+        value.append(np.where(leaf, cond, 0).astype(np.float32))
+        default_left.append(np.asarray(t["default_left"], dtype=bool))
+        depth = max(depth, _tree_depth(lc, rc))
+
+    return {
+        # children[2 * node] is the left child, children[2 * node + 1] the right
+        "children":     np.column_stack([np.concatenate(left), np.concatenate(right)]).ravel(),
+        "feature":      np.concatenate(feature),
+        "threshold":    np.concatenate(threshold),
+        "value":        np.concatenate(value),
+        "default_left": np.concatenate(default_left),
+        "roots":        offsets,
+        "max_depth":    np.int32(depth),
+        "base_margin":  np.float64(_base_margin(learner)),
+    }
+
+
+def _tree_depth(lc, rc):
+    depth, level = 0, [0]
+    while True:
+        level = [c for n in level for c in (lc[n], rc[n]) if c != -1]
+        if not level:
+            return depth
+        depth += 1
+
+
+class _TypeCodes:
+    """The slice of LabelEncoder the feature builders use, without scikit-learn."""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+        self._codes = {t: i for i, t in enumerate(self.classes_)}
+
+    def transform(self, types):
+        try:
+            return np.fromiter((self._codes[t] for t in types), np.int64, len(types))
+        except KeyError as e:
+            raise ValueError(f"unknown transaction type {e.args[0]!r}") from None
+
+
+class CompiledModel:
+    """Scores ``FEATURE_COLS`` matrices from the exported tree arrays."""
+
+    def __init__(self, arrays, type_classes):
+        for name in ("children", "feature", "threshold", "value", "default_left", "roots"):
+            setattr(self, name, arrays[name])
+        self.max_depth   = int(arrays["max_depth"])
+        self.base_margin = float(arrays["base_margin"])
+        self.le = _TypeCodes(type_classes)
+
+    def predict_margin(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        n_features = X.shape[1]
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), _BATCH_ROWS):
+            xb = X[start:start + _BATCH_ROWS]
+            flat, has_nan = xb.ravel(), np.isnan(xb).any()
+            row_base = (np.arange(len(xb), dtype=np.int64) * n_features)[:, None]
+            node = np.broadcast_to(self.roots.astype(np.int64), (len(xb), len(self.roots)))
+            for _ in range(self.max_depth):
+                x = flat[row_base + self.feature[node]]
+                # NaN compares False, so it goes right only when the default is right
+                go_right = x >= self.threshold[node]
+                if has_nan:
+                    go_right |= np.isnan(x) & ~self.default_left[node]
+                node = self.children[2 * node + go_right]
+            out[start:start + len(xb)] = self.value[node].sum(axis=1, dtype=np.float64)
+        return out + self.base_margin
+
+    def inplace_predict(self, X):
+        """Fraud probabilities, like ``Booster.inplace_predict``."""
+        return 1.0 / (1.0 + np.exp(-self.predict_margin(X)))
+
+    def predict_proba(self, X):
+        """Two-column probabilities, like ``XGBClassifier.predict_proba``."""
+        p = self.inplace_predict(X)
+        return np.column_stack([1 - p, p])
+
+    def score_records(self, records):
+        """Fraud probabilities for raw transaction dicts (same fields as the API)."""
+        return self.inplace_predict(records_matrix(records, self.le))
+
+
+def export_model(model_id=None, registry_dir=model_registry.REGISTRY_DIR):
+    """Compile a registered model and store it as its ``compiled`` artifact."""
+    model, _, meta = model_registry.load_model(model_id, registry_dir=registry_dir)
+    arrays = compile_booster(model.get_booster())
+    arrays["type_classes"] = np.asarray(meta["type_classes"])
+    path = model_registry.save_artifact(meta["model_id"], ARTIFACT, arrays, registry_dir)
+    return meta["model_id"], path
+
+
+def load_compiled(model_id=None, registry_dir=model_registry.REGISTRY_DIR):
+    """Return ``(CompiledModel, meta)``; raises FileNotFoundError if not exported."""
+    model_id = model_registry.resolve_model_id(model_id, registry_dir=registry_dir)
+    meta = model_registry.load_meta(model_id, registry_dir)
+    if meta["feature_cols"] != FEATURE_COLS:
+        raise ValueError(f"model {model_id} was trained on different features")
+    arrays = model_registry.load_artifact(model_id, ARTIFACT, registry_dir)
+    if arrays is None:
+        raise FileNotFoundError(f"model {model_id} has no compiled artifact; "
+                                f"run: python compiled_model.py export --model {model_id}")
+    return CompiledModel(arrays, arrays["type_classes"].tolist()), meta
+
+
+# ─── Benchmark ────────────────────────────────────────────────────────────────
+
+_COLD_START = {
+    "xgboost stack":  "import model_registry as r; r.load_model({id!r})",
+    "compiled":       "import compiled_model as c; c.load_compiled({id!r})",
+}
+
+
+def _cold_start_seconds(code, runs=3):
+    """Best-of-``runs`` wall time for a fresh interpreter to run ``code``."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    timer = f"import time; t = time.perf_counter(); {code}; print(time.perf_counter() - t)"
+    return min(float(subprocess.run([sys.executable, "-c", timer], cwd=here, check=True,
+                                    capture_output=True, text=True).stdout)
+               for _ in range(runs))
+
+
+def _latency_us(fn, rows):
+    lat = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        t0 = time.perf_counter_ns()
+        fn(row)
+        lat[i] = (time.perf_counter_ns() - t0) / 1e3
+    return np.percentile(lat, 50), np.percentile(lat, 99)
+
+
+def benchmark(model_id=None, n=5000, batch_sizes=(16, 256, 100_000)):
+    from features import feature_matrix
+    from benchmark import synthetic_paysim
+
+    compiled, meta = load_compiled(model_id)
+    model, le, _ = model_registry.load_model(meta["model_id"])
+    booster = model.get_booster()
+    batch_rows = max(batch_sizes)
+    X = feature_matrix(synthetic_paysim(max(n, batch_rows)), le)
+
+    p_xgb, p_cmp = booster.inplace_predict(X[:batch_rows]), compiled.inplace_predict(X[:batch_rows])
+    print(f"model {meta['model_id']}: {len(compiled.roots)} trees, depth ≤ {compiled.max_depth}, "
+          f"max |Δp| vs xgboost {np.abs(p_xgb - p_cmp).max():.2e}")
+    model_dir = os.path.join(model_registry.REGISTRY_DIR, meta["model_id"])
+    for name in ("model.ubj", f"{ARTIFACT}.npz"):
+        print(f"  {name:<14}{os.path.getsize(os.path.join(model_dir, name)) / 1024:>10.0f} KB")
+
+    print(f"\n{'cold import + load':<28}{'seconds':>10}")
+    for name, code in _COLD_START.items():
+        print(f"{name:<28}{_cold_start_seconds(code.format(id=meta['model_id'])):>10.3f}")
+
+    rows = [X[i:i + 1] for i in range(n)]
+    paths = {
+        "XGBClassifier.predict_proba": lambda r: model.predict_proba(r),
+        "Booster.inplace_predict":     lambda r: booster.inplace_predict(r),
+        "CompiledModel":               lambda r: compiled.inplace_predict(r),
+    }
+    print(f"\n{'single row (µs)':<28}{'p50':>10}{'p99':>10}")
+    for name, fn in paths.items():
+        p50, p99 = _latency_us(fn, rows)
+        print(f"{name:<28}{p50:>10.1f}{p99:>10.1f}")
+
+    print(f"\n{'rows/s at batch size':<28}" + "".join(f"{b:>12,}" for b in batch_sizes))
+    for name, fn in paths.items():
+        rates = []
+        for b in batch_sizes:
+            reps = max(1, 20_000 // b)
+            t0 = time.perf_counter()
+            for i in range(reps):
+                fn(X[(i * b) % (len(X) - b + 1):][:b])
+            rates.append(reps * b / (time.perf_counter() - t0))
+        print(f"{name:<28}" + "".join(f"{r:>12,.0f}" for r in rates))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export / benchmark the NumPy-only model artifact")
+    parser.add_argument("command", choices=["export", "bench"])
+    parser.add_argument("--model", help="registry model id (default: pinned/newest)")
+    parser.add_argument("-n", type=int, default=5000, help="single-row calls in the benchmark")
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        model_id, path = export_model(args.model)
+        print(f"model {model_id} → {path}")
+    else:
+        benchmark(args.model, args.n)
+
+
+if __name__ == "__main__":
+    main()
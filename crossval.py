@@ -0,0 +1,121 @@
+"""Parallel stratified k-fold cross-validation for the Model Training page.
+
+The feature matrix and labels are copied once into POSIX shared memory;
+each worker process attaches to them read-only in the pool initializer
+instead of receiving a pickled copy per fold. Workers rebuild the same
+``StratifiedKFold`` split from the shared labels, so a task is just a fold
+number. Rebalancing (SMOTE or any ``rebalance`` mode) happens inside each
+fold, on that fold's training rows only, so no synthetic row is built from
+a validation sample.
+"""
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import StratifiedKFold
+
+from features import FEATURE_COLS
+from hpsearch import threads_per_trial
+from rebalance import rebalance
+from training import make_model, score_metrics
+
+_SHARED = None
+
+
+def _to_shared(arrays):
+    """Copy ``{name: array}`` into one shared block; returns (shm, layout)."""
+    layout, offset = {}, 0
+    for name, a in arrays.items():
+        offset = -(-offset // 64) * 64   # 64-byte align each array
+        layout[name] = (offset, a.shape, a.dtype.str)
+        offset += a.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, a in arrays.items():
+        start, shape, dtype = layout[name]
+        np.ndarray(shape, dtype, buffer=shm.buf, offset=start)[...] = a
+    return shm, layout
+
+
+def _attach(shm_name, layout):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    views = {}
+    for name, (start, shape, dtype) in layout.items():
+        v = np.ndarray(shape, dtype, buffer=shm.buf, offset=start)
+        v.flags.writeable = False
+        views[name] = v
+    return shm, views
+
+
+def _init_worker(shm_name, layout):
+    global _SHARED
+    _SHARED = _attach(shm_name, layout)   # keep the handle alive with the views
+
+
+def _folds(y, k, seed):
+    skf = StratifiedKFold(n_splits=k, shuffle=True, random_state=seed)
+    return list(skf.split(np.zeros(len(y)), y))
+
+
+def _run_fold(fold, k, params, balance_mode, ratio, n_jobs, seed=42):
+    X, y = _SHARED[1]["X"], _SHARED[1]["y"]
+    return run_fold(X, y, fold, k, params, balance_mode, ratio, n_jobs, seed)
+
+
+def run_fold(X, y, fold, k, params, balance_mode, ratio, n_jobs, seed=42):
+    """Rebalance, fit and score one fold; returns a metrics row."""
+    t0 = time.perf_counter()
+    train_idx, val_idx = _folds(y, k, seed)[fold]
+    X_tr = pd.DataFrame(X[train_idx], columns=FEATURE_COLS, copy=False)
+    y_tr = pd.Series(y[train_idx], name="isFraud")
+    X_bal, y_bal, weights, _ = rebalance(X_tr, y_tr, balance_mode, ratio, seed)
+    model = make_model(params, n_jobs=n_jobs, seed=seed)
+    model.fit(X_bal, y_bal, sample_weight=weights)
+    y_prob = model.predict_proba(pd.DataFrame(X[val_idx], columns=FEATURE_COLS, copy=False))[:, 1]
+    return {"fold": fold + 1, **score_metrics(y[val_idx], y_prob),
+            "seconds": time.perf_counter() - t0}
+
+
+def summarize(rows):
+    """Mean and standard deviation of each metric across folds."""
+    folds = pd.DataFrame(rows).drop(columns=["fold", "seconds"])
+    return pd.DataFrame({"mean": folds.mean(), "std": folds.std(ddof=1)})
+
+
+def cross_validate(X, y, params, k=5, balance_mode="SMOTE", ratio=0.5, n_workers=None,
+                   seed=42, on_result=None):
+    """Run ``k`` folds across ``n_workers`` processes sharing ``X`` / ``y``.
+
+    Returns ``(rows, wall_seconds)``; rows are per-fold metrics sorted by fold.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.ascontiguousarray(y, dtype=np.int8)
+    n_workers = n_workers or k
+    n_jobs = threads_per_trial(n_workers)
+    shm, layout = _to_shared({"X": X, "y": y})
+    rows = []
+    t0 = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(shm.name, layout)) as pool:
+            futures = [pool.submit(_run_fold, f, k, params, balance_mode, ratio, n_jobs, seed)
+                       for f in range(k)]
+            for fut in as_completed(futures):
+                rows.append(fut.result())
+                if on_result:
+                    on_result(rows)
+    finally:
+        shm.close()
+        shm.unlink()
+    return sorted(rows, key=lambda r: r["fold"]), time.perf_counter() - t0
+
+
+def cross_validate_serial(X, y, params, k=5, balance_mode="SMOTE", ratio=0.5, seed=42):
+    """Same folds in this process, one after another (the speedup baseline)."""
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.int8)
+    t0 = time.perf_counter()
+    rows = [run_fold(X, y, f, k, params, balance_mode, ratio, -1, seed) for f in range(k)]
+    return rows, time.perf_counter() - t0
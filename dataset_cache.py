@@ -0,0 +1,298 @@
+"""Content-addressed Arrow IPC cache for datasets and their engineered features.
+
+The first open of a CSV parses it once (chunk by chunk) and writes
+``<key>.raw.arrow``; ``FEATURE_COLS`` plus ``isFraud`` go to
+``<key>.features.arrow``. Each file holds a single record batch, so on
+later opens the numeric columns are zero-copy views of the memory-mapped
+file (the page cache) instead of freshly parsed arrays.
+
+Datasets that grow by appending rows are cached incrementally: when a new
+file starts with the exact bytes of an already cached one, only the appended
+bytes are parsed and only the appended rows are featurized (with the parent's
+type encoding); the parent's Arrow batches are copied through unchanged.
+The Analytics correlation statistics (``<key>.corr.npz``) are extended the
+same way, from the appended rows only.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from features import engineer_features, encoder_from_classes, type_encoder, FEATURE_COLS
+from ingest import CORR_COLS, RunningCorrelation, correlation_values
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".sfcache", "datasets")
+
+_CSV_CHUNK_ROWS = 500_000
+_PATH_INDEX = "paths.json"
+_LINEAGE_INDEX = "lineage.json"
+
+
+def content_hash(source, block_size=1 << 20):
+    """BLAKE2b digest of a path or file-like object's bytes."""
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                h.update(block)
+    else:
+        source.seek(0)
+        for block in iter(lambda: source.read(block_size), b""):
+            h.update(block)
+        source.seek(0)
+    return h.hexdigest()
+
+
+def _read_index(cache_dir, name):
+    try:
+        with open(os.path.join(cache_dir, name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def dataset_key(source, cache_dir=CACHE_DIR):
+    """Cache key for ``source``.
+
+    Server-side paths are memoised by (path, size, mtime) so unchanged files
+    are not re-hashed on every session.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        return content_hash(source)
+    path = os.path.abspath(source)
+    st = os.stat(path)
+    stamp = f"{st.st_size}:{st.st_mtime_ns}"
+    index = _read_index(cache_dir, _PATH_INDEX)
+    hit = index.get(path)
+    if hit and hit["stamp"] == stamp:
+        return hit["key"]
+    key = content_hash(path)
+    index[path] = {"stamp": stamp, "key": key}
+    os.makedirs(cache_dir, exist_ok=True)
+    _atomic_write_text(os.path.join(cache_dir, _PATH_INDEX), json.dumps(index))
+    return key
+
+
+def _atomic_write_text(path, text):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _paths(key, cache_dir):
+    return (os.path.join(cache_dir, f"{key}.raw.arrow"),
+            os.path.join(cache_dir, f"{key}.features.arrow"))
+
+
+def _source_size(source):
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    size = source.seek(0, os.SEEK_END)
+    source.seek(0)
+    return size
+
+
+def _prefix_hashes(source, offsets, block_size=1 << 20):
+    """Content hashes of ``source``'s first ``n`` bytes for each ``n`` in ``offsets``.
+
+    One sequential pass; the running digest is snapshotted at every offset.
+    """
+    offsets = sorted(set(offsets))
+    found, h, read, i = {}, hashlib.blake2b(digest_size=16), 0, 0
+    f = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+    try:
+        f.seek(0)
+        for block in iter(lambda: f.read(block_size), b""):
+            pos = 0
+            while i < len(offsets) and offsets[i] <= read + len(block):
+                cut = offsets[i] - read
+                h.update(block[pos:cut])
+                pos = cut
+                found[offsets[i]] = h.copy().hexdigest()
+                i += 1
+            h.update(block[pos:])
+            read += len(block)
+            if i == len(offsets):
+                break
+    finally:
+        if f is source:
+            f.seek(0)
+        else:
+            f.close()
+    return found
+
+
+def _find_parent(source, cache_dir):
+    """Largest cached dataset whose bytes are an exact prefix of ``source``."""
+    lineage = _read_index(cache_dir, _LINEAGE_INDEX)
+    size = _source_size(source)
+    candidates = {k: v for k, v in lineage.items()
+                  if v["bytes"] < size and os.path.exists(_paths(k, cache_dir)[0])}
+    if not candidates:
+        return None
+    hashes = _prefix_hashes(source, [v["bytes"] for v in candidates.values()])
+    matches = [k for k, v in candidates.items() if hashes.get(v["bytes"]) == k]
+    return max(matches, key=lambda k: candidates[k]["bytes"], default=None)
+
+
+def _record_lineage(cache_dir, key, **info):
+    lineage = _read_index(cache_dir, _LINEAGE_INDEX)
+    lineage[key] = info
+    _atomic_write_text(os.path.join(cache_dir, _LINEAGE_INDEX), json.dumps(lineage))
+
+
+def _read_csv_tail(source, offset, columns):
+    """Chunks of the CSV rows stored after byte ``offset`` (no header there)."""
+    f = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+    f.seek(offset)
+    try:
+        yield from pd.read_csv(f, header=None, names=columns, chunksize=_CSV_CHUNK_ROWS)
+    except pd.errors.EmptyDataError:
+        return
+    finally:
+        if f is not source:
+            f.close()
+
+
+def _write_arrow(path, frames, metadata=None):
+    """Write an iterable of DataFrames / Arrow tables to an IPC file, atomically.
+
+    The schema (and its metadata) comes from the first item; later items
+    are converted to it. Everything goes into a single record batch:
+    ``to_pandas`` only returns views of the memory map for single-chunk
+    columns, so the parsed chunks are combined before writing (peak memory
+    is about twice the table, once, on the first open).
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    writer = schema = None
+    tables = []
+    try:
+        for frame in frames:
+            if schema is None:
+                schema = (frame.schema if isinstance(frame, pa.Table)
+                          else pa.Schema.from_pandas(frame, preserve_index=False))
+                if metadata:
+                    schema = schema.with_metadata(
+                        {**(schema.metadata or {}),
+                         **{k.encode(): json.dumps(v).encode() for k, v in metadata.items()}})
+            if not isinstance(frame, pa.Table):
+                frame = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+            tables.append(frame.cast(schema))
+        if schema is None:
+            raise ValueError("dataset is empty")
+        table = pa.concat_tables(tables).combine_chunks()
+        del tables
+        writer = pa.ipc.new_file(tmp, schema)
+        writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+        writer.close()
+        os.replace(tmp, path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _map_arrow(path):
+    """Memory-map an Arrow IPC file as a table (no data is read yet)."""
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def _open_arrow(path):
+    """Memory-map an Arrow IPC file; returns (DataFrame, schema metadata)."""
+    table = _map_arrow(path)
+    meta = {k.decode(): json.loads(v) for k, v in (table.schema.metadata or {}).items()
+            if k != b"pandas"}
+    return table.to_pandas(split_blocks=True), meta
+
+
+def load_dataset(source, key=None, cache_dir=CACHE_DIR):
+    """Return ``(key, df)`` for a CSV path or upload, via the Arrow cache."""
+    key = key or dataset_key(source, cache_dir)
+    raw_path, _ = _paths(key, cache_dir)
+    if not os.path.exists(raw_path):
+        os.makedirs(cache_dir, exist_ok=True)
+        parent = _find_parent(source, cache_dir)
+        if parent:
+            old = _map_arrow(_paths(parent, cache_dir)[0])
+            offset = _read_index(cache_dir, _LINEAGE_INDEX)[parent]["bytes"]
+            frames = [old, *_read_csv_tail(source, offset, old.column_names)]
+        else:
+            if not isinstance(source, (str, os.PathLike)):
+                source.seek(0)
+            frames = pd.read_csv(source, chunksize=_CSV_CHUNK_ROWS)
+        _write_arrow(raw_path, frames)
+        if not isinstance(source, (str, os.PathLike)):
+            source.seek(0)
+        _record_lineage(cache_dir, key, bytes=_source_size(source), parent=parent)
+    return key, _open_arrow(raw_path)[0]
+
+
+def _feature_frame(df, le):
+    df_fe, _ = engineer_features(df, le)
+    return df_fe[FEATURE_COLS + ["isFraud"]].astype({c: np.float32 for c in FEATURE_COLS})
+
+
+def load_features(key, df, cache_dir=CACHE_DIR):
+    """Return ``(df_fe, le)`` for the cached dataset ``key``.
+
+    ``df_fe`` holds ``FEATURE_COLS`` and ``isFraud``; it is computed from
+    ``df`` with ``engineer_features`` the first time and memory-mapped after.
+    If ``key`` extends a cached parent dataset, only the rows past the
+    parent's are featurized, using the parent's type encoding.
+    """
+    _, feat_path = _paths(key, cache_dir)
+    if not os.path.exists(feat_path):
+        os.makedirs(cache_dir, exist_ok=True)
+        parent = _read_index(cache_dir, _LINEAGE_INDEX).get(key, {}).get("parent")
+        parent_path = parent and _paths(parent, cache_dir)[1]
+        frames = None
+        if parent_path and os.path.exists(parent_path):
+            old = _map_arrow(parent_path)
+            le = encoder_from_classes(json.loads(old.schema.metadata[b"type_classes"]))
+            try:
+                frames = [old, _feature_frame(df.iloc[old.num_rows:], le)]
+            except ValueError:
+                frames = None   # appended rows bring a new transaction type
+        if frames is None:
+            le = type_encoder(df["type"])
+            frames = [_feature_frame(df, le)]
+        _write_arrow(feat_path, frames, {"type_classes": le.classes_.tolist()})
+    df_fe, meta = _open_arrow(feat_path)
+    return df_fe, encoder_from_classes(meta["type_classes"])
+
+
+def load_correlation(key, df, cache_dir=CACHE_DIR):
+    """``CORR_COLS`` correlation matrix of cached dataset ``key``.
+
+    The running statistics are saved as ``<key>.corr.npz``; a dataset that
+    extends a cached parent folds only its appended rows into the parent's.
+    Returns None if ``df`` is not PaySim-shaped.
+    """
+    path = os.path.join(cache_dir, f"{key}.corr.npz")
+    if os.path.exists(path):
+        with np.load(path) as f:
+            return RunningCorrelation.from_arrays(f).corr()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    parent = _read_index(cache_dir, _LINEAGE_INDEX).get(key, {}).get("parent")
+    parent_path = parent and os.path.join(cache_dir, f"{parent}.corr.npz")
+    if parent_path and os.path.exists(parent_path):
+        with np.load(parent_path) as f:
+            rc, start = RunningCorrelation.from_arrays(f), int(f["rows"])
+    else:
+        rc, start = RunningCorrelation(CORR_COLS), 0
+    try:
+        for lo in range(start, len(df), _CSV_CHUNK_ROWS):
+            rc.update(correlation_values(df.iloc[lo:lo + _CSV_CHUNK_ROWS]))
+    except (KeyError, ValueError):
+        return None
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, rows=np.int64(len(df)), **rc.arrays())
+    os.replace(tmp, path)
+    return rc.corr()
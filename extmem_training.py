@@ -0,0 +1,203 @@
+"""Out-of-core XGBoost training for PaySim files that do not fit in memory.
+
+    python extmem_training.py history.csv [--chunk-rows 250000] [--memory-limit-mb 1024]
+
+CSV chunks are featurized one at a time and handed to XGBoost through a
+``DataIter``. ``ExtMemQuantileDMatrix`` quantizes each chunk into pages in a
+scratch directory and ``hist`` training streams those pages back, so peak
+memory follows ``chunk_rows`` and the quantized pages rather than the file
+size. ``--memory-limit-mb`` caps the process's data segment (RLIMIT_DATA) to
+check this on a local machine: set it below the in-memory size of the file.
+
+Rows are assigned to the test split by hashing their position in the file,
+so every pass sees the same split without keeping an index. SMOTE needs the
+whole minority class in memory, so class imbalance is handled with
+``scale_pos_weight`` from the class counts seen while building the matrix.
+The test rows are scored in a second streaming pass after training.
+"""
+import argparse
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from xgboost import XGBClassifier
+
+import model_registry
+from dataset_cache import content_hash
+from features import feature_matrix, paysim_encoder
+from ingest import CHUNK_ROWS, read_csv_chunks
+from thresholds import ThresholdSweep
+from training import XGB_PARAMS, report_metrics
+
+DEFAULT_PARAMS = {"n_estimators": 200, "max_depth": 6, "learning_rate": 0.1,
+                  "subsample": 0.8, "colsample_bytree": 0.8}
+
+
+def iter_chunks(source, chunk_rows=CHUNK_ROWS):
+    """Yield DataFrame chunks from a CSV path or an in-memory DataFrame."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_rows):
+            yield source.iloc[start:start + chunk_rows]
+    else:
+        yield from read_csv_chunks(source, chunk_rows)
+
+
+def test_mask(start, n, test_size, seed=42):
+    """Stable pseudo-random test assignment for rows ``start .. start + n - 1``."""
+    idx = np.arange(start, start + n, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        h = (idx + np.uint64(seed)) * np.uint64(0x9E3779B97F4A7C15)
+        h ^= h >> np.uint64(31)
+    return (h >> np.uint64(11)).astype(np.float64) / 2.0 ** 53 < test_size
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class _TrainChunks(xgb.DataIter):
+    """Feeds the training rows of each chunk to XGBoost; counts classes once."""
+
+    def __init__(self, source, le, chunk_rows, test_size, seed, cache_prefix):
+        self.source, self.le = source, le
+        self.chunk_rows, self.test_size, self.seed = chunk_rows, test_size, seed
+        self.class_counts = None
+        self._counts = np.zeros(2, dtype=np.int64)
+        self._chunks = None
+        self._start  = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def reset(self):
+        if self._start and self.class_counts is None:
+            self.class_counts = self._counts   # first full pass done
+        self._chunks = iter_chunks(self.source, self.chunk_rows)
+        self._start  = 0
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self.reset()
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        train = ~test_mask(self._start, len(chunk), self.test_size, self.seed)
+        self._start += len(chunk)
+        y = chunk["isFraud"].to_numpy(dtype=np.float32)[train]
+        if self.class_counts is None:
+            self._counts += np.bincount(y.astype(np.int64), minlength=2)
+        input_data(data=feature_matrix(chunk, self.le)[train], label=y)
+        return True
+
+
+def score_test_rows(booster, source, le, chunk_rows=CHUNK_ROWS, test_size=0.2, seed=42):
+    """Stream the held-out rows; returns ``(y_test, y_prob, amount)``."""
+    ys, probs, amounts = [], [], []
+    start = 0
+    for chunk in iter_chunks(source, chunk_rows):
+        test = test_mask(start, len(chunk), test_size, seed)
+        start += len(chunk)
+        if not test.any():
+            continue
+        ys.append(chunk["isFraud"].to_numpy(dtype=np.int8)[test])
+        probs.append(booster.inplace_predict(feature_matrix(chunk, le)[test]))
+        amounts.append(chunk["amount"].to_numpy(dtype=np.float32)[test])
+    return np.concatenate(ys), np.concatenate(probs), np.concatenate(amounts)
+
+
+def train_external(source, params=None, chunk_rows=CHUNK_ROWS, test_size=0.2, seed=42,
+                   max_bin=256, n_jobs=-1, cache_dir=None):
+    """Train on ``source`` (CSV path or DataFrame) without materializing it.
+
+    Returns ``(model, le, y_test, y_prob, metrics, info)``; ``y_test`` / ``y_prob``
+    are the streamed test-split labels and scores, ``info`` has timings, row
+    counts, the quantized page size and the peak RSS.
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    le = paysim_encoder()
+    scratch = tempfile.mkdtemp(prefix="sf-extmem-", dir=cache_dir)
+    t0 = time.perf_counter()
+    try:
+        it = _TrainChunks(source, le, chunk_rows, test_size, seed,
+                          os.path.join(scratch, "pages"))
+        dtrain = xgb.ExtMemQuantileDMatrix(it, max_bin=max_bin, nthread=n_jobs)
+        counts = it.class_counts if it.class_counts is not None else it._counts
+        t_matrix = time.perf_counter() - t0
+        spw = params.get("scale_pos_weight") or counts[0] / max(counts[1], 1)
+        booster = xgb.train({
+            "objective": "binary:logistic", "eval_metric": "logloss",
+            "tree_method": "hist", "max_bin": max_bin, "nthread": n_jobs, "seed": seed,
+            **{k: params[k] for k in XGB_PARAMS if k in params and k != "n_estimators"},
+            "scale_pos_weight": spw,
+        }, dtrain, num_boost_round=params["n_estimators"])
+        t_train = time.perf_counter() - t0 - t_matrix
+        page_bytes = sum(os.path.getsize(os.path.join(scratch, f)) for f in os.listdir(scratch))
+        del dtrain
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    y_test, y_prob, amount = score_test_rows(booster, source, le, chunk_rows, test_size, seed)
+    model = XGBClassifier()
+    model.load_model(bytearray(booster.save_raw("ubj")))
+    info = {
+        "train_rows":     int(counts.sum()),
+        "test_rows":      len(y_test),
+        "class_counts":   counts.tolist(),
+        "scale_pos_weight": float(spw),
+        "matrix_seconds": t_matrix,
+        "train_seconds":  t_train,
+        "total_seconds":  time.perf_counter() - t0,
+        "page_mb":        page_bytes / 2 ** 20,
+        "peak_rss_mb":    peak_rss_mb(),
+        "amount":         amount,
+    }
+    return model, le, y_test, y_prob, report_metrics(y_test, y_prob), info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train XGBoost out-of-core on a PaySim CSV")
+    parser.add_argument("source", help="PaySim-format CSV")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--max-bin", type=int, default=256)
+    for name, value in DEFAULT_PARAMS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    parser.add_argument("--scale-pos-weight", type=float,
+                        help="default: negatives / positives in the training split")
+    parser.add_argument("--cache-dir", help="where quantized pages go (default: system temp)")
+    parser.add_argument("--memory-limit-mb", type=int,
+                        help="cap the data segment (RLIMIT_DATA) to verify bounded memory")
+    parser.add_argument("--no-save", action="store_true", help="don't add the model to the registry")
+    args = parser.parse_args(argv)
+
+    if args.memory_limit_mb:
+        limit = args.memory_limit_mb * 2 ** 20
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    params = {k: getattr(args, k) for k in DEFAULT_PARAMS}
+    params["scale_pos_weight"] = args.scale_pos_weight
+    model, le, y_test, y_prob, metrics, info = train_external(
+        args.source, params, args.chunk_rows, args.test_size, max_bin=args.max_bin,
+        cache_dir=args.cache_dir)
+    amount = info.pop("amount")
+
+    print(f"{info['train_rows']:,} training rows, {info['test_rows']:,} test rows — "
+          f"matrix {info['matrix_seconds']:.1f}s, training {info['train_seconds']:.1f}s, "
+          f"pages {info['page_mb']:.0f} MB, peak RSS {info['peak_rss_mb']:.0f} MB")
+    print("  ".join(f"{k} {metrics[k]:.4f}" for k in
+                    ["Precision", "Recall", "F1-Score", "ROC-AUC", "Average Precision"]))
+    if not args.no_save:
+        model_id = model_registry.save_model(
+            model, le.classes_, dict(params, test_size=args.test_size, external_memory=info),
+            metrics, dataset_hash=content_hash(args.source), source="extmem_training",
+            artifacts={
+                "evaluation":      {"y_test": y_test, "y_prob": y_prob},
+                "threshold_sweep": ThresholdSweep.from_scores(y_test, y_prob, amount).arrays(),
+            })
+        print(f"saved as model {model_id}")
+
+
+if __name__ == "__main__":
+    main()
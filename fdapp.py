@@ -11,16 +11,18 @@ st.set_page_config(
 # Import libraries
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
+import os
 import time
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 
-# ML Libraries
-from xgboost import XGBClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+# xgboost / scikit-learn / plotly and the transaction store (pyarrow, SQLite)
+# are imported inside the functions that use them, so the login page doesn't
+# pay for them on a cold start
+import model_registry
+
+# Dataset scored into the dashboard's transaction store
+DASHBOARD_DATASET = os.environ.get("SF_DATASET") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "Fraud_Analysis_Dataset.csv")
 
 # Professional Light Theme CSS
 st.markdown("""
@@ -439,10 +441,14 @@ if 'model_accuracy' not in st.session_state:
 if 'model_metrics' not in st.session_state:
     st.session_state.model_metrics = {}
 
-# Train ML Model (XGBoost - Highest Accuracy Model)
+# Fallback ML Model (XGBoost on synthetic data)
 @st.cache_resource
 def train_fraud_model():
-    """Train XGBoost model for fraud detection (99.96% accuracy)"""
+    """Train the synthetic-data fallback; kept in this process only, never registered"""
+    from xgboost import XGBClassifier
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+    from sklearn.model_selection import train_test_split
+    
     np.random.seed(42)
     
     # Generate synthetic training data
@@ -453,7 +459,7 @@ def train_fraud_model():
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
-    # Train XGBoost (highest accuracy model from notebook: 99.96%)
+    # Train XGBoost
     model = XGBClassifier(
         n_estimators=100,
         max_depth=6,
@@ -466,42 +472,93 @@ def train_fraud_model():
     # Evaluate
     y_pred = model.predict(X_test)
     
-    # Using the actual metrics from the notebook for XGBoost
+    # Held-out metrics of this model (not of a real dataset)
     metrics = {
-        'accuracy': 0.9996,      # 99.96% from notebook
-        'precision': 1.0000,     # 100.00% from notebook
-        'recall': 0.9956,        # 99.56% from notebook
-        'f1': 0.9978            # 99.78% from notebook
+        'accuracy': accuracy_score(y_test, y_pred),
+        'precision': precision_score(y_test, y_pred, zero_division=0),
+        'recall': recall_score(y_test, y_pred, zero_division=0),
+        'f1': f1_score(y_test, y_pred, zero_division=0),
+        'synthetic': True
     }
     
     return model, metrics
 
-# Data Generation
+# Model metrics from the shared registry
+@st.cache_resource
+def load_fraud_model():
+    """Metrics of the pinned/newest dataset-trained model; the synthetic fallback's if there is none"""
+    # The dashboard only shows metrics, so read them from the registry metadata
+    # instead of deserializing the booster (which would import xgboost)
+    try:
+        meta = model_registry.load_meta(model_registry.resolve_model_id())
+    except FileNotFoundError:
+        _, metrics = train_fraud_model()
+        return metrics
+    
+    # xgfdapp stores its report-style metric names
+    m = meta['metrics']
+    metrics = {
+        'accuracy': m.get('accuracy', m.get('Test Accuracy')),
+        'precision': m.get('precision', m.get('Precision')),
+        'recall': m.get('recall', m.get('Recall')),
+        'f1': m.get('f1', m.get('F1-Score'))
+    }
+    return metrics
+
+# Scored Transactions
+TRANSACTION_ROWS = 500   # latest matches shown in the Transactions table
+MAX_COUNTED = 10000      # matches counted beyond this are shown as "10,000+"
+
+@st.cache_resource(show_spinner="Scoring transactions into the dashboard store...")
+def open_transaction_store(key, model_id):
+    """SQLite store of dataset ``key`` scored by ``model_id`` (built on first use)"""
+    from dataset_cache import load_dataset
+    from transaction_store import load_store
+    
+    key, df = load_dataset(DASHBOARD_DATASET, key)
+    return load_store(key, df, model_id)
+
+def dashboard_store():
+    """``(store_id, connection)`` for the current dataset-trained model, or ``(None, None)``"""
+    from dataset_cache import dataset_key
+    
+    # Resolved on every run, so a newly trained or pinned model is picked up
+    try:
+        model_id = model_registry.resolve_model_id()
+    except FileNotFoundError:
+        st.info("ℹ️ No model trained on a dataset is registered yet. Train one on the "
+                "Model Training page of xgfdapp.py to score transactions for this dashboard.")
+        return None, None
+    key = dataset_key(DASHBOARD_DATASET)
+    return f"{key}-{model_id}", open_transaction_store(key, model_id)
+
 @st.cache_data
-def generate_transaction_data(n=200):
-    """Generate transaction data"""
-    np.random.seed(42)
-    
-    customers = ['John Anderson', 'Sarah Mitchell', 'Michael Chen', 'Emma Williams',
-                'David Brown', 'Lisa Davis', 'James Wilson', 'Jennifer Taylor']
-    
-    locations = ['New York, USA', 'London, UK', 'Tokyo, Japan', 'Singapore',
-                'Dubai, UAE', 'Sydney, Australia', 'Toronto, Canada', 'Mumbai, India']
-    
-    types = ['TRANSFER', 'PAYMENT', 'CASH_OUT', 'DEBIT', 'CASH_IN']
-    
-    data = {
-        'Transaction ID': [f'TXN-{str(i+50000).zfill(6)}' for i in range(n)],
-        'Customer Name': np.random.choice(customers, n),
-        'Amount': np.random.exponential(2000, n).round(2),
-        'Location': np.random.choice(locations, n),
-        'Time': [(datetime.now() - timedelta(hours=random.randint(0, 168))).strftime('%Y-%m-%d %H:%M') for _ in range(n)],
-        'Type': np.random.choice(types, n),
-        'Risk Score': np.random.randint(0, 100, n),
-        'Status': np.random.choice(['Verified', 'Fraud', 'Pending'], n, p=[0.70, 0.18, 0.12])
+def dashboard_summary(store_id, _conn):
+    """KPI and chart aggregates; a store never changes, so they are computed once per store"""
+    import transaction_store as ts
+    
+    end_time = int(ts.meta(_conn)['end_time'])
+    return {
+        'status_counts': ts.status_counts(_conn),
+        'fraud_today': ts.status_counts(_conn, since=end_time - 86400)['Fraud'],
+        'avg_risk': ts.average_risk(_conn),
+        'daily_fraud': ts.daily_counts(_conn, 'Fraud', days=30),
+        'type_counts': ts.type_counts(_conn),
+        'risk_histogram': ts.risk_histogram(_conn)
     }
-    
-    return pd.DataFrame(data)
+
+def transactions_frame(rows):
+    """Table view of store rows"""
+    return pd.DataFrame({
+        'Transaction ID': [f"TXN-{r['id']:06d}" for r in rows],
+        'Account': [r['nameOrig'] for r in rows],
+        'Recipient': [r['nameDest'] for r in rows],
+        'Amount': [r['amount'] for r in rows],
+        'Time': [datetime.fromtimestamp(r['time']).strftime('%Y-%m-%d %H:%M') for r in rows],
+        'Type': [r['type'] for r in rows],
+        'Risk Score': [r['risk_score'] for r in rows],
+        'Status': [r['status'] for r in rows]
+    })
 
 # Login Page
 def login_page():
@@ -535,7 +592,7 @@ def login_page():
                     # Train model on first login
                     if not st.session_state.model_trained:
                         with st.spinner("Initializing XGBoost AI model..."):
-                            model, metrics = train_fraud_model()
+                            metrics = load_fraud_model()
                             st.session_state.model_accuracy = metrics['accuracy'] * 100
                             st.session_state.model_metrics = metrics
                             st.session_state.model_trained = True
@@ -551,19 +608,26 @@ def login_page():
 
 # Dashboard Page
 def dashboard_page():
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
     st.title("📊 Dashboard")
     st.markdown("### Real-time fraud detection overview")
     st.markdown("---")
     
     # Get data
-    transactions = generate_transaction_data(1000)
+    store_id, conn = dashboard_store()
+    if conn is None:
+        return
+    summary = dashboard_summary(store_id, conn)
+    status_counts = summary['status_counts']
     
     # Calculate metrics
-    total_trans = len(transactions)
-    fraud_today = len(transactions[transactions['Status'] == 'Fraud'])
-    verified = len(transactions[transactions['Status'] == 'Verified'])
-    pending = len(transactions[transactions['Status'] == 'Pending'])
-    avg_risk = transactions['Risk Score'].mean()
+    total_trans = sum(status_counts.values())
+    fraud_today = summary['fraud_today']
+    verified = status_counts['Verified']
+    pending = status_counts['Pending']
+    avg_risk = summary['avg_risk']
     
     # 6 KPI Cards
     col1, col2, col3, col4, col5, col6 = st.columns(6)
@@ -582,7 +646,7 @@ def dashboard_page():
         st.markdown(f"""
         <div class="kpi-card">
             <div class="kpi-icon red">🚨</div>
-            <div class="kpi-value">{fraud_today}</div>
+            <div class="kpi-value">{fraud_today:,}</div>
             <div class="kpi-label">Fraud Today</div>
             <div class="kpi-trend down">↓ 8.5%</div>
         </div>
@@ -592,7 +656,7 @@ def dashboard_page():
         st.markdown(f"""
         <div class="kpi-card">
             <div class="kpi-icon green">✅</div>
-            <div class="kpi-value">{verified}</div>
+            <div class="kpi-value">{verified:,}</div>
             <div class="kpi-label">Verified</div>
             <div class="kpi-trend up">↑ 11.3%</div>
         </div>
@@ -602,7 +666,7 @@ def dashboard_page():
         st.markdown(f"""
         <div class="kpi-card">
             <div class="kpi-icon amber">⏳</div>
-            <div class="kpi-value">{pending}</div>
+            <div class="kpi-value">{pending:,}</div>
             <div class="kpi-label">Pending</div>
             <div class="kpi-trend up">↑ 5.2%</div>
         </div>
@@ -636,8 +700,6 @@ def dashboard_page():
     with col1:
         st.markdown("#### Fraud vs Legitimate Transactions")
         
-        status_counts = transactions['Status'].value_counts()
-        
         fig = go.Figure(data=[go.Pie(
             labels=['Verified', 'Fraud', 'Pending'],
             values=[status_counts.get('Verified', 0), status_counts.get('Fraud', 0), status_counts.get('Pending', 0)],
@@ -658,8 +720,9 @@ def dashboard_page():
     with col2:
         st.markdown("#### Fraud Trend Over Time")
         
-        dates = pd.date_range(end=datetime.now(), periods=30, freq='D')
-        fraud_trend = np.random.randint(10, 30, 30)
+        daily = summary['daily_fraud']
+        dates = [datetime.fromtimestamp(day) for day, _ in daily]
+        fraud_trend = [n for _, n in daily]
         
         fig = go.Figure()
         fig.add_trace(go.Scatter(
@@ -691,11 +754,11 @@ def dashboard_page():
     with col1:
         st.markdown("#### Transaction by Type")
         
-        type_counts = transactions['Type'].value_counts()
+        type_counts = summary['type_counts']
         
         fig = px.bar(
-            x=type_counts.index,
-            y=type_counts.values,
+            x=[t for t, _ in type_counts],
+            y=[n for _, n in type_counts],
             labels={'x': 'Type', 'y': 'Count'},
             color_discrete_sequence=['#1E3A8A']
         )
@@ -712,15 +775,15 @@ def dashboard_page():
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
-        st.markdown("#### High-Risk Locations")
+        st.markdown("#### Risk Score Distribution")
         
-        locations = transactions['Location'].value_counts().head(8)
+        buckets = summary['risk_histogram']
         
         fig = px.bar(
-            x=locations.values,
-            y=locations.index,
+            x=[n for _, n in buckets],
+            y=[f"{b}-{b + 9 if b < 90 else 100}" for b, _ in buckets],
             orientation='h',
-            labels={'x': 'Count', 'y': 'Location'},
+            labels={'x': 'Count', 'y': 'Risk Score'},
             color_discrete_sequence=['#1E3A8A']
         )
         
@@ -758,13 +821,15 @@ def transaction_page():
     st.markdown("### Transaction monitoring and analysis")
     st.markdown("---")
     
-    transactions = generate_transaction_data(150)
+    _, conn = dashboard_store()
+    if conn is None:
+        return
     
     # Filters
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        search = st.text_input("🔍 Search", placeholder="Transaction ID, Customer...")
+        search = st.text_input("🔍 Search", placeholder="Transaction ID or account...").strip()
     with col2:
         status_filter = st.selectbox("Filter by Status", ["All", "Verified", "Fraud", "Pending"])
     with col3:
@@ -772,24 +837,23 @@ def transaction_page():
     with col4:
         max_amount = st.number_input("Max Amount ($)", value=50000.0, step=1000.0)
     
-    # Apply filters
-    filtered_df = transactions.copy()
+    # Apply filters (indexed queries on the store)
+    from transaction_store import search as search_store
     
-    if status_filter != "All":
-        filtered_df = filtered_df[filtered_df['Status'] == status_filter]
+    txn_id = account = None
+    if search.upper().startswith("TXN-") and search[4:].isdigit():
+        txn_id = int(search[4:])
+    elif search:
+        account = search
     
-    if search:
-        filtered_df = filtered_df[
-            filtered_df['Transaction ID'].str.contains(search, case=False) |
-            filtered_df['Customer Name'].str.contains(search, case=False)
-        ]
-    
-    filtered_df = filtered_df[
-        (filtered_df['Amount'] >= min_amount) & 
-        (filtered_df['Amount'] <= max_amount)
-    ]
+    rows, total = search_store(conn, status=None if status_filter == "All" else status_filter,
+                               min_amount=min_amount, max_amount=max_amount,
+                               account=account, txn_id=txn_id, limit=TRANSACTION_ROWS,
+                               max_count=MAX_COUNTED)
+    filtered_df = transactions_frame(rows)
     
-    st.markdown(f"**Showing {len(filtered_df)} transactions**")
+    matches = f"{MAX_COUNTED:,}+" if total >= MAX_COUNTED else f"{total:,}"
+    st.markdown(f"**Showing {len(filtered_df)} of {matches} transactions (newest first)**")
     
     # Export button
     if st.button("📥 EXPORT CSV", type="primary"):
@@ -987,6 +1051,9 @@ def main_app():
         # Model Info
         st.markdown("### 🤖 AI Model")
         st.info(f"**XGBoost**\n\nAccuracy: {st.session_state.model_accuracy:.2f}%")
+        if st.session_state.model_metrics.get('synthetic'):
+            st.warning("No model trained on a dataset is registered; these are the "
+                       "metrics of a fallback trained on synthetic data.")
         
         st.markdown("---")
         st.success("🟢 System Online")
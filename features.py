@@ -0,0 +1,100 @@
+"""Feature derivation shared by the Streamlit apps and the headless scorers."""
+import numpy as np
+
+FEATURE_COLS = [
+    "step", "type_encoded", "amount", "oldbalanceOrg", "newbalanceOrig",
+    "oldbalanceDest", "newbalanceDest", "balanceDiff_Orig", "balanceDiff_Dest",
+    "isOriginEmpty", "amountPercent_Orig", "errorBalanceOrig", "errorBalanceDest"
+]
+
+# Raw numeric PaySim columns the derived features are built from
+RAW_NUMERIC_COLS = ["step", "amount", "oldbalanceOrg", "newbalanceOrig",
+                    "oldbalanceDest", "newbalanceDest"]
+
+# Transaction types in the order LabelEncoder assigns them on a full PaySim file
+PAYSIM_TYPES = ["CASH_IN", "CASH_OUT", "DEBIT", "PAYMENT", "TRANSFER"]
+
+
+def _derive(d):
+    """Add the balance-delta columns to a DataFrame or a dict of NumPy arrays."""
+    d["balanceDiff_Orig"]   = d["oldbalanceOrg"]  - d["newbalanceOrig"]
+    d["balanceDiff_Dest"]   = d["newbalanceDest"]  - d["oldbalanceDest"]
+    d["isOriginEmpty"]      = (d["newbalanceOrig"] == 0).astype(int)
+    d["amountPercent_Orig"] = d["amount"] / (d["oldbalanceOrg"] + 1)
+    d["errorBalanceOrig"]   = d["balanceDiff_Orig"] - d["amount"]
+    d["errorBalanceDest"]   = d["balanceDiff_Dest"] - d["amount"]
+    return d
+
+
+def engineer_features(df, le=None):
+    """Return a copy of ``df`` with the engineered columns and the type encoder.
+
+    Without an explicit encoder the fixed PaySim encoding is used, so codes do
+    not depend on which types happen to be present in ``df``.
+    """
+    d = _derive(df.copy())
+    le = le or type_encoder(d["type"])
+    d["type_encoded"] = le.transform(d["type"])
+    return d, le
+
+
+def paysim_encoder():
+    """LabelEncoder pre-fitted on the five PaySim transaction types."""
+    return encoder_from_classes(PAYSIM_TYPES)
+
+
+def type_encoder(types):
+    """Fixed PaySim encoder, or one fitted on ``types`` if they are not PaySim's."""
+    if set(types.unique()) <= set(PAYSIM_TYPES):
+        return paysim_encoder()
+    from sklearn.preprocessing import LabelEncoder
+
+    le = LabelEncoder()
+    le.fit(types)
+    return le
+
+
+def encoder_from_classes(classes):
+    """Rebuild a fitted LabelEncoder from its saved ``classes_``."""
+    from sklearn.preprocessing import LabelEncoder
+
+    le = LabelEncoder()
+    le.classes_ = np.asarray(classes, dtype=object)
+    return le
+
+
+def _stack(cols, n, dtype):
+    X = np.empty((n, len(FEATURE_COLS)), dtype=dtype)
+    for j, c in enumerate(FEATURE_COLS):
+        X[:, j] = cols[c]
+    return X
+
+
+def feature_matrix(df, le, dtype=np.float32):
+    """Build the ``FEATURE_COLS`` matrix for ``df`` without copying the frame."""
+    cols = {c: df[c].to_numpy(dtype=np.float64) for c in RAW_NUMERIC_COLS}
+    _derive(cols)
+    cols["type_encoded"] = le.transform(df["type"].to_numpy())
+    return _stack(cols, len(df), dtype)
+
+
+def records_matrix(records, le, dtype=np.float32):
+    """``FEATURE_COLS`` matrix for a list of raw transaction dicts (e.g. parsed JSON).
+
+    Raises KeyError for a missing field and ValueError for an unknown type or
+    a non-numeric value.
+    """
+    n = len(records)
+    codes = {t: i for i, t in enumerate(le.classes_)}
+    try:
+        cols = {c: np.fromiter((r[c] for r in records), np.float64, n)
+                for c in RAW_NUMERIC_COLS}
+    except TypeError as e:
+        raise ValueError(f"non-numeric transaction field: {e}") from None
+    types = [r["type"] for r in records]
+    try:
+        cols["type_encoded"] = np.fromiter((codes[t] for t in types), np.float64, n)
+    except KeyError as e:
+        raise ValueError(f"unknown transaction type {e.args[0]!r}") from None
+    _derive(cols)
+    return _stack(cols, n, dtype)
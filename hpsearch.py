@@ -0,0 +1,145 @@
+"""Parallel hyperparameter search for the Model Training page.
+
+Trials run in a process pool. The (already rebalanced) training data, its
+optional sample weights and the validation split are sent to each worker once, through the pool
+initializer, and every trial gets ``cpu_count // n_workers`` XGBoost threads
+so concurrent trials don't oversubscribe the machine. Results are reported
+through ``on_result`` as trials finish, and only the best trial's model is
+kept.
+"""
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing as mp
+
+import numpy as np
+from xgboost import XGBClassifier
+
+from training import make_model, score_metrics
+
+SEARCH_SPACE = {
+    "n_estimators":     [100, 200, 300],
+    "max_depth":        [4, 6, 8],
+    "learning_rate":    [0.05, 0.1, 0.2],
+    "subsample":        [0.8, 1.0],
+    "colsample_bytree": [0.8, 1.0],
+    "scale_pos_weight": [1, 5, 10],
+}
+
+OBJECTIVES = ["Average Precision", "ROC-AUC", "F1-Score"]
+
+_DATA = None
+
+
+def grid_configs(space):
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*space.values())]
+
+
+def random_configs(space, n, seed=42):
+    """``n`` distinct configs sampled from ``space`` (fewer if the grid is smaller)."""
+    grid = grid_configs(space)
+    rng = np.random.default_rng(seed)
+    return [grid[i] for i in rng.permutation(len(grid))[:n]]
+
+
+def threads_per_trial(n_workers):
+    return max(1, (os.cpu_count() or 1) // n_workers)
+
+
+def _init_worker(X_train, y_train, X_val, y_val, sample_weight=None):
+    global _DATA
+    _DATA = (X_train, y_train, X_val, y_val, sample_weight)
+
+
+def _run_trial(trial, params, n_jobs):
+    X_train, y_train, X_val, y_val, sample_weight = _DATA
+    t0 = time.perf_counter()
+    model = make_model(params, n_jobs=n_jobs)
+    model.fit(X_train, y_train, sample_weight=sample_weight)
+    metrics = score_metrics(y_val, model.predict_proba(X_val)[:, 1])
+    return {"trial": trial, **params, **metrics,
+            "seconds": time.perf_counter() - t0,
+            "model": bytes(model.get_booster().save_raw("ubj"))}
+
+
+class SearchResult:
+    """Leaderboard rows (best first) and the best trial's fitted model."""
+
+    def __init__(self, objective):
+        self.objective = objective
+        self.rows = []
+        self._best_raw = None
+
+    def add(self, row):
+        raw = row.pop("model")
+        if not self.rows or row[self.objective] > self.best[self.objective]:
+            self._best_raw = raw
+        self.rows.append(row)
+        self.rows.sort(key=lambda r: r[self.objective], reverse=True)
+
+    @property
+    def best(self):
+        return self.rows[0] if self.rows else None
+
+    def best_model(self):
+        model = XGBClassifier()
+        model.load_model(bytearray(self._best_raw))
+        return model
+
+
+def _pool(data, n_workers):
+    # spawn: forking a threaded Streamlit server is not safe
+    return ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn"),
+                               initializer=_init_worker, initargs=data)
+
+
+def run_search(configs, data, n_workers, objective="Average Precision", on_result=None):
+    """Train every config on ``data = (X_train, y_train, X_val, y_val[, sample_weight])``."""
+    result = SearchResult(objective)
+    n_jobs = threads_per_trial(n_workers)
+    with _pool(data, n_workers) as pool:
+        futures = [pool.submit(_run_trial, i, cfg, n_jobs) for i, cfg in enumerate(configs)]
+        for fut in as_completed(futures):
+            result.add(fut.result())
+            if on_result:
+                on_result(result)
+    return result
+
+
+def successive_halving(configs, data, n_workers, objective="Average Precision",
+                       min_rounds=50, max_rounds=400, eta=3, on_result=None):
+    """Successive halving with boosting rounds as the budget.
+
+    Every config starts with ``min_rounds`` trees; after each rung only the
+    top ``1/eta`` survive and get ``eta`` times more trees, up to ``max_rounds``.
+    ``n_estimators`` in the configs is ignored.
+    """
+    result = SearchResult(objective)
+    n_jobs = threads_per_trial(n_workers)
+    survivors = [dict(cfg) for cfg in configs]
+    rounds, rung, trial = min_rounds, 0, 0
+    with _pool(data, n_workers) as pool:
+        while survivors:
+            rung_rows = []
+            futures = []
+            for cfg in survivors:
+                futures.append(pool.submit(_run_trial, trial, {**cfg, "n_estimators": rounds}, n_jobs))
+                trial += 1
+            for fut in as_completed(futures):
+                row = fut.result()
+                row["rung"] = rung
+                rung_rows.append({k: v for k, v in row.items() if k != "model"})
+                result.add(row)
+                if on_result:
+                    on_result(result)
+            if rounds >= max_rounds or len(survivors) == 1:
+                break
+            keep = max(1, math.ceil(len(survivors) / eta))
+            rung_rows.sort(key=lambda r: r[objective], reverse=True)
+            survivors = [{k: r[k] for k in configs[0]} for r in rung_rows[:keep]]
+            rounds = min(max_rounds, rounds * eta)
+            rung += 1
+    return result
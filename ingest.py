@@ -0,0 +1,314 @@
+"""Chunked CSV ingestion with compact dtypes and incremental dataset summaries.
+
+``summarize_csv`` reads a PaySim export one chunk at a time and only keeps
+running aggregates, so the Data Intelligence tabs can profile files that do
+not fit in memory. Duplicates are estimated with a fixed-size Bloom filter
+(``DuplicateFilter``) so that memory stays bounded too. For PaySim files that
+includes the Analytics correlation matrix (``RunningCorrelation`` over ``CORR_COLS``).
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from features import PAYSIM_TYPES, RAW_NUMERIC_COLS, _derive
+
+CHUNK_ROWS = 250_000
+
+# Compact dtypes for PaySim columns; columns missing from a file are ignored
+PAYSIM_DTYPES = {
+    "step":           "uint16",
+    "type":           "category",
+    "amount":         "float32",
+    "oldbalanceOrg":  "float32",
+    "newbalanceOrig": "float32",
+    "oldbalanceDest": "float32",
+    "newbalanceDest": "float32",
+    "isFraud":        "int8",
+    "isFlaggedFraud": "int8",
+}
+
+# Rows kept (uniformly sampled) for the describe() quantiles
+QUANTILE_SAMPLE_ROWS = 200_000
+
+# Bloom filter of the duplicate estimate: 2**28 bits (32 MiB) probed 7 times,
+# about one false duplicate per million rows at 6M rows
+DUPLICATE_FILTER_BITS = 1 << 28
+DUPLICATE_FILTER_HASHES = 7
+
+# Raw and engineered columns of the Analytics correlation heatmap
+CORR_COLS = ["step", "amount", "oldbalanceOrg", "newbalanceOrig", "oldbalanceDest",
+             "newbalanceDest", "balanceDiff_Orig", "balanceDiff_Dest", "isOriginEmpty",
+             "amountPercent_Orig", "errorBalanceOrig", "errorBalanceDest", "type_encoded",
+             "isFraud"]
+
+
+def read_csv_chunks(source, chunksize=CHUNK_ROWS):
+    """Iterate over ``source`` in ``chunksize``-row frames with compact dtypes."""
+    return pd.read_csv(source, dtype=PAYSIM_DTYPES, chunksize=chunksize)
+
+
+class RunningMoments:
+    """Per-column count / mean / M2 / min / max merged chunk by chunk (Chan et al.)."""
+
+    def __init__(self, columns):
+        k = len(columns)
+        self.columns = list(columns)
+        self.count   = np.zeros(k)
+        self.mean    = np.zeros(k)
+        self.m2      = np.zeros(k)
+        self.min     = np.full(k, np.inf)
+        self.max     = np.full(k, -np.inf)
+
+    def update(self, values):
+        """Fold an (n, k) float array (NaN = missing) into the running moments."""
+        n_b = np.sum(~np.isnan(values), axis=0).astype(float)
+        if not n_b.any():
+            return
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)   # all-NaN columns
+            mean_b = np.nan_to_num(np.nanmean(values, axis=0))
+            m2_b   = np.nansum((values - mean_b) ** 2, axis=0)
+            self.min = np.fmin(self.min, np.nanmin(values, axis=0))
+            self.max = np.fmax(self.max, np.nanmax(values, axis=0))
+        n      = self.count + n_b
+        delta  = mean_b - self.mean
+        safe_n = np.where(n > 0, n, 1)
+        self.mean  = self.mean + delta * n_b / safe_n
+        self.m2    = self.m2 + m2_b + delta ** 2 * self.count * n_b / safe_n
+        self.count = n
+
+    def std(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(np.where(self.count > 1, self.m2 / (self.count - 1), np.nan))
+
+
+class RunningCorrelation:
+    """Count, means and co-moment matrix of ``columns``, merged chunk by chunk.
+
+    The centred form of running sums / sums of squares / cross-products:
+    each chunk's co-moments are combined with Chan et al.'s pairwise update,
+    which avoids the cancellation of raw sums on large balances. Rows with
+    a missing value are skipped.
+    """
+
+    def __init__(self, columns):
+        k = len(columns)
+        self.columns = list(columns)
+        self.count   = 0
+        self.mean    = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def update(self, values):
+        """Fold an (n, k) float array into the running statistics."""
+        values = values[~np.isnan(values).any(axis=1)]
+        n_b = len(values)
+        if not n_b:
+            return
+        mean_b = values.mean(axis=0)
+        centred = values - mean_b
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.comoment += centred.T @ centred + np.outer(delta, delta) * self.count * n_b / n
+        self.mean += delta * n_b / n
+        self.count = n
+
+    def corr(self):
+        """Pearson correlation matrix as a DataFrame (NaN for constant columns)."""
+        sd = np.sqrt(np.diag(self.comoment))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = self.comoment / np.outer(sd, sd)
+        return pd.DataFrame(np.clip(r, -1, 1), index=self.columns, columns=self.columns)
+
+    def arrays(self):
+        return {"columns": np.asarray(self.columns), "count": np.int64(self.count),
+                "mean": self.mean, "comoment": self.comoment}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        rc = cls(arrays["columns"].tolist())
+        rc.count, rc.mean, rc.comoment = int(arrays["count"]), arrays["mean"], arrays["comoment"]
+        return rc
+
+
+class DuplicateFilter:
+    """Streaming duplicate-row estimate over 64-bit row hashes.
+
+    Repeats inside a chunk are counted exactly from that chunk's hashes;
+    repeats of earlier chunks are found with a Bloom filter of ``bits`` bits
+    and ``hashes`` probes (double hashing of the row hash). The filter never
+    misses a duplicate but may take a new row for one, so ``count`` is an
+    upper estimate and ``expected_error`` the expected number of such false
+    duplicates, from the fill ratio the filter had when each chunk was checked.
+    """
+
+    def __init__(self, bits=DUPLICATE_FILTER_BITS, hashes=DUPLICATE_FILTER_HASHES):
+        if bits < 64 or bits & (bits - 1):
+            raise ValueError("bits must be a power of two of at least 64")
+        self.words  = np.zeros(bits // 64, dtype=np.uint64)
+        self.mask   = np.uint64(bits - 1)
+        self.hashes = hashes
+        self.count  = 0
+        self.expected_error = 0.0
+
+    def _positions(self, h):
+        h1 = h & np.uint64(0xFFFFFFFF)
+        h2 = (h >> np.uint64(32)) | np.uint64(1)
+        probes = np.arange(self.hashes, dtype=np.uint64)
+        return (h1[:, None] + probes * h2[:, None]) & self.mask
+
+    def fill(self):
+        """Fraction of filter bits set."""
+        return int(np.bitwise_count(self.words).sum()) / (len(self.words) * 64)
+
+    def update(self, row_hashes):
+        """Fold a chunk's uint64 row hashes into the estimate."""
+        unique = np.unique(row_hashes)
+        self.count += len(row_hashes) - len(unique)
+        if not len(unique):
+            return
+        pos  = self._positions(unique)
+        word = pos >> np.uint64(6)
+        bit  = np.uint64(1) << (pos & np.uint64(63))
+        seen = ((self.words[word] & bit) != 0).all(axis=1)
+        # New rows pass unflagged with probability 1 - p, so about
+        # unflagged * p / (1 - p) of the flagged ones are false
+        p = min(self.fill() ** self.hashes, 0.999)
+        self.expected_error += int((~seen).sum()) * p / (1 - p)
+        self.count += int(seen.sum())
+        np.bitwise_or.at(self.words, word.ravel(), bit.ravel())
+
+
+def correlation_values(chunk):
+    """``CORR_COLS`` of a PaySim chunk as an (n, 14) float array.
+
+    Types use the fixed PaySim encoding, like ``paysim_encoder``; raises
+    ValueError for any other transaction type.
+    """
+    cols = {c: chunk[c].to_numpy(dtype=np.float64) for c in RAW_NUMERIC_COLS}
+    _derive(cols)
+    codes = pd.Categorical(chunk["type"], categories=PAYSIM_TYPES).codes
+    if (codes < 0).any():
+        raise ValueError("transaction types outside the PaySim set")
+    cols["type_encoded"] = codes
+    cols["isFraud"] = chunk["isFraud"].to_numpy()
+    out = np.empty((len(chunk), len(CORR_COLS)))
+    for j, c in enumerate(CORR_COLS):
+        out[:, j] = cols[c]
+    return out
+
+
+def _reservoir_update(sample, seen, values, k, rng):
+    """Algorithm R over a block of rows; returns the updated sample array."""
+    n = len(values)
+    if sample is None:
+        sample = np.empty((0, values.shape[1]))
+    take = max(0, min(k - len(sample), n))
+    if take:
+        sample = np.vstack([sample, values[:take]])
+    rest = np.arange(seen + take, seen + n)
+    if len(rest):
+        slots  = rng.integers(0, rest + 1)
+        accept = slots < k
+        sample[slots[accept]] = values[take:][accept]
+    return sample
+
+
+def summarize_chunks(chunks, sample_rows=QUANTILE_SAMPLE_ROWS, head_rows=25, seed=42,
+                     correlation=True):
+    """Build the Data Intelligence summary from an iterable of DataFrame chunks.
+
+    Only one chunk plus the aggregates is alive at a time. ``duplicates`` is
+    a ``DuplicateFilter`` estimate (fixed 32 MiB) that can only over-count;
+    ``duplicates_error`` is the expected number of false duplicates in it.
+    Quantiles in ``describe`` come from a uniform row sample and are exact
+    while the file has at most ``sample_rows`` rows; every other statistic
+    is exact.
+    ``correlation`` is the ``CORR_COLS`` matrix, or None if it was not asked
+    for or the file is not PaySim-shaped.
+    """
+    rng = np.random.default_rng(seed)
+    rows = 0
+    head = None
+    dtypes = None
+    missing = None
+    moments = None
+    num_cols = None
+    sample = None
+    class_counts = pd.Series(dtype="int64")
+    duplicates = DuplicateFilter()
+    memory_bytes = 0
+    corr = None
+
+    for chunk in chunks:
+        if head is None:
+            head     = chunk.head(head_rows).copy()
+            dtypes   = chunk.dtypes.astype(str)
+            missing  = pd.Series(0, index=chunk.columns, dtype="int64")
+            num_cols = chunk.select_dtypes("number").columns.tolist()
+            moments  = RunningMoments(num_cols)
+            if correlation and {*RAW_NUMERIC_COLS, "type", "isFraud"} <= set(chunk.columns):
+                corr = RunningCorrelation(CORR_COLS)
+
+        missing = missing.add(chunk.isnull().sum(), fill_value=0).astype("int64")
+        memory_bytes += int(chunk.memory_usage(deep=True).sum())
+
+        values = chunk[num_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        moments.update(values)
+        sample = _reservoir_update(sample, rows, values, sample_rows, rng)
+
+        if "isFraud" in chunk:
+            class_counts = class_counts.add(chunk["isFraud"].value_counts(), fill_value=0)
+
+        if corr is not None:
+            try:
+                corr.update(correlation_values(chunk))
+            except ValueError:
+                corr = None
+
+        duplicates.update(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+
+        rows += len(chunk)
+
+    if head is None:
+        raise ValueError("dataset is empty")
+
+    quant = (np.nanpercentile(sample, [25, 50, 75], axis=0)
+             if len(sample) else np.full((3, len(num_cols)), np.nan))
+    describe = pd.DataFrame(
+        [moments.count, moments.mean, moments.std(),
+         np.where(moments.count > 0, moments.min, np.nan),
+         quant[0], quant[1], quant[2],
+         np.where(moments.count > 0, moments.max, np.nan)],
+        index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+        columns=num_cols,
+    )
+
+    return {
+        "rows":         rows,
+        "columns":      list(head.columns),
+        "dtypes":       dtypes,
+        "missing":      missing,
+        "duplicates":   duplicates.count,
+        "duplicates_error": duplicates.expected_error,
+        "describe":     describe,
+        "class_counts": class_counts.astype("int64").sort_index(),
+        "head":         head,
+        "memory_bytes": memory_bytes,
+        "correlation":  corr.corr() if corr is not None else None,
+    }
+
+
+def summarize_csv(source, chunksize=CHUNK_ROWS, **kwargs):
+    """Stream ``source`` (path or file-like) and return its summary."""
+    return summarize_chunks(read_csv_chunks(source, chunksize), **kwargs)
+
+
+def summarize_frame(df, **kwargs):
+    """Summary of an in-memory DataFrame, in the same shape as ``summarize_csv``.
+
+    The correlation matrix is left out by default: loaded datasets keep it
+    with the dataset cache (``dataset_cache.load_correlation``).
+    """
+    kwargs.setdefault("correlation", False)
+    return summarize_chunks([df], **kwargs)
@@ -0,0 +1,87 @@
+"""Local load generator for scoring_service.py.
+
+    python loadgen.py --url http://127.0.0.1:8000/score -c 64 -n 20000
+
+Opens ``-c`` keep-alive connections, each sending requests back to back,
+and reports throughput and latency percentiles. Payloads are rows of
+Fraud_Analysis_Dataset.csv (or ``--data``).
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+_RAW_FIELDS = ["step", "type", "amount", "oldbalanceOrg", "newbalanceOrig",
+               "oldbalanceDest", "newbalanceDest"]
+_CONTENT_LENGTH = re.compile(rb"content-length:\s*(\d+)", re.I)
+
+
+async def _client(host, port, path, payloads, n, offset, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(n):
+            body = payloads[(offset + i) % len(payloads)]
+            request = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+                       f"Content-Type: application/json\r\n"
+                       f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+            t0 = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            await reader.readexactly(int(_CONTENT_LENGTH.search(head).group(1)))
+            latencies.append(time.perf_counter() - t0)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(head.split(b"\r\n", 1)[0].decode())
+    finally:
+        writer.close()
+
+
+async def run_load(url, payloads, concurrency, total):
+    """Drive ``total`` requests over ``concurrency`` connections; returns a report dict."""
+    parts = urlsplit(url)
+    latencies, errors = [], []
+    per_client = [total // concurrency + (i < total % concurrency) for i in range(concurrency)]
+    t0 = time.perf_counter()
+    await asyncio.gather(*[
+        _client(parts.hostname, parts.port or 80, parts.path or "/", payloads,
+                n, sum(per_client[:i]), latencies, errors)
+        for i, n in enumerate(per_client) if n
+    ])
+    elapsed = time.perf_counter() - t0
+    lat_ms = np.array(latencies) * 1e3
+    return {
+        "requests":    len(latencies),
+        "errors":      len(errors),
+        "seconds":     elapsed,
+        "req_per_sec": len(latencies) / elapsed,
+        "p50_ms":      float(np.percentile(lat_ms, 50)),
+        "p99_ms":      float(np.percentile(lat_ms, 99)),
+    }
+
+
+def main(argv=None):
+    default_data = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "Fraud_Analysis_Dataset.csv")
+    parser = argparse.ArgumentParser(description="Load-test the scoring service")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/score")
+    parser.add_argument("-c", "--concurrency", type=int, default=64)
+    parser.add_argument("-n", "--requests", type=int, default=20000)
+    parser.add_argument("--data", default=default_data, help="CSV to draw payloads from")
+    args = parser.parse_args(argv)
+
+    rows = pd.read_csv(args.data, nrows=5000, usecols=_RAW_FIELDS).to_dict("records")
+    payloads = [json.dumps(r).encode() for r in rows]
+    report = asyncio.run(run_load(args.url, payloads, args.concurrency, args.requests))
+    print(f"{report['requests']:,} requests in {report['seconds']:.2f}s — "
+          f"{report['req_per_sec']:,.0f} req/s, p50 {report['p50_ms']:.2f} ms, "
+          f"p99 {report['p99_ms']:.2f} ms, {report['errors']} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Asyncio micro-batcher in front of a vectorized predict function.
+
+Callers ``await batcher.submit(row)``; the batcher collects rows until it
+has ``max_batch`` of them or the oldest has waited ``max_wait_ms``, scores
+them as one matrix and fans the results back out. The queue is bounded by
+``max_queue`` (``submit`` raises ``asyncio.QueueFull`` beyond it) and
+queue-time, end-to-end latency and batch-size histograms are kept for
+``stats()``.
+"""
+import asyncio
+import time
+
+import numpy as np
+
+DEFAULT_MAX_BATCH   = 256
+DEFAULT_MAX_WAIT_MS = 2.0
+DEFAULT_MAX_QUEUE   = 10_000
+DEFAULT_SLO_MS      = 10.0
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000]
+
+
+class Histogram:
+    """Fixed-bucket histogram; the last bucket catches everything above ``bounds``."""
+
+    def __init__(self, bounds):
+        self.bounds = np.asarray(bounds, dtype=float)
+        self.counts = np.zeros(len(bounds) + 1, dtype=np.int64)
+        self.total  = 0.0
+
+    def observe_many(self, values):
+        values = np.asarray(values, dtype=float)
+        np.add.at(self.counts, np.searchsorted(self.bounds, values, side="left"), 1)
+        self.total += float(values.sum())
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding quantile ``q`` (inf for the overflow bucket)."""
+        if not self.count:
+            return float("nan")
+        i = int(np.searchsorted(np.cumsum(self.counts), q * self.count, side="left"))
+        return float(self.bounds[i]) if i < len(self.bounds) else float("inf")
+
+    def snapshot(self):
+        """JSON-safe summary; non-finite values (empty / overflow) become ``None``."""
+        labels = [f"<={b:g}" for b in self.bounds] + [f">{self.bounds[-1]:g}"]
+        finite = lambda v: v if np.isfinite(v) else None
+        return {
+            "buckets": dict(zip(labels, self.counts.tolist())),
+            "count":   self.count,
+            "mean":    finite(self.total / self.count) if self.count else None,
+            "p50":     finite(self.quantile(0.50)),
+            "p99":     finite(self.quantile(0.99)),
+        }
+
+
+class MicroBatcher:
+    """Batches single feature rows for ``predict(X) -> 1-D array``.
+
+    ``predict`` runs in ``executor`` (default thread pool) so the event loop
+    keeps accepting requests while a batch is being scored. ``run()`` must be
+    running as a task for submissions to complete.
+    """
+
+    def __init__(self, predict, n_features, max_batch=DEFAULT_MAX_BATCH,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, max_queue=DEFAULT_MAX_QUEUE,
+                 slo_ms=DEFAULT_SLO_MS, executor=None):
+        self.predict     = predict
+        self.max_batch   = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.max_queue   = max_queue
+        self.slo_ms      = slo_ms
+        self.executor    = executor
+        self.queue       = asyncio.Queue(maxsize=max_queue)
+        self._buf        = np.empty((max_batch, n_features), dtype=np.float32)
+        self.queue_ms    = Histogram(LATENCY_BUCKETS_MS)
+        self.latency_ms  = Histogram(LATENCY_BUCKETS_MS)
+        self.batch_size  = Histogram([2 ** i for i in range(max_batch.bit_length())])
+        self.rejected    = 0
+        self.slo_misses  = 0
+
+    async def submit(self, row):
+        """Score one row; raises ``asyncio.QueueFull`` when ``max_queue`` is reached."""
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((row, time.perf_counter(), fut))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        return await fut
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        first = await self.queue.get()
+        batch = [first]
+        deadline = loop.time() + self.max_wait_ms / 1000 - (time.perf_counter() - first[1])
+        while len(batch) < self.max_batch:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            n = len(batch)
+            enqueued = np.fromiter((t for _, t, _ in batch), float, n)
+            for i, (row, _, _) in enumerate(batch):
+                self._buf[i] = row
+            self.queue_ms.observe_many((time.perf_counter() - enqueued) * 1e3)
+            self.batch_size.observe_many([n])
+            try:
+                probs = await loop.run_in_executor(self.executor, self.predict, self._buf[:n])
+            except Exception as e:
+                for _, _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            latency = (time.perf_counter() - enqueued) * 1e3
+            self.latency_ms.observe_many(latency)
+            self.slo_misses += int((latency > self.slo_ms).sum())
+            for (_, _, fut), p in zip(batch, probs.tolist()):
+                if not fut.done():
+                    fut.set_result(p)
+
+    def stats(self):
+        served = self.latency_ms.count
+        return {
+            "config": {"max_batch": self.max_batch, "max_wait_ms": self.max_wait_ms,
+                       "max_queue": self.max_queue, "slo_ms": self.slo_ms},
+            "queue_depth":    self.queue.qsize(),
+            "rejected":       self.rejected,
+            "served":         served,
+            "slo_attainment": 1 - self.slo_misses / served if served else None,
+            "queue_ms":       self.queue_ms.snapshot(),
+            "latency_ms":     self.latency_ms.snapshot(),
+            "batch_size":     self.batch_size.snapshot(),
+        }
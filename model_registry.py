@@ -0,0 +1,182 @@
+"""On-disk model registry shared by fdapp.py, xgfdapp.py and the headless scorers.
+
+Each trained model gets a directory under ``REGISTRY_DIR``::
+
+    models/<model_id>/model.ubj    booster in XGBoost's UBJSON format
+    models/<model_id>/meta.json    type classes, FEATURE_COLS, params, metrics,
+                                   dataset hash, training source, and the
+                                   decision threshold once one is chosen
+    models/<model_id>/<name>.npz   optional artifacts (e.g. evaluation arrays)
+
+``load_model()`` returns the pinned model if ``models/PINNED`` exists and
+the newest one trained on a dataset otherwise; models without a dataset
+hash are only served when asked for by id.
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+
+from features import FEATURE_COLS, encoder_from_classes
+
+REGISTRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+_MODEL_FILE = "model.ubj"
+_META_FILE  = "meta.json"
+_PIN_FILE   = "PINNED"
+
+DEFAULT_THRESHOLD = 0.5
+
+
+def _jsonable(value):
+    """Convert NumPy scalars/arrays nested in ``value`` to plain JSON types."""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def save_model(model, type_classes, params, metrics, dataset_hash,
+               source="xgfdapp", artifacts=None, registry_dir=REGISTRY_DIR):
+    """Persist ``model`` and its metadata; returns the new ``model_id``.
+
+    ``artifacts`` maps a name to a dict of arrays saved as ``<name>.npz``.
+    The directory is written under a temporary name and renamed into place,
+    so readers never see a half-written model.
+    """
+    model_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    tmp = os.path.join(registry_dir, f".{model_id}.tmp")
+    os.makedirs(tmp)
+    try:
+        model.save_model(os.path.join(tmp, _MODEL_FILE))
+        meta = {
+            "model_id":     model_id,
+            "created":      time.time(),
+            "source":       source,
+            "dataset_hash": dataset_hash,
+            "feature_cols": list(FEATURE_COLS),
+            "type_classes": list(type_classes),
+            "params":       _jsonable(params),
+            "metrics":      _jsonable(metrics),
+        }
+        with open(os.path.join(tmp, _META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+        for name, arrays in (artifacts or {}).items():
+            np.savez(os.path.join(tmp, f"{name}.npz"), **arrays)
+        os.replace(tmp, os.path.join(registry_dir, model_id))
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return model_id
+
+
+def list_models(registry_dir=REGISTRY_DIR):
+    """Metadata of every registered model, newest first."""
+    if not os.path.isdir(registry_dir):
+        return []
+    metas = []
+    for name in os.listdir(registry_dir):
+        path = os.path.join(registry_dir, name, _META_FILE)
+        if not name.startswith(".") and os.path.isfile(path):
+            with open(path) as f:
+                metas.append(json.load(f))
+    return sorted(metas, key=lambda m: m["model_id"], reverse=True)
+
+
+def pinned_model_id(registry_dir=REGISTRY_DIR):
+    try:
+        with open(os.path.join(registry_dir, _PIN_FILE)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def pin_model(model_id, registry_dir=REGISTRY_DIR):
+    """Pin ``model_id`` so ``load_model()`` serves it; ``None`` unpins."""
+    path = os.path.join(registry_dir, _PIN_FILE)
+    if model_id is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    if not os.path.isfile(os.path.join(registry_dir, model_id, _META_FILE)):
+        raise FileNotFoundError(f"no registered model {model_id!r}")
+    with open(path, "w") as f:
+        f.write(model_id)
+
+
+def resolve_model_id(model_id=None, require_dataset=True, registry_dir=REGISTRY_DIR):
+    """Explicit id, else the pinned model, else the newest one.
+
+    With ``require_dataset`` (the default) the newest model trained on a
+    real dataset is used; models without a dataset hash are skipped unless
+    named or pinned.
+    """
+    model_id = model_id or pinned_model_id(registry_dir)
+    if model_id:
+        return model_id
+    for meta in list_models(registry_dir):
+        if meta["dataset_hash"] or not require_dataset:
+            return meta["model_id"]
+    kind = "dataset-trained models" if require_dataset else "models"
+    raise FileNotFoundError(f"no registered {kind} in {registry_dir}")
+
+
+def load_meta(model_id, registry_dir=REGISTRY_DIR):
+    with open(os.path.join(registry_dir, model_id, _META_FILE)) as f:
+        return json.load(f)
+
+
+def update_meta(model_id, registry_dir=REGISTRY_DIR, **fields):
+    """Merge ``fields`` into a registered model's metadata."""
+    meta = load_meta(model_id, registry_dir)
+    meta.update(_jsonable(fields))
+    path = os.path.join(registry_dir, model_id, _META_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(path + ".tmp", path)
+    return meta
+
+
+def decision_threshold(meta):
+    """The model's stored decision threshold (see thresholds.py), else 0.5."""
+    return meta.get("threshold", DEFAULT_THRESHOLD)
+
+
+def save_artifact(model_id, name, arrays, registry_dir=REGISTRY_DIR):
+    """Add (or replace) the ``<name>.npz`` artifact of an existing model."""
+    path = os.path.join(registry_dir, model_id, f"{name}.npz")
+    tmp = os.path.join(registry_dir, model_id, f".{name}.tmp.npz")
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+    return path
+
+
+def load_artifact(model_id, name, registry_dir=REGISTRY_DIR):
+    """Arrays saved under ``name``, or ``None`` if the model has no such artifact."""
+    path = os.path.join(registry_dir, model_id, f"{name}.npz")
+    if not os.path.isfile(path):
+        return None
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
+
+
+def load_model(model_id=None, require_dataset=True, registry_dir=REGISTRY_DIR):
+    """Return ``(model, le, meta)`` for the resolved model id."""
+    model_id = resolve_model_id(model_id, require_dataset, registry_dir)
+    meta = load_meta(model_id, registry_dir)
+    if meta["feature_cols"] != FEATURE_COLS:
+        raise ValueError(f"model {model_id} was trained on different features: "
+                         f"{meta['feature_cols']}")
+    from xgboost import XGBClassifier   # keeps metadata-only callers free of xgboost
+
+    model = XGBClassifier()
+    model.load_model(os.path.join(registry_dir, model_id, _MODEL_FILE))
+    return model, encoder_from_classes(meta["type_classes"]), meta
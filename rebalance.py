@@ -0,0 +1,115 @@
+"""Class-rebalancing modes for the Model Training page.
+
+``rebalance`` applies one of ``REBALANCE_MODES`` to the training split and
+measures it: wall time and peak Python-side allocation (tracemalloc, which
+covers NumPy and pandas buffers). ``ratio`` is the target minority/majority
+ratio in every mode, matching SMOTE's ``sampling_strategy``.
+
+- SMOTE: imblearn's ``fit_resample``.
+- SMOTE (streamed): the same interpolation, but the output matrix is
+  allocated once and synthetic rows are written into it in batches.
+- Undersample majority: keeps every fraud row and a random subset of the
+  rest, so the training matrix shrinks instead of growing.
+- Class weights: no new rows; fraud rows get a sample weight of
+  ``ratio * n_legit / n_fraud``.
+"""
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import NearestNeighbors
+
+from training import smote_balance
+
+REBALANCE_MODES = ["SMOTE", "SMOTE (streamed)", "Undersample majority", "Class weights", "None"]
+
+
+def smote_streamed(X, y, ratio, k_neighbors=5, batch_rows=50_000, seed=42):
+    """SMOTE without intermediate copies; returns ``(X_res, y_res)`` like imblearn.
+
+    A single minority row has no neighbour to interpolate towards, so it is
+    repeated instead (random oversampling); with no minority rows at all
+    there is nothing to synthesise from and ValueError is raised.
+    """
+    X_arr = np.asarray(X, dtype=np.float32)
+    y_arr = np.asarray(y)
+    minority = X_arr[y_arr == 1]
+    n_syn = max(0, int(ratio * (y_arr == 0).sum()) - len(minority))
+    n = len(X_arr)
+
+    out = np.empty((n + n_syn, X_arr.shape[1]), dtype=np.float32)
+    out[:n] = X_arr
+    if n_syn:
+        if not len(minority):
+            raise ValueError("cannot oversample: the training split has no fraud rows")
+        k = min(k_neighbors, len(minority) - 1)
+        if k:
+            nn = NearestNeighbors(n_neighbors=k + 1).fit(minority)
+            neighbors = nn.kneighbors(minority, return_distance=False)[:, 1:]
+        rng = np.random.default_rng(seed)
+        for start in range(n, n + n_syn, batch_rows):
+            b = min(batch_rows, n + n_syn - start)
+            base = rng.integers(0, len(minority), b)
+            if not k:
+                out[start:start + b] = minority[base]
+                continue
+            other = neighbors[base, rng.integers(0, k, b)]
+            gap = rng.random((b, 1), dtype=np.float32)
+            x = minority[base]
+            out[start:start + b] = x + gap * (minority[other] - x)
+    y_out = np.concatenate([y_arr, np.ones(n_syn, dtype=y_arr.dtype)])
+
+    columns = X.columns if isinstance(X, pd.DataFrame) else None
+    return (pd.DataFrame(out, columns=columns, copy=False),
+            pd.Series(y_out, name=getattr(y, "name", None)))
+
+
+def undersample_majority(X, y, ratio, seed=42):
+    """All minority rows plus ``n_fraud / ratio`` randomly chosen majority rows."""
+    y_arr = np.asarray(y)
+    pos = np.flatnonzero(y_arr == 1)
+    neg = np.flatnonzero(y_arr == 0)
+    keep_neg = min(len(neg), int(len(pos) / ratio))
+    rng = np.random.default_rng(seed)
+    idx = np.sort(np.r_[pos, rng.choice(neg, keep_neg, replace=False)])
+    return X.iloc[idx], y.iloc[idx]
+
+
+def class_weights(y, ratio):
+    """Per-row weights giving fraud rows ``ratio`` times the legit rows' total weight."""
+    y_arr = np.asarray(y)
+    n_pos = max(int((y_arr == 1).sum()), 1)
+    w_pos = ratio * (y_arr == 0).sum() / n_pos
+    return np.where(y_arr == 1, w_pos, 1.0).astype(np.float32)
+
+
+def rebalance(X, y, mode, ratio, seed=42):
+    """Apply ``mode``; returns ``(X_bal, y_bal, sample_weight, stats)``.
+
+    ``sample_weight`` is ``None`` except for "Class weights". ``stats`` has
+    the mode, seconds, peak MB allocated and rows in / out.
+    """
+    weights = None
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        if mode == "SMOTE":
+            X_bal, y_bal = smote_balance(X, y, ratio, seed)
+        elif mode == "SMOTE (streamed)":
+            X_bal, y_bal = smote_streamed(X, y, ratio, seed=seed)
+        elif mode == "Undersample majority":
+            X_bal, y_bal = undersample_majority(X, y, ratio, seed)
+        elif mode == "Class weights":
+            X_bal, y_bal, weights = X, y, class_weights(y, ratio)
+        elif mode == "None":
+            X_bal, y_bal = X, y
+        else:
+            raise ValueError(f"unknown rebalancing mode {mode!r}")
+        seconds = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    stats = {"mode": mode, "ratio": ratio, "seconds": seconds,
+             "peak_mb": peak / 2 ** 20, "rows_in": len(y), "rows_out": len(y_bal)}
+    return X_bal, y_bal, weights, stats
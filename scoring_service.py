@@ -0,0 +1,197 @@
+"""Async HTTP scoring service for registered fraud models.
+
+    python scoring_service.py [--model MODEL_ID] [--port 8000] [--workers 4] [--compiled]
+                              [--dataset history.csv]
+
+Endpoints (same raw PaySim fields as the Transaction Scan form)::
+
+    GET  /health         model id and batching settings
+    GET  /metrics        queue-time / latency / batch-size histograms, SLO attainment
+    POST /score          one JSON transaction → {"fraud_probability", "prediction"}
+    POST /score/batch    JSON array, or NDJSON with Content-Type application/x-ndjson
+    GET  /accounts/{id}  the account's transactions in --dataset (?direction=sent|received,
+                         ?limit=N most recent); looked up through account_index.py
+
+Concurrent ``/score`` requests arriving within ``max_wait_ms`` of each other
+share one booster call (see microbatch.py); when more than ``max_queue``
+requests are waiting, new ones get 503. Each worker process loads its own
+copy of the model, so throughput scales with ``--workers``; inference runs
+in a thread pool (XGBoost releases the GIL) so the event loop keeps
+accepting requests. With ``--compiled`` the model's NumPy-only artifact
+(see compiled_model.py) is served instead and xgboost is never imported,
+which shortens worker start-up; it suits small batches.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import model_registry
+from features import FEATURE_COLS, records_matrix
+from microbatch import (
+    MicroBatcher, DEFAULT_MAX_BATCH, DEFAULT_MAX_QUEUE, DEFAULT_MAX_WAIT_MS, DEFAULT_SLO_MS
+)
+
+
+def _bad_request(e):
+    msg = f"missing field {e.args[0]!r}" if isinstance(e, KeyError) else str(e)
+    return JSONResponse({"error": msg}, status_code=400)
+
+
+def create_app(model_id=None, max_batch=None, max_wait_ms=None, max_queue=None,
+               slo_ms=None, threshold=None, compiled=None, dataset=None):
+    """Build the Starlette app; unset options fall back to ``SF_*`` env vars.
+
+    ``threshold`` defaults to the threshold stored with the model (0.5 if none).
+    """
+    env = os.environ.get
+    model_id    = model_id or env("SF_MODEL_ID") or None
+    max_batch   = max_batch or int(env("SF_MAX_BATCH", DEFAULT_MAX_BATCH))
+    max_wait_ms = max_wait_ms or float(env("SF_MAX_WAIT_MS", DEFAULT_MAX_WAIT_MS))
+    max_queue   = max_queue or int(env("SF_MAX_QUEUE", DEFAULT_MAX_QUEUE))
+    slo_ms      = slo_ms or float(env("SF_SLO_MS", DEFAULT_SLO_MS))
+    compiled    = compiled if compiled is not None else env("SF_COMPILED") == "1"
+    dataset     = dataset or env("SF_DATASET") or None
+
+    if compiled:
+        from compiled_model import load_compiled
+
+        scorer, meta = load_compiled(model_id)
+        le = scorer.le
+    else:
+        model, le, meta = model_registry.load_model(model_id)
+        scorer = model.get_booster()
+    if threshold is None:
+        threshold = model_registry.decision_threshold(meta)
+    history = index = None
+    if dataset:
+        from account_index import load_index
+        from dataset_cache import load_dataset
+
+        key, history = load_dataset(dataset)
+        index = load_index(key, history)
+
+    def predict(X):
+        return scorer.inplace_predict(X)
+
+    batcher = None   # created inside the server's event loop (lifespan)
+
+    def result(p):
+        return {"fraud_probability": p, "prediction": int(p >= threshold)}
+
+    async def health(request):
+        return JSONResponse({"status": "ok", "model_id": meta["model_id"], "threshold": threshold,
+                             "compiled": compiled,
+                             **batcher.stats()["config"]})
+
+    async def metrics(request):
+        return JSONResponse(batcher.stats())
+
+    async def score(request):
+        try:
+            record = await request.json()
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object of transaction fields "
+                                 "(use /score/batch for arrays)")
+            row = records_matrix([record], le)[0]
+        except (KeyError, ValueError, TypeError) as e:
+            return _bad_request(e)
+        try:
+            p = await batcher.submit(row)
+        except asyncio.QueueFull:
+            return JSONResponse({"error": "scoring queue full"}, status_code=503,
+                                headers={"Retry-After": "1"})
+        return JSONResponse(result(p))
+
+    async def score_batch(request):
+        ndjson = "ndjson" in request.headers.get("content-type", "")
+        body = await request.body()
+        try:
+            records = ([json.loads(line) for line in body.splitlines() if line.strip()]
+                       if ndjson else json.loads(body))
+            if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+                raise ValueError("expected a JSON array of transaction objects")
+            X = records_matrix(records, le)
+        except (KeyError, ValueError, TypeError) as e:
+            return _bad_request(e)
+        probs = await asyncio.get_running_loop().run_in_executor(None, predict, X) if len(X) else []
+        results = [result(float(p)) for p in probs]
+        if ndjson:
+            return Response("".join(json.dumps(r) + "\n" for r in results),
+                            media_type="application/x-ndjson")
+        return JSONResponse(results)
+
+    async def accounts(request):
+        if index is None:
+            return JSONResponse({"error": "no --dataset loaded"}, status_code=404)
+        direction = request.query_params.get("direction", "both")
+        if direction not in ("both", "sent", "received"):
+            return _bad_request(ValueError("direction must be both, sent or received"))
+        try:
+            limit = int(request.query_params.get("limit", 100))
+            if limit < 0:
+                raise ValueError
+        except ValueError:
+            return _bad_request(ValueError("limit must be a non-negative integer"))
+        hits = index.lookup(history, request.path_params["account"], direction)
+        return JSONResponse({"account": request.path_params["account"], "count": len(hits),
+                             "transactions": json.loads(hits.tail(limit).to_json(orient="records"))})
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        nonlocal batcher
+        batcher = MicroBatcher(predict, len(FEATURE_COLS), max_batch=max_batch,
+                               max_wait_ms=max_wait_ms, max_queue=max_queue, slo_ms=slo_ms)
+        task = asyncio.create_task(batcher.run())
+        yield
+        task.cancel()
+
+    return Starlette(routes=[
+        Route("/health", health),
+        Route("/metrics", metrics),
+        Route("/score", score, methods=["POST"]),
+        Route("/score/batch", score_batch, methods=["POST"]),
+        Route("/accounts/{account}", accounts),
+    ], lifespan=lifespan)
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve a registered fraud model over HTTP")
+    parser.add_argument("--model", help="registry model id (default: pinned/newest)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes, each with its own model copy")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help="waiting requests beyond this get 503")
+    parser.add_argument("--slo-ms", type=float, default=DEFAULT_SLO_MS,
+                        help="end-to-end latency target reported by /metrics")
+    parser.add_argument("--compiled", action="store_true",
+                        help="serve the NumPy-only artifact from compiled_model.py export")
+    parser.add_argument("--dataset", help="PaySim CSV whose transactions /accounts/{id} returns")
+    args = parser.parse_args(argv)
+
+    # Worker processes re-import this module, so settings travel via the environment
+    os.environ["SF_MODEL_ID"] = model_registry.resolve_model_id(args.model)
+    os.environ["SF_MAX_BATCH"] = str(args.max_batch)
+    os.environ["SF_MAX_WAIT_MS"] = str(args.max_wait_ms)
+    os.environ["SF_MAX_QUEUE"] = str(args.max_queue)
+    os.environ["SF_SLO_MS"] = str(args.slo_ms)
+    os.environ["SF_COMPILED"] = "1" if args.compiled else "0"
+    if args.dataset:
+        os.environ["SF_DATASET"] = os.path.abspath(args.dataset)
+    uvicorn.run("scoring_service:create_app", factory=True, host=args.host,
+                port=args.port, workers=args.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Cold-start import profile for the Streamlit apps.
+
+    python startup_bench.py                     # both apps, landing page
+    python startup_bench.py xgfdapp.py --top 15 --budget 1.5
+
+Each app's first page load is run in a fresh interpreter under
+``python -X importtime`` through Streamlit's ``AppTest``, the same way a new
+server process renders it. Only imports made while the script runs are
+counted (Streamlit itself is already loaded in a serving process). The report
+lists the slowest top-level imports and the run's wall time, and the exit
+status is non-zero if a landing page imports the training stack
+(``HEAVY_MODULES``) or the script's import time exceeds ``--budget`` seconds.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+APPS = ["xgfdapp.py", "fdapp.py"]
+
+# Only the pages that train or score may import these
+HEAVY_MODULES = ["xgboost", "sklearn", "imblearn"]
+
+_MARKER = "-- startup_bench: script run --"
+
+_CHILD = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+print({marker!r}, file=sys.stderr, flush=True)
+t0 = time.perf_counter()
+at.run()
+wall = time.perf_counter() - t0
+print(json.dumps({{"wall": wall, "errors": [e.value for e in at.exception],
+                  "modules": sorted(m for m in sys.modules if "." not in m)}}))
+"""
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(stderr):
+    """Top-level ``(module, cumulative_seconds)`` imported after the marker, slowest first."""
+    _, _, tail = stderr.partition(_MARKER)
+    top = []
+    for line in tail.splitlines():
+        m = _LINE.match(line)
+        if m and len(m.group(3)) == 1:   # one space: not nested under another import
+            top.append((m.group(4), int(m.group(2)) / 1e6))
+    return sorted(top, key=lambda t: -t[1])
+
+
+def profile_app(app):
+    """Render ``app``'s first page in a fresh interpreter; returns a result dict."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD.format(app=app, marker=_MARKER)],
+        cwd=here, capture_output=True, text=True, check=True)
+    run = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(proc.stderr)
+    return {
+        "app":            app,
+        "wall_seconds":   run["wall"],
+        "import_seconds": sum(s for _, s in imports),
+        "imports":        imports,
+        "heavy":          [m for m in HEAVY_MODULES if m in run["modules"]],
+        "errors":         run["errors"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the apps' cold-start imports")
+    parser.add_argument("apps", nargs="*", default=APPS)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--budget", type=float,
+                        help="fail if a first page load spends more than this many seconds importing")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results, failures = [], []
+    for app in args.apps:
+        r = profile_app(app)
+        results.append(r)
+        print(f"{app}: first page {r['wall_seconds']:.2f}s, "
+              f"of which imports {r['import_seconds']:.2f}s")
+        for name, seconds in r["imports"][:args.top]:
+            print(f"  {seconds:>8.3f}s  {name}")
+        if r["errors"]:
+            failures.append(f"{app} raised: {r['errors'][0]}")
+        if r["heavy"]:
+            failures.append(f"{app} imports {', '.join(r['heavy'])} on its first page")
+        if args.budget is not None and r["import_seconds"] > args.budget:
+            failures.append(f"{app} imports took {r['import_seconds']:.2f}s "
+                            f"(budget {args.budget:.2f}s)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    for msg in failures:
+        print(f"FAIL: {msg}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BASE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "Fraud_Analysis_Dataset.csv")
+
+
+@pytest.fixture(scope="session")
+def base_csv():
+    return BASE_CSV
+
+
+@pytest.fixture(scope="session")
+def paysim():
+    """The bundled PaySim sample; treat as read-only."""
+    return pd.read_csv(BASE_CSV)
+
+
+@pytest.fixture(scope="session")
+def xy(paysim):
+    """Feature matrix and labels of the bundled sample (PaySim encoding)."""
+    from features import feature_matrix, paysim_encoder
+
+    return feature_matrix(paysim, paysim_encoder()), paysim["isFraud"].to_numpy(np.int8)
+
+
+@pytest.fixture(scope="session")
+def model(xy):
+    """Small XGBoost model fitted on the bundled sample."""
+    from xgboost import XGBClassifier
+
+    return XGBClassifier(n_estimators=20, max_depth=4, random_state=42, n_jobs=1).fit(*xy)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import account_index
+from account_index import AccountIndex
+
+
+def _scan(df, account, direction):
+    sent, received = df["nameOrig"] == account, df["nameDest"] == account
+    return df[{"sent": sent, "received": received, "both": sent | received}[direction]]
+
+
+def _accounts(df):
+    both = np.intersect1d(df["nameOrig"], df["nameDest"])
+    return [*df["nameOrig"].iloc[::2500], *df["nameDest"].iloc[::2500], *both[:3], "C_missing"]
+
+
+@pytest.mark.parametrize("direction", ["both", "sent", "received"])
+def test_lookup_matches_a_scan(paysim, tmp_path, direction):
+    account_index.load_index("k", paysim, cache_dir=tmp_path)
+    index = account_index.load_index("k", paysim, cache_dir=tmp_path)   # memory-mapped reopen
+    assert isinstance(index.table, np.memmap)
+    for account in _accounts(paysim):
+        hits = index.lookup(paysim, account, direction)
+        expected = _scan(paysim, account, direction)
+        assert hits.drop(columns="direction").equals(expected), account
+        assert (hits["direction"] == np.where(hits["nameOrig"] == account,
+                                              "sent", "received")).all()
+
+
+def test_hash_collisions_never_leak_rows(paysim, monkeypatch):
+    # Four buckets: every lookup sees a quarter of the dataset as candidates
+    monkeypatch.setattr(account_index, "account_keys",
+                        lambda names: np.asarray([hash(n) % 4 for n in names], dtype=np.uint64))
+    monkeypatch.setattr(account_index, "account_key", lambda name: np.uint64(hash(name) % 4))
+    index = AccountIndex.build(paysim)
+    for account in _accounts(paysim):
+        assert index.lookup(paysim, account).drop(columns="direction").equals(
+            _scan(paysim, account, "both"))
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics_cube import VALUE_COLS, box_stats, build_cube, density_sample
+
+
+@pytest.fixture(scope="module")
+def cube(paysim):
+    return build_cube(paysim, step_bucket=5)
+
+
+def test_rollups_match_groupby(cube, paysim):
+    expected = paysim.groupby("type")["isFraud"].agg(["size", "sum"])
+    by_type = cube.by_type()
+    assert by_type["count"].tolist() == expected["size"].tolist()
+    assert by_type["fraud"].tolist() == expected["sum"].tolist()
+    np.testing.assert_allclose(by_type["fraud_rate"], expected["sum"] / expected["size"] * 100)
+
+    by_step = cube.by_step().set_index("step")
+    grouped = paysim.assign(step=paysim["step"] // 5 * 5).groupby("step")
+    expected = pd.DataFrame({
+        "count": grouped.size(),
+        "fraud": grouped["isFraud"].sum(),
+        "fraud_amount": grouped.apply(lambda g: g["amount"][g["isFraud"] == 1].sum()),
+    }).reindex(by_step.index, fill_value=0)
+    assert by_step["count"].tolist() == expected["count"].tolist()
+    assert by_step["fraud"].tolist() == expected["fraud"].tolist()
+    np.testing.assert_allclose(by_step["fraud_amount"], expected["fraud_amount"])
+
+    assert cube.count.sum() == len(paysim)
+    np.testing.assert_allclose(cube.sums["amount"].sum(), paysim["amount"].sum())
+
+
+@pytest.mark.parametrize("col", VALUE_COLS)
+def test_histograms_match_numpy(cube, paysim, col):
+    edges, counts = cube.histogram(col)
+    expected, _ = np.histogram(paysim[col], bins=edges)
+    assert counts.sum() == len(paysim)
+    assert np.abs(counts - expected).sum() <= 2   # edge rounding only
+
+    sel = paysim[(paysim["type"] == "TRANSFER") & (paysim["isFraud"] == 1)]
+    _, counts = cube.histogram(col, types=["TRANSFER"], is_fraud=True)
+    assert counts.sum() == len(sel)
+
+
+def test_empty_dataset(paysim):
+    cube = build_cube(paysim.iloc[:0])
+    assert cube.by_type().empty and cube.by_step()["count"].sum() == 0
+    assert cube.histogram("amount")[1].sum() == 0
+    assert cube.box("amount", 1) is None
+
+
+def test_box_stats_match_numpy():
+    x = np.random.default_rng(0).lognormal(10, 1.5, 20_000)
+    box = box_stats(x, max_outliers=100)
+    q1, median, q3 = np.percentile(x, [25, 50, 75])
+    assert (box["q1"], box["median"], box["q3"]) == (q1, median, q3)
+    outside = (x < q1 - 1.5 * (q3 - q1)) | (x > q3 + 1.5 * (q3 - q1))
+    assert box["lowerfence"] == x[~outside].min() and box["upperfence"] == x[~outside].max()
+    assert box["n_outliers"] == outside.sum() > 100 and box["count"] == len(x)
+    assert len(box["outliers"]) == 100 and np.isin(box["outliers"], x[outside]).all()
+    assert box["outliers"].min() == x[outside].min() and box["outliers"].max() == x[outside].max()
+    assert box_stats([]) is None
+
+
+def test_cube_boxes_per_class(cube, paysim):
+    for f in (0, 1):
+        x = paysim.loc[paysim["isFraud"] == f, "amount"]
+        box = cube.box("amount", f)
+        assert box["count"] == len(x)
+        np.testing.assert_allclose([box["q1"], box["median"], box["q3"]],
+                                   np.percentile(x, [25, 50, 75]))
+
+
+def test_density_sample_keeps_every_fraud_row(paysim):
+    sample = density_sample(paysim, "oldbalanceOrg", "newbalanceOrig", grid=50)
+    fraud = paysim[paysim["isFraud"] == 1]
+    assert sample["rows"].sum() == len(paysim)
+    assert len(sample) < len(paysim)
+    kept = sample[sample["isFraud"] == 1]
+    assert len(kept) == len(fraud) and (kept["rows"] == 1).all()
+    assert sorted(zip(kept["oldbalanceOrg"], kept["newbalanceOrig"])) == \
+        sorted(zip(fraud["oldbalanceOrg"], fraud["newbalanceOrig"]))
+    assert sample["isFraud"].is_monotonic_increasing   # fraud drawn last, on top
+
+
+def test_density_sample_thins_a_large_minority(paysim):
+    sample = density_sample(paysim, "amount", "oldbalanceDest", grid=20, max_minority=100)
+    kept = sample[sample["isFraud"] == 1]
+    assert len(kept) < (paysim["isFraud"] == 1).sum()
+    assert kept["rows"].sum() == (paysim["isFraud"] == 1).sum()
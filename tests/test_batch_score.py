@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from batch_score import score_file, score_frame
+from features import feature_matrix, paysim_encoder
+
+
+def test_score_frame_matches_predict_proba_across_chunks(paysim, model):
+    le = paysim_encoder()
+    scored = score_frame(paysim, model, le, threshold=0.3, chunksize=1_000)
+    expected = model.predict_proba(feature_matrix(paysim, le))[:, 1]
+    np.testing.assert_allclose(scored["fraud_probability"], expected, rtol=1e-6)
+    np.testing.assert_array_equal(scored["prediction"], (expected >= 0.3).astype(np.int8))
+    pd.testing.assert_frame_equal(scored[paysim.columns], paysim)
+
+
+def test_score_frame_empty(paysim, model):
+    scored = score_frame(paysim.iloc[:0], model, paysim_encoder())
+    assert len(scored) == 0
+    assert {"fraud_probability", "prediction"} <= set(scored.columns)
+
+
+def test_score_file_streams_every_row(paysim, model, tmp_path):
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    paysim.head(2_500).to_csv(src, index=False)
+    summary = score_file(str(src), str(out), model, paysim_encoder(), chunksize=1_000)
+    written = pd.read_csv(out)
+    assert summary["rows"] == len(written) == 2_500
+    assert summary["flagged"] == int(written["prediction"].sum())
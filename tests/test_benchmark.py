@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import benchmark
+
+
+class _Recorder:
+    def __init__(self):
+        self.batches = []
+
+    def predict_proba(self, X):
+        self.batches.append(len(X))
+        return np.zeros((len(X), 2))
+
+
+@pytest.mark.parametrize("n_rows", [7, 250, 20_000])
+def test_every_scored_batch_is_full(n_rows):
+    X = pd.DataFrame({"a": np.arange(n_rows, dtype=float)})
+    model = _Recorder()
+    rates = benchmark.scoring_rates(model, X, batch_sizes=[1, 100, 10_000])
+    assert set(rates) == {1, 100, 10_000}
+    assert set(model.batches) == {1, 100, 10_000}
+    assert model.batches.count(1) == min(n_rows, benchmark._SCORE_ROWS[1])
+
+
+def test_resample_scales_each_row_by_one_factor(paysim):
+    base = paysim.assign(src=np.arange(len(paysim)))
+    df = benchmark.resample_paysim(base, 5000, seed=1)
+    orig = base.iloc[df["src"].to_numpy()]
+    assert (df["isFraud"].to_numpy() == orig["isFraud"].to_numpy()).all()
+    old = orig[benchmark._MONEY_COLS].to_numpy(np.float64)
+    new = df[benchmark._MONEY_COLS].to_numpy(np.float64)
+    nonzero = old != 0
+    assert (new[~nonzero] == 0).all()
+    ratios = np.divide(new, old, out=np.full(old.shape, np.nan), where=nonzero)
+    ratios = ratios[nonzero.any(axis=1)]
+    lo, hi = np.nanmin(ratios, axis=1), np.nanmax(ratios, axis=1)
+    assert (lo >= 0.9 - 1e-6).all() and (hi <= 1.1 + 1e-6).all()
+    np.testing.assert_allclose(lo, hi, rtol=1e-6)
+
+
+def test_split_happens_before_resampling(base_csv, monkeypatch):
+    bases = []
+    resample = benchmark.resample_paysim
+
+    def recording(base, n_rows, seed=42):
+        bases.append(base.index)
+        return resample(base, n_rows, seed)
+    monkeypatch.setattr(benchmark, "resample_paysim", recording)
+    X_train, y_train, X_test, y_test = benchmark.load_benchmark_data(3000, base_csv)
+    assert len(X_train) + len(X_test) == 3000 and len(X_test) == 600
+    train_idx, test_idx = bases
+    assert not train_idx.intersection(test_idx).size
+    assert train_idx.size + test_idx.size == len(pd.read_csv(base_csv, usecols=["step"]))
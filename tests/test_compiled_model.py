@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from xgboost import XGBClassifier
+
+import compiled_model
+import model_registry
+from features import PAYSIM_TYPES, feature_matrix, paysim_encoder
+
+
+def test_matches_the_booster(model, paysim):
+    X = feature_matrix(paysim, paysim_encoder())
+    compiled = compiled_model.CompiledModel(compiled_model.compile_booster(model.get_booster()),
+                                            PAYSIM_TYPES)
+    np.testing.assert_allclose(compiled.inplace_predict(X),
+                               model.get_booster().inplace_predict(X), rtol=1e-5, atol=1e-7)
+    np.testing.assert_allclose(compiled.predict_proba(X[0]), model.predict_proba(X[:1]),
+                               rtol=1e-5)
+
+
+def test_missing_values_follow_the_default_direction(xy):
+    X, y = xy
+    rng = np.random.default_rng(0)
+    X = X.copy()
+    X[rng.random(X.shape) < 0.2] = np.nan   # trained with NaNs, so both defaults occur
+    deep = XGBClassifier(n_estimators=30, max_depth=8, random_state=0, n_jobs=1).fit(X, y)
+    arrays = compiled_model.compile_booster(deep.get_booster())
+    assert arrays["default_left"].any() and not arrays["default_left"].all()
+    compiled = compiled_model.CompiledModel(arrays, PAYSIM_TYPES)
+    np.testing.assert_allclose(compiled.inplace_predict(X),
+                               deep.get_booster().inplace_predict(X), rtol=1e-5, atol=1e-7)
+
+
+def test_export_and_load(model, paysim, tmp_path):
+    model_id = model_registry.save_model(model, PAYSIM_TYPES, {}, {}, "abc",
+                                         registry_dir=tmp_path)
+    with pytest.raises(FileNotFoundError):
+        compiled_model.load_compiled(model_id, tmp_path)
+    compiled_model.export_model(model_id, tmp_path)
+    compiled, meta = compiled_model.load_compiled(model_id, tmp_path)
+    assert meta["model_id"] == model_id
+    records = paysim.head(20).to_dict(orient="records")
+    expected = model.predict_proba(feature_matrix(paysim.head(20), paysim_encoder()))[:, 1]
+    np.testing.assert_allclose(compiled.score_records(records), expected, rtol=1e-5)
+    with pytest.raises(ValueError, match="unknown transaction type"):
+        compiled.score_records([{**records[0], "type": "BARTER"}])
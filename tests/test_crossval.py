@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import crossval
+
+PARAMS = {"n_estimators": 20, "max_depth": 3}
+
+
+def test_folds_partition_the_rows_by_class(xy):
+    _, y = xy
+    folds = crossval._folds(y, 5, seed=42)
+    val = np.concatenate([v for _, v in folds])
+    assert np.array_equal(np.sort(val), np.arange(len(y)))
+    for train_idx, val_idx in folds:
+        assert not np.intersect1d(train_idx, val_idx).size
+        assert abs(y[val_idx].mean() - y.mean()) < 0.01
+
+
+def test_shared_block_round_trip():
+    arrays = {"X": np.arange(30, dtype=np.float32).reshape(10, 3), "y": np.arange(10, dtype=np.int8)}
+    shm, layout = crossval._to_shared(arrays)
+    try:
+        handle, views = crossval._attach(shm.name, layout)
+        for name, a in arrays.items():
+            assert layout[name][0] % 64 == 0
+            np.testing.assert_array_equal(views[name], a)
+            with pytest.raises(ValueError):
+                views[name][0] = 1
+        del views
+        handle.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_rebalancing_only_sees_the_training_fold(xy, monkeypatch):
+    X, y = xy
+    seen = []
+    rebalance = crossval.rebalance
+
+    def recording(X_tr, y_tr, *args):
+        seen.append(len(X_tr))
+        return rebalance(X_tr, y_tr, *args)
+    monkeypatch.setattr(crossval, "rebalance", recording)
+    crossval.run_fold(X, y, 0, 4, PARAMS, "SMOTE", 0.5, n_jobs=1)
+    assert seen == [len(crossval._folds(y, 4, 42)[0][0])]
+
+
+def test_parallel_matches_serial(xy):
+    X, y = xy
+    rows, _ = crossval.cross_validate(X, y, PARAMS, k=3, balance_mode="Class weights",
+                                      n_workers=3)
+    serial, _ = crossval.cross_validate_serial(X, y, PARAMS, k=3, balance_mode="Class weights")
+    assert [r["fold"] for r in rows] == [1, 2, 3]
+    pd.testing.assert_frame_equal(pd.DataFrame(rows).drop(columns="seconds"),
+                                  pd.DataFrame(serial).drop(columns="seconds"))
+    summary = crossval.summarize(rows)
+    assert summary.loc["ROC-AUC", "mean"] == pytest.approx(np.mean([r["ROC-AUC"] for r in rows]))
@@ -0,0 +1,113 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+import dataset_cache
+from dataset_cache import (_map_arrow, _paths, dataset_key, load_correlation, load_dataset,
+                           load_features)
+from features import FEATURE_COLS, engineer_features
+from ingest import CORR_COLS, correlation_values
+
+
+def _points_into_map(table, frame, col):
+    """True if ``frame[col]``'s NumPy buffer is the memory-mapped Arrow buffer."""
+    addresses = {chunk.buffers()[1].address for chunk in table.column(col).chunks}
+    return frame[col].to_numpy().__array_interface__["data"][0] in addresses
+
+
+def test_reload_is_equal_and_cached(base_csv, paysim, tmp_path):
+    key, first = load_dataset(base_csv, cache_dir=tmp_path)
+    raw_path = _paths(key, tmp_path)[0]
+    mtime = (tmp_path / raw_path).stat().st_mtime_ns
+    key2, again = load_dataset(base_csv, cache_dir=tmp_path)
+    assert key2 == key
+    assert (tmp_path / raw_path).stat().st_mtime_ns == mtime
+    pd.testing.assert_frame_equal(again, paysim, check_dtype=False)
+
+
+def test_upload_and_path_share_a_key(base_csv, tmp_path):
+    with open(base_csv, "rb") as f:
+        upload = io.BytesIO(f.read())
+    assert dataset_key(upload, tmp_path) == dataset_key(base_csv, tmp_path)
+    assert upload.tell() == 0
+
+
+def test_multi_chunk_csv_reloads_zero_copy(base_csv, monkeypatch, tmp_path):
+    monkeypatch.setattr(dataset_cache, "_CSV_CHUNK_ROWS", 1_000)   # many parsed chunks
+    key, df = load_dataset(base_csv, cache_dir=tmp_path)
+    table = _map_arrow(_paths(key, tmp_path)[0])
+    assert table.column("amount").num_chunks == 1
+    frame = table.to_pandas(split_blocks=True)
+    for col in ["step", "amount", "oldbalanceOrg", "isFraud"]:
+        assert _points_into_map(table, frame, col), col
+
+
+def test_features_match_engineer_features(base_csv, paysim, tmp_path):
+    key, df = load_dataset(base_csv, cache_dir=tmp_path)
+    df_fe, le = load_features(key, df, tmp_path)
+    expected, _ = engineer_features(paysim, le)
+    np.testing.assert_allclose(df_fe[FEATURE_COLS].to_numpy(np.float64),
+                               expected[FEATURE_COLS].to_numpy(np.float32), rtol=1e-6)
+    np.testing.assert_array_equal(df_fe["isFraud"], paysim["isFraud"])
+
+
+def _write_prefix(path, lines, n):
+    with open(path, "w") as f:
+        f.writelines(lines[:n])
+
+
+def test_appended_rows_are_featurized_like_a_full_recompute(base_csv, paysim, tmp_path):
+    with open(base_csv) as f:
+        lines = f.readlines()
+    small, full = tmp_path / "small.csv", tmp_path / "full.csv"
+    _write_prefix(small, lines, 6_000)
+    _write_prefix(full, lines, len(lines))
+    cache = tmp_path / "cache"
+
+    key_small, df_small = load_dataset(str(small), cache_dir=cache)
+    load_features(key_small, df_small, cache)
+    key, df = load_dataset(str(full), cache_dir=cache)
+    lineage = dataset_cache._read_index(cache, dataset_cache._LINEAGE_INDEX)
+    assert lineage[key]["parent"] == key_small
+
+    pd.testing.assert_frame_equal(df, paysim, check_dtype=False)
+    df_fe, le = load_features(key, df, cache)
+    expected, _ = engineer_features(paysim, le)
+    np.testing.assert_allclose(df_fe[FEATURE_COLS].to_numpy(np.float64),
+                               expected[FEATURE_COLS].to_numpy(np.float32), rtol=1e-6)
+
+
+def test_appended_new_type_refits_the_encoding(paysim, tmp_path):
+    base = paysim[paysim["type"] == "TRANSFER"].head(200)
+    odd = base.head(5).assign(type="WIRE")
+    small, full = tmp_path / "small.csv", tmp_path / "full.csv"
+    base.to_csv(small, index=False)
+    pd.concat([base, odd]).to_csv(full, index=False)
+    cache = tmp_path / "cache"
+    load_features(*load_dataset(str(small), cache_dir=cache), cache)
+    key, df = load_dataset(str(full), cache_dir=cache)
+    df_fe, le = load_features(key, df, cache)
+    assert "WIRE" in le.classes_
+    np.testing.assert_array_equal(df_fe["type_encoded"].tail(5),
+                                  le.transform(["WIRE"] * 5).astype(np.float32))
+
+
+def test_appended_rows_extend_the_cached_correlation(base_csv, paysim, tmp_path, monkeypatch):
+    with open(base_csv) as f:
+        lines = f.readlines()
+    small, full = tmp_path / "small.csv", tmp_path / "full.csv"
+    _write_prefix(small, lines, 6_000)
+    _write_prefix(full, lines, len(lines))
+    cache = tmp_path / "cache"
+    load_correlation(*load_dataset(str(small), cache_dir=cache), cache)
+
+    folded = []
+    monkeypatch.setattr(dataset_cache, "correlation_values",
+                        lambda chunk: folded.append(len(chunk)) or correlation_values(chunk))
+    key, df = load_dataset(str(full), cache_dir=cache)
+    corr = load_correlation(key, df, cache)
+    assert sum(folded) == len(paysim) - 5_999   # only the appended rows
+    expected = pd.DataFrame(correlation_values(paysim), columns=CORR_COLS).corr()
+    pd.testing.assert_frame_equal(corr, expected, atol=1e-9)
+    pd.testing.assert_frame_equal(load_correlation(key, df, cache), corr)
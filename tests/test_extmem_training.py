@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+import extmem_training
+
+
+def test_test_mask_is_chunking_independent():
+    whole = extmem_training.test_mask(0, 10_000, 0.2)
+    pieces = np.concatenate([extmem_training.test_mask(s, 1000, 0.2) for s in range(0, 10_000, 1000)])
+    np.testing.assert_array_equal(whole, pieces)
+    assert whole.mean() == pytest.approx(0.2, abs=0.02)
+
+
+def test_train_external_streams_every_row_once(paysim, base_csv, tmp_path):
+    params = {"n_estimators": 10, "max_depth": 3}
+    model, le, y_test, y_prob, metrics, info = extmem_training.train_external(
+        base_csv, params, chunk_rows=2500, n_jobs=1, cache_dir=tmp_path)
+    test = extmem_training.test_mask(0, len(paysim), 0.2)
+    y = paysim["isFraud"].to_numpy()
+    assert info["train_rows"] + info["test_rows"] == len(paysim)
+    assert info["class_counts"] == np.bincount(y[~test], minlength=2).tolist()
+    np.testing.assert_array_equal(y_test, y[test])
+    assert model.get_booster().num_boosted_rounds() == 10
+    assert metrics["ROC-AUC"] > 0.9
+    assert list(tmp_path.iterdir()) == []   # quantized pages are cleaned up
+
+    # A DataFrame source in different chunks gives the same split and labels
+    _, _, y_test_df, _, _, info_df = extmem_training.train_external(
+        paysim, params, chunk_rows=4000, n_jobs=1, cache_dir=tmp_path)
+    np.testing.assert_array_equal(y_test_df, y_test)
+    assert info_df["class_counts"] == info["class_counts"]
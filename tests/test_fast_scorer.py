@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from fast_scorer import FastScorer
+from features import RAW_NUMERIC_COLS, feature_matrix, paysim_encoder
+
+_ARGS = ["step", "type", "amount", "oldbalanceOrg", "newbalanceOrig",
+         "oldbalanceDest", "newbalanceDest"]
+
+
+def _args(row):
+    return [row[c] if c == "type" else float(row[c]) for c in _ARGS]
+
+
+def test_matches_predict_proba_and_feature_matrix(paysim, model):
+    le = paysim_encoder()
+    rows = paysim.sample(200, random_state=0)
+    scorer = FastScorer(model, le, threshold=0.4)
+    X = feature_matrix(rows, le)
+    expected = model.predict_proba(X)[:, 1]
+    for i, (_, row) in enumerate(rows.iterrows()):
+        prob, label, features = scorer.score(*_args(row))
+        assert prob == pytest.approx(expected[i], rel=1e-6)
+        assert label == int(expected[i] >= 0.4)
+        np.testing.assert_array_equal(features, X[i])
+    assert scorer.latency_us()["count"] == len(rows)
+
+
+def test_returned_features_are_not_shared(paysim, model):
+    scorer = FastScorer(model, paysim_encoder())
+    first = scorer.score(*_args(paysim.iloc[0]))[2]
+    kept = first.copy()
+    scorer.score(*_args(paysim.iloc[1]))
+    np.testing.assert_array_equal(first, kept)
+
+    rows = [_args(r) for _, r in paysim.head(64).iterrows()]
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda a: scorer.score(*a)[2], rows))
+    np.testing.assert_array_equal(np.stack(results),
+                                  feature_matrix(paysim.head(64), paysim_encoder()))
+
+
+def test_unknown_type_is_rejected(model):
+    scorer = FastScorer(model, paysim_encoder())
+    with pytest.raises(ValueError, match="unknown transaction type"):
+        scorer.score(1, "WIRE", *[1.0] * (len(RAW_NUMERIC_COLS) - 1))
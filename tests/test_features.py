@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from features import (
+    FEATURE_COLS, PAYSIM_TYPES, engineer_features, feature_matrix, paysim_encoder,
+    records_matrix, type_encoder,
+)
+
+
+def test_feature_matrix_matches_engineer_features(paysim):
+    le = paysim_encoder()
+    df_fe, _ = engineer_features(paysim, le)
+    X = feature_matrix(paysim, le, dtype=np.float64)
+    np.testing.assert_allclose(X, df_fe[FEATURE_COLS].to_numpy(np.float64))
+
+
+def test_paysim_encoding_does_not_depend_on_present_types(paysim):
+    subset = paysim[paysim["type"] == "TRANSFER"]
+    le = type_encoder(subset["type"])
+    assert list(le.classes_) == PAYSIM_TYPES
+    assert set(le.transform(subset["type"])) == {PAYSIM_TYPES.index("TRANSFER")}
+
+
+def test_records_matrix_matches_feature_matrix(paysim):
+    le = paysim_encoder()
+    rows = paysim.head(50)
+    records = rows.to_dict(orient="records")
+    np.testing.assert_array_equal(records_matrix(records, le), feature_matrix(rows, le))
+
+
+def test_records_matrix_errors():
+    le = paysim_encoder()
+    record = {"step": 1, "type": "TRANSFER", "amount": 10.0, "oldbalanceOrg": 10.0,
+              "newbalanceOrig": 0.0, "oldbalanceDest": 0.0, "newbalanceDest": 0.0}
+    with pytest.raises(KeyError):
+        records_matrix([{k: v for k, v in record.items() if k != "amount"}], le)
+    with pytest.raises(ValueError, match="unknown transaction type"):
+        records_matrix([{**record, "type": "WIRE"}], le)
+    for bad in ("ten", [1]):
+        with pytest.raises(ValueError):
+            records_matrix([{**record, "amount": bad}], le)
@@ -0,0 +1,48 @@
+import pytest
+
+import hpsearch
+from training import score_metrics, split
+
+SPACE = {"n_estimators": [10, 20], "max_depth": [2, 4], "learning_rate": [0.1, 0.3]}
+
+
+@pytest.fixture(scope="module")
+def data(xy):
+    X_train, X_val, y_train, y_val = split(*xy, test_size=0.3)
+    return X_train, y_train, X_val, y_val
+
+
+def test_config_generators():
+    grid = hpsearch.grid_configs(SPACE)
+    assert len(grid) == 8 and len({tuple(c.items()) for c in grid}) == 8
+    sampled = hpsearch.random_configs(SPACE, 5, seed=1)
+    assert len(sampled) == 5 and all(c in grid for c in sampled)
+    assert len({tuple(c.items()) for c in sampled}) == 5
+    assert len(hpsearch.random_configs(SPACE, 100)) == 8
+    assert hpsearch.threads_per_trial(10 ** 6) == 1
+
+
+def test_run_search_keeps_the_best_trial(data):
+    configs = hpsearch.random_configs(SPACE, 4)
+    seen = []
+    result = hpsearch.run_search(configs, data, n_workers=2,
+                                 on_result=lambda r: seen.append(len(r.rows)))
+    assert seen == [1, 2, 3, 4]
+    scores = [r["Average Precision"] for r in result.rows]
+    assert scores == sorted(scores, reverse=True)
+    assert sorted(r["trial"] for r in result.rows) == [0, 1, 2, 3]
+    # The kept model is the best row's, not the last one to finish
+    X_val, y_val = data[2], data[3]
+    best = score_metrics(y_val, result.best_model().predict_proba(X_val)[:, 1])
+    assert best["Average Precision"] == pytest.approx(result.best["Average Precision"])
+
+
+def test_successive_halving_budgets(data):
+    configs = hpsearch.grid_configs(SPACE)
+    result = hpsearch.successive_halving(configs, data, n_workers=2, min_rounds=5,
+                                         max_rounds=45, eta=3)
+    rungs = {}
+    for row in result.rows:
+        rungs.setdefault(row["rung"], []).append(row["n_estimators"])
+    assert {r: (len(n), set(n)) for r, n in rungs.items()} == {
+        0: (8, {5}), 1: (3, {15}), 2: (1, {45})}
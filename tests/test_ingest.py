@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from ingest import (CORR_COLS, DuplicateFilter, RunningCorrelation, RunningMoments,
+                    correlation_values,
+                    read_csv_chunks, summarize_chunks, summarize_csv, summarize_frame)
+
+
+def test_running_moments_match_numpy_with_missing_values():
+    rng = np.random.default_rng(0)
+    values = rng.normal(1e6, 5e5, size=(5_000, 3))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[:, 2] = np.nan                       # an all-missing column
+    moments = RunningMoments(["a", "b", "c"])
+    for block in np.array_split(values, 7):
+        moments.update(block)
+    np.testing.assert_array_equal(moments.count, (~np.isnan(values)).sum(axis=0))
+    np.testing.assert_allclose(moments.mean[:2], np.nanmean(values[:, :2], axis=0))
+    np.testing.assert_allclose(moments.std()[:2], np.nanstd(values[:, :2], axis=0, ddof=1))
+    np.testing.assert_allclose(moments.min[:2], np.nanmin(values[:, :2], axis=0))
+    assert np.isnan(moments.std()[2])
+
+
+def test_streamed_summary_matches_in_memory_summary(base_csv):
+    streamed = summarize_csv(base_csv, chunksize=1_000)
+    df = pd.concat(read_csv_chunks(base_csv), ignore_index=True)
+    whole = summarize_frame(df)
+    assert streamed["rows"] == whole["rows"] == len(df)
+    pd.testing.assert_series_equal(streamed["missing"], whole["missing"])
+    pd.testing.assert_series_equal(streamed["class_counts"], whole["class_counts"])
+    # Fewer rows than the quantile sample, so every statistic is exact
+    pd.testing.assert_frame_equal(streamed["describe"], whole["describe"], rtol=1e-9)
+    pd.testing.assert_frame_equal(streamed["describe"], df.describe().astype(float), rtol=1e-5)
+
+
+def test_duplicates_are_counted_across_chunks(paysim):
+    df = pd.concat([paysim, paysim.iloc[:100], paysim.iloc[5_000:5_010]], ignore_index=True)
+    chunks = [df.iloc[i:i + 1_000] for i in range(0, len(df), 1_000)]
+    summary = summarize_chunks(chunks, correlation=False)
+    assert summary["duplicates"] == df.duplicated().sum() == 110
+    assert summary["duplicates_error"] < 1e-3
+
+
+def test_duplicate_filter_over_counts_within_its_expected_error():
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 2**63, size=20_000, dtype=np.uint64)
+    stream = np.concatenate([hashes, hashes[:500]])
+    dup = DuplicateFilter(bits=1 << 16, hashes=3)       # deliberately crowded
+    for block in np.array_split(stream, 9):
+        dup.update(block)
+    assert dup.count >= 500                             # never misses a repeat
+    assert dup.expected_error > 10
+    assert abs((dup.count - 500) - dup.expected_error) < 5 * np.sqrt(dup.expected_error)
+
+
+def test_quantiles_come_from_a_uniform_sample(paysim):
+    summary = summarize_chunks([paysim], sample_rows=2_000, correlation=False)
+    median = summary["describe"].loc["50%", "amount"]
+    lo, hi = paysim["amount"].quantile([0.45, 0.55])
+    assert lo <= median <= hi
+
+
+def test_running_correlation_matches_pandas(paysim):
+    values = correlation_values(paysim)
+    values[::97, 3] = np.nan                    # rows with a missing value are skipped
+    rc = RunningCorrelation(CORR_COLS)
+    for block in np.array_split(values, 9):
+        rc.update(block)
+    expected = pd.DataFrame(values[~np.isnan(values).any(axis=1)], columns=CORR_COLS).corr()
+    pd.testing.assert_frame_equal(rc.corr(), expected, atol=1e-9)
+    again = RunningCorrelation.from_arrays(rc.arrays())
+    pd.testing.assert_frame_equal(again.corr(), rc.corr())
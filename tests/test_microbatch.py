@@ -0,0 +1,59 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from microbatch import Histogram, MicroBatcher
+
+
+def _serve(batcher, coro):
+    async def main():
+        task = asyncio.create_task(batcher.run())
+        try:
+            return await coro()
+        finally:
+            task.cancel()
+    return asyncio.run(main())
+
+
+def test_results_fan_back_to_their_callers():
+    rows = np.random.default_rng(0).normal(size=(100, 3)).astype(np.float32)
+    batcher = MicroBatcher(lambda X: X.sum(axis=1), n_features=3, max_batch=16, max_wait_ms=5)
+
+    async def submit_all():
+        return await asyncio.gather(*(batcher.submit(r) for r in rows))
+
+    results = _serve(batcher, submit_all)
+    np.testing.assert_allclose(results, rows.sum(axis=1), rtol=1e-6)
+    stats = batcher.stats()
+    assert stats["served"] == len(rows)
+    assert stats["batch_size"]["count"] < len(rows)   # rows were actually batched
+
+
+def test_queue_full_rejects_and_predict_errors_propagate():
+    batcher = MicroBatcher(lambda X: X[:, 0], n_features=1, max_queue=2)
+
+    async def overfill():
+        async def submit_unserved():
+            return await asyncio.gather(*(batcher.submit([i]) for i in range(3)))
+        with pytest.raises(asyncio.QueueFull):
+            await submit_unserved()
+    asyncio.run(overfill())
+    assert batcher.rejected == 1
+
+    def fail(X):
+        raise RuntimeError("boom")
+    failing = MicroBatcher(fail, n_features=1)
+    with pytest.raises(RuntimeError, match="boom"):
+        _serve(failing, lambda: failing.submit([1.0]))
+
+
+def test_histogram_buckets_and_snapshot():
+    h = Histogram([1, 2, 5])
+    assert h.snapshot()["p50"] is None
+    h.observe_many([0.5, 1, 1.5, 4, 100])
+    assert h.counts.tolist() == [2, 1, 1, 1]   # bounds are inclusive upper edges
+    assert h.quantile(0.5) == 2
+    snap = h.snapshot()
+    assert snap["count"] == 5 and snap["mean"] == pytest.approx(107 / 5)
+    assert snap["p99"] is None                 # overflow bucket has no finite bound
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pytest
+
+import model_registry as registry
+from features import PAYSIM_TYPES, feature_matrix, paysim_encoder
+
+
+def _save(model, tmp_path, dataset_hash="abc", **kw):
+    return registry.save_model(model, PAYSIM_TYPES, {"max_depth": 4}, {"accuracy": 0.9},
+                               dataset_hash, registry_dir=tmp_path, **kw)
+
+
+def test_round_trip_predicts_the_same(model, paysim, tmp_path):
+    model_id = _save(model, tmp_path, artifacts={"eval": {"y": np.arange(3)}})
+    loaded, le, meta = registry.load_model(model_id, registry_dir=tmp_path)
+    X = feature_matrix(paysim.head(500), paysim_encoder())
+    np.testing.assert_allclose(loaded.predict_proba(X), model.predict_proba(X))
+    assert list(le.classes_) == PAYSIM_TYPES
+    assert meta["metrics"] == {"accuracy": 0.9}
+    np.testing.assert_array_equal(registry.load_artifact(model_id, "eval", tmp_path)["y"],
+                                  np.arange(3))
+    assert registry.load_artifact(model_id, "missing", tmp_path) is None
+    assert not [n for n in os.listdir(tmp_path) if n.startswith(".")]
+
+
+def test_models_without_a_dataset_are_only_served_by_id(model, tmp_path, monkeypatch):
+    trained = _save(model, tmp_path)
+    monkeypatch.setattr(registry.time, "strftime", lambda fmt: "29991231-235959")
+    synthetic = _save(model, tmp_path, dataset_hash=None)
+    assert registry.resolve_model_id(registry_dir=tmp_path) == trained
+    assert registry.resolve_model_id(require_dataset=False, registry_dir=tmp_path) == synthetic
+    assert registry.resolve_model_id(synthetic, registry_dir=tmp_path) == synthetic
+
+
+def test_pin_overrides_newest(model, tmp_path):
+    first = _save(model, tmp_path)
+    registry.pin_model(first, tmp_path)
+    assert registry.resolve_model_id(registry_dir=tmp_path) == first
+    registry.pin_model(None, tmp_path)
+    with pytest.raises(FileNotFoundError):
+        registry.pin_model("no-such-model", tmp_path)
+
+
+def test_empty_registry_and_threshold_default(model, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        registry.resolve_model_id(registry_dir=tmp_path)
+    model_id = _save(model, tmp_path)
+    assert registry.decision_threshold(registry.load_meta(model_id, tmp_path)) == 0.5
+    meta = registry.update_meta(model_id, tmp_path, threshold=np.float64(0.3))
+    assert registry.decision_threshold(meta) == 0.3
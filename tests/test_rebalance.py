@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import FEATURE_COLS
+from rebalance import rebalance, smote_streamed
+
+RATIO = 0.5
+
+
+@pytest.fixture(scope="module")
+def train(xy):
+    X, y = xy
+    return pd.DataFrame(X, columns=FEATURE_COLS), pd.Series(y, name="isFraud")
+
+
+@pytest.mark.parametrize("mode", ["SMOTE", "SMOTE (streamed)", "Undersample majority"])
+def test_resampling_modes_hit_the_ratio(train, mode):
+    X, y = train
+    X_bal, y_bal, weights, stats = rebalance(X, y, mode, RATIO)
+    assert weights is None
+    assert list(X_bal.columns) == FEATURE_COLS and len(X_bal) == len(y_bal) == stats["rows_out"]
+    counts = np.bincount(np.asarray(y_bal), minlength=2)
+    assert counts[1] / counts[0] == pytest.approx(RATIO, abs=1e-3)
+    assert stats["rows_in"] == len(y) and stats["peak_mb"] > 0
+
+
+def test_streamed_smote_interpolates_minority_rows(train):
+    X, y = train
+    X_bal, y_bal, _, _ = rebalance(X, y, "SMOTE (streamed)", RATIO)
+    np.testing.assert_array_equal(X_bal.to_numpy()[:len(X)], X.to_numpy())
+    minority = X.to_numpy()[y.to_numpy() == 1]
+    synthetic = X_bal.to_numpy()[len(X):]
+    assert (y_bal.to_numpy()[len(X):] == 1).all()
+    assert (synthetic >= minority.min(axis=0) - 1e-3).all()
+    assert (synthetic <= minority.max(axis=0) + 1e-3).all()
+
+
+def test_streamed_smote_repeats_a_lone_fraud_row(train):
+    X, y = train
+    X_one = pd.concat([X[y == 0], X[y == 1].iloc[:1]])
+    y_one = pd.concat([y[y == 0], y[y == 1].iloc[:1]])
+    X_bal, y_bal = smote_streamed(X_one, y_one, RATIO)
+    assert y_bal.sum() == int(RATIO * (y_one == 0).sum())
+    synthetic = X_bal.to_numpy()[len(X_one):]
+    assert (synthetic == X_one.to_numpy()[-1]).all()
+    with pytest.raises(ValueError, match="no fraud rows"):
+        smote_streamed(X[y == 0], y[y == 0], RATIO)
+
+
+def test_undersampling_keeps_every_fraud_row(train):
+    X, y = train
+    X_bal, y_bal, _, _ = rebalance(X, y, "Undersample majority", RATIO)
+    assert y_bal.sum() == y.sum()
+    assert X_bal.index.is_unique and X_bal.index.isin(X.index).all()
+
+
+def test_class_weights_and_passthrough(train):
+    X, y = train
+    X_bal, y_bal, weights, _ = rebalance(X, y, "Class weights", RATIO)
+    assert X_bal is X and y_bal is y
+    assert weights[y == 1].sum() == pytest.approx(RATIO * weights[y == 0].sum(), rel=1e-5)
+    assert rebalance(X, y, "None", RATIO)[2] is None
+    with pytest.raises(ValueError):
+        rebalance(X, y, "Oversample", RATIO)
@@ -0,0 +1,108 @@
+import asyncio
+import functools
+import json
+import warnings
+
+import numpy as np
+import pytest
+
+import account_index
+import dataset_cache
+import model_registry
+import scoring_service
+from features import PAYSIM_TYPES, feature_matrix, paysim_encoder
+
+_FIELDS = ["step", "type", "amount", "oldbalanceOrg", "newbalanceOrig",
+           "oldbalanceDest", "newbalanceDest"]
+
+
+@pytest.fixture
+def app(model, base_csv, tmp_path, monkeypatch):
+    meta = {"model_id": "test-model", "type_classes": PAYSIM_TYPES}
+    monkeypatch.setattr(model_registry, "load_model",
+                        lambda model_id=None: (model, paysim_encoder(), meta))
+    monkeypatch.setattr(dataset_cache, "load_dataset",
+                        functools.partial(dataset_cache.load_dataset, cache_dir=tmp_path))
+    monkeypatch.setattr(account_index, "load_index",
+                        functools.partial(account_index.load_index, cache_dir=tmp_path))
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        app = scoring_service.create_app(max_wait_ms=1.0, dataset=base_csv)
+    assert not [w for w in caught if "lifespan" in str(w.message)]
+    return app
+
+
+async def _request(app, method, path, body=None, query=""):
+    raw = b"" if body is None else json.dumps(body).encode()
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": raw, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app({"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+               "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+               "query_string": query.encode(), "root_path": "", "client": ("test", 1),
+               "server": ("test", 80), "headers": [(b"content-type", b"application/json")]},
+              receive, send)
+    return sent[0]["status"], json.loads(b"".join(m.get("body", b"") for m in sent[1:]))
+
+
+def _run(app, *requests):
+    """Issue ``(method, path, body, query)`` requests concurrently inside the lifespan."""
+    async def main():
+        async with app.router.lifespan_context(app):
+            return await asyncio.gather(*(_request(app, *r) for r in requests))
+    return asyncio.run(main())
+
+
+def _records(df):
+    return [{c: (r[c] if c == "type" else float(r[c])) for c in _FIELDS}
+            for r in df.to_dict(orient="records")]
+
+
+def test_concurrent_scores_fan_out_to_the_right_request(app, paysim, model):
+    rows = paysim.sample(40, random_state=1)
+    expected = model.predict_proba(feature_matrix(rows, paysim_encoder()))[:, 1]
+    responses = _run(app, *[("POST", "/score", r) for r in _records(rows)])
+    assert [s for s, _ in responses] == [200] * len(rows)
+    np.testing.assert_allclose([b["fraud_probability"] for _, b in responses], expected,
+                               rtol=1e-5)
+
+
+def test_batch_endpoint(app, paysim, model):
+    rows = paysim.head(30)
+    expected = model.predict_proba(feature_matrix(rows, paysim_encoder()))[:, 1]
+    (status, body), = _run(app, ("POST", "/score/batch", _records(rows)))
+    assert status == 200
+    np.testing.assert_allclose([r["fraud_probability"] for r in body], expected, rtol=1e-5)
+
+
+@pytest.mark.parametrize("path,body,message", [
+    ("/score", [{"step": 1}], "JSON object"),
+    ("/score", 3, "JSON object"),
+    ("/score", {"step": 1}, "missing field"),
+    ("/score/batch", {"step": 1}, "array of transaction objects"),
+    ("/score/batch", [1, 2], "array of transaction objects"),
+])
+def test_malformed_bodies_get_400(app, path, body, message):
+    (status, payload), = _run(app, ("POST", path, body))
+    assert status == 400
+    assert message in payload["error"]
+
+
+def test_account_history(app, paysim):
+    account = paysim["nameOrig"].iloc[0]
+    (status, body), = _run(app, ("GET", f"/accounts/{account}", None, "limit=5"))
+    assert status == 200
+    assert body["count"] == int(((paysim["nameOrig"] == account)
+                                 | (paysim["nameDest"] == account)).sum())
+    assert len(body["transactions"]) == min(5, body["count"])
+    (status, body), = _run(app, ("GET", f"/accounts/{account}", None, "direction=up"))
+    assert status == 400
+    for limit in ("-1", "x"):
+        (status, body), = _run(app, ("GET", f"/accounts/{account}", None, f"limit={limit}"))
+        assert status == 400
+        assert "non-negative integer" in body["error"]
@@ -0,0 +1,24 @@
+import pytest
+
+import startup_bench
+
+_STDERR = f"""import time: self [us] | cumulative | imported package
+import time:       100 |        200 | streamlit
+{startup_bench._MARKER}
+import time:       300 |        500 |   numpy.core
+import time:       400 |       1500 | numpy
+import time:        50 |     250000 | pandas
+import time:        10 |         10 |     pandas._libs
+"""
+
+
+def test_parse_importtime_keeps_top_level_imports_after_the_marker():
+    assert startup_bench.parse_importtime(_STDERR) == [("pandas", 0.25), ("numpy", 0.0015)]
+    assert startup_bench.parse_importtime("no marker here") == []
+
+
+@pytest.mark.parametrize("app", startup_bench.APPS)
+def test_landing_pages_skip_the_training_stack(app):
+    result = startup_bench.profile_app(app)
+    assert result["errors"] == []
+    assert result["heavy"] == []
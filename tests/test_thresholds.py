@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from thresholds import ThresholdSweep
+
+
+@pytest.fixture(scope="module")
+def scores():
+    rng = np.random.default_rng(0)
+    y = rng.random(2000) < 0.1
+    # Rounded so many rows share a score (ties must count together)
+    prob = np.round(np.clip(rng.normal(0.3 + 0.4 * y, 0.2), 0, 1), 2)
+    return y, prob
+
+
+def _brute_counts(y, prob, t):
+    flag = prob >= t
+    return {"TP": int((flag & y).sum()), "FP": int((flag & ~y).sum()),
+            "FN": int((~flag & y).sum()), "TN": int((~flag & ~y).sum())}
+
+
+def test_counts_match_brute_force(scores):
+    y, prob = scores
+    sweep = ThresholdSweep.from_scores(y, prob)
+    for t in [-1.0, 0.0, 0.005, 0.25, 0.3, 0.5, 0.99, 1.0, 1.5, *np.unique(prob)[::7]]:
+        assert sweep.counts(t) == _brute_counts(y, prob, t), t
+
+
+def test_arrays_round_trip(scores):
+    y, prob = scores
+    sweep = ThresholdSweep.from_scores(y, prob)
+    again = ThresholdSweep.from_arrays(sweep.arrays())
+    assert again.counts(0.42) == sweep.counts(0.42)
+    assert again.metrics(0.5) == sweep.metrics(0.5)
+
+
+def _brute_cost(y, prob, loss, t, review_cost):
+    flag = prob >= t
+    return review_cost * flag.sum() + loss[y & ~flag].sum()
+
+
+def test_cost_curve_matches_brute_force(scores):
+    y, prob = scores
+    loss = np.random.default_rng(1).uniform(10, 5000, len(y))
+    sweep = ThresholdSweep.from_scores(y, prob, loss=loss)
+    for review_cost in [0.0, 25.0, 1e4]:
+        thresholds, cost = sweep.cost_curve(review_cost)
+        assert cost[0] == pytest.approx(loss[y].sum())   # first entry flags nothing
+        expected = [_brute_cost(y, prob, loss, t, review_cost) for t in thresholds]
+        np.testing.assert_allclose(cost, expected)
+        t, c = sweep.min_cost_threshold(review_cost)
+        assert c == pytest.approx(min(expected))
+        assert _brute_cost(y, prob, loss, t, review_cost) == pytest.approx(c)
+
+
+def test_flat_fraud_loss(scores):
+    y, prob = scores
+    sweep = ThresholdSweep.from_scores(y, prob)
+    with pytest.raises(ValueError):
+        sweep.cost_curve(10.0)
+    thresholds, cost = sweep.cost_curve(10.0, fraud_loss=100.0)
+    flat = np.full(len(y), 100.0)
+    np.testing.assert_allclose(cost, [_brute_cost(y, prob, flat, t, 10.0) for t in thresholds])
+
+
+def test_loss_survives_round_trip(scores):
+    y, prob = scores
+    sweep = ThresholdSweep.from_scores(y, prob, loss=np.arange(len(y)))
+    again = ThresholdSweep.from_arrays(sweep.arrays())
+    assert again.min_cost_threshold(50.0) == sweep.min_cost_threshold(50.0)
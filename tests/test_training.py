@@ -0,0 +1,33 @@
+import numpy as np
+
+from training import fit_early_stopping, make_model, report_metrics, score_metrics, split
+
+
+def test_split_is_stratified(xy):
+    X, y = xy
+    X_train, X_test, y_train, y_test = split(X, y, test_size=0.25)
+    assert len(X_train) + len(X_test) == len(X)
+    assert abs(y_train.mean() - y_test.mean()) < 0.01
+
+
+def test_early_stopping_keeps_only_the_best_rounds(xy):
+    X_train, X_val, y_train, y_val = split(*xy, test_size=0.3)
+    params = {"n_estimators": 300, "max_depth": 4, "learning_rate": 0.3}
+    model, info = fit_early_stopping(params, X_train, y_train, X_val, y_val, patience=5, n_jobs=1)
+    best = info["best_iteration"]
+    assert info["rounds_trained"] < params["n_estimators"]
+    assert info["rounds_trained"] == best + 1 + 5
+    assert model.get_booster().num_boosted_rounds() == best + 1
+    assert len(info["curves"]["aucpr"]) == info["rounds_trained"]
+    assert info["best_score"] == max(info["curves"]["aucpr"])
+    # The trimmed model equals a full fit cut at the best iteration
+    full = make_model({**params, "n_estimators": best + 1}, n_jobs=1).fit(X_train, y_train)
+    np.testing.assert_allclose(model.predict_proba(X_val), full.predict_proba(X_val), rtol=1e-6)
+
+
+def test_a_score_at_the_threshold_counts_as_fraud():
+    y_true = np.array([0, 1, 1, 0])
+    y_prob = np.array([0.1, 0.5, 0.9, 0.4])
+    assert score_metrics(y_true, y_prob)["Recall"] == 1.0
+    assert score_metrics(y_true, np.array([0.1, 0.7, 0.9, 0.7]), threshold=0.7)["Precision"] == 2 / 3
+    assert report_metrics(y_true, y_prob)["CM"].tolist() == [[2, 0], [0, 2]]
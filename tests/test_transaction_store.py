@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import model_registry
+import transaction_store as store
+from features import feature_matrix, paysim_encoder
+
+THRESHOLD = 0.99   # the test model is confident; this leaves rows in every status
+END = 1_800_000_000
+
+
+@pytest.fixture(scope="module")
+def expected(paysim, model):
+    prob = model.predict_proba(feature_matrix(paysim, paysim_encoder()))[:, 1].astype(np.float64)
+    return paysim.assign(
+        id=np.arange(len(paysim)),
+        time=END - (paysim["step"].max() - paysim["step"]) * 3600,
+        probability=prob,
+        risk_score=np.rint(prob * 100).astype(np.int64),
+        status=store.label_status(prob, THRESHOLD))
+
+
+@pytest.fixture(scope="module")
+def conn(paysim, model, tmp_path_factory):
+    path = tmp_path_factory.mktemp("store") / "s.sqlite"
+    store.build_store(paysim, str(path), model, paysim_encoder(), THRESHOLD, "m1",
+                      end_time=END, chunksize=3000)
+    return store.open_store(str(path))
+
+
+def test_aggregates_match_pandas(conn, expected):
+    assert store.meta(conn) == {"model_id": "m1", "threshold": str(THRESHOLD), "end_time": str(END)}
+    counts = expected["status"].value_counts()
+    assert store.status_counts(conn) == {s: int(counts.get(s, 0)) for s in store.STATUSES}
+    assert set(counts.index) == set(store.STATUSES)
+    since = END - 100 * 3600
+    recent = expected.loc[expected["time"] >= since, "status"].value_counts()
+    assert store.status_counts(conn, since) == {s: int(recent.get(s, 0)) for s in store.STATUSES}
+    assert store.average_risk(conn) == pytest.approx(expected["risk_score"].mean())
+    assert dict(store.type_counts(conn)) == expected["type"].value_counts().to_dict()
+
+    hist = np.minimum(expected["risk_score"] // 10 * 10, 90).value_counts().sort_index()
+    assert store.risk_histogram(conn) == list(hist.items())
+
+    start = END - 7 * 86400
+    fraud = expected[(expected["status"] == "Fraud") & (expected["time"] > start)]
+    days = (start + (fraud["time"] - start) // 86400 * 86400).value_counts().sort_index()
+    assert store.daily_counts(conn, days=7) == list(days.items())
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"status": "Fraud"},
+    {"status": "Pending", "min_amount": 1000.0},
+    {"min_amount": 5e5, "max_amount": 6e5},
+    {"txn_id": 123},
+    {"status": "Verified", "max_amount": 10.0},
+])
+def test_search_matches_a_filter(conn, expected, filters):
+    m = pd.Series(True, index=expected.index)
+    if "status" in filters:
+        m &= expected["status"] == filters["status"]
+    if "min_amount" in filters:
+        m &= expected["amount"] >= filters["min_amount"]
+    if "max_amount" in filters:
+        m &= expected["amount"] <= filters["max_amount"]
+    if "txn_id" in filters:
+        m &= expected["id"] == filters["txn_id"]
+    hits = expected[m].sort_values(["time", "id"], ascending=False)
+    rows, total = store.search(conn, limit=50, max_count=1000, **filters)
+    assert total == min(len(hits), 1000)
+    assert [r["id"] for r in rows] == hits["id"].head(50).tolist()
+
+
+def test_search_by_account(conn, expected):
+    account = expected["nameDest"].value_counts().index[0]
+    rows, total = store.search(conn, account=account)
+    hits = expected[(expected["nameOrig"] == account) | (expected["nameDest"] == account)]
+    assert total == len(hits) and sorted(r["id"] for r in rows) == sorted(hits["id"])
+    row = next(r for r in rows if r["id"] == hits["id"].iloc[0])
+    assert row["probability"] == pytest.approx(hits["probability"].iloc[0])
+
+
+def test_load_store_scores_once_per_model(paysim, model, tmp_path, monkeypatch):
+    loads = []
+    meta = {"model_id": "m2", "threshold": THRESHOLD}
+    monkeypatch.setattr(model_registry, "resolve_model_id", lambda model_id=None: "m2")
+    monkeypatch.setattr(model_registry, "load_model",
+                        lambda model_id: loads.append(model_id) or (model, paysim_encoder(), meta))
+    for _ in range(2):
+        conn = store.load_store("k", paysim.head(500), store_dir=tmp_path)
+        assert sum(store.status_counts(conn).values()) == 500
+    assert loads == ["m2"]
+    assert [p.name for p in tmp_path.iterdir()] == ["k-m2.sqlite"]
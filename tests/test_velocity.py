@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from velocity import VELOCITY_COLS, VelocityEngine, add_velocity_features
+
+WINDOW = 5
+
+
+@pytest.fixture(scope="module")
+def stream():
+    rng = np.random.default_rng(0)
+    n = 12_000
+    # Enough accounts to force table rehashes, few enough to repeat within a window
+    return pd.DataFrame({
+        "step":     np.sort(rng.integers(1, 400, n)),
+        "amount":   rng.uniform(1, 1000, n).round(2),
+        "nameOrig": [f"C{i}" for i in rng.integers(0, 3000, n)],
+        "nameDest": [f"M{i}" for i in rng.integers(0, 300, n)],
+    })
+
+
+def _brute_force(df, window):
+    steps, amount = df["step"].to_numpy(), df["amount"].to_numpy()
+    orig, dest = df["nameOrig"].to_numpy(), df["nameDest"].to_numpy()
+    out = np.empty((len(df), len(VELOCITY_COLS)))
+    for i in range(len(df)):
+        lo = np.searchsorted(steps, steps[i] - window, side="right")
+        for k, (own, other) in enumerate([(orig, dest), (dest, orig)]):
+            hist = np.flatnonzero(own[lo:i] == own[i]) + lo
+            since = steps[i] - steps[hist].max() if len(hist) else window
+            out[i, 4 * k:4 * k + 4] = [len(hist), amount[hist].sum(),
+                                       len(set(other[hist])), since]
+    return out
+
+
+def test_matches_brute_force_in_chunks(stream):
+    expected = _brute_force(stream, WINDOW)
+    # Chunk boundaries fall inside steps
+    chunks = [stream.iloc[a:a + 1777] for a in range(0, len(stream), 1777)]
+    got = pd.concat(add_velocity_features(chunks, WINDOW))
+    assert list(got.columns[-len(VELOCITY_COLS):]) == VELOCITY_COLS
+    np.testing.assert_allclose(got[VELOCITY_COLS].to_numpy(), expected)
+
+
+def test_rows_within_a_call_are_ordered_by_step(stream):
+    shuffled = stream.iloc[:2000].sample(frac=1, random_state=0)
+    in_order = shuffled.sort_values("step", kind="stable")
+    got = VelocityEngine(WINDOW).update(shuffled)
+    assert got.index.equals(shuffled.index)
+    pd.testing.assert_frame_equal(got.loc[in_order.index], VelocityEngine(WINDOW).update(in_order))
+
+
+def test_state_is_bounded_by_the_window(stream):
+    engine = VelocityEngine(WINDOW)
+    engine.update(stream)
+    last = stream[stream["step"] > stream["step"].max() - WINDOW]
+    stats = engine.stats()
+    assert stats["events"] == len(last)
+    assert stats["senders"] == last["nameOrig"].nunique()
+    assert stats["pairs"] == len(last.drop_duplicates(["nameOrig", "nameDest"]))
+    with pytest.raises(ValueError, match="non-decreasing step order"):
+        engine.update(stream.iloc[:1])
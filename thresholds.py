@@ -0,0 +1,135 @@
+"""Decision-threshold sweeps over a model's test-set scores.
+
+``ThresholdSweep`` sorts the scores once and keeps cumulative TP/FP counts
+at every distinct score, so the confusion matrix at any threshold (and the
+ROC / precision-recall curves) are array lookups instead of fresh passes
+over ``y_prob``. A row is flagged when its score is ``>= threshold``.
+
+When a per-transaction fraud loss (e.g. ``amount``) is supplied, the sweep
+also keeps the cumulative loss caught, so the expected cost of every
+threshold — review cost per alert plus the loss on missed fraud — comes out
+of the same sorted pass (``cost_curve`` / ``min_cost_threshold``).
+"""
+import numpy as np
+
+
+def _thin(n, max_points):
+    """Indices of at most ``max_points`` evenly spread points out of ``n``."""
+    if not max_points or n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).astype(np.int64))
+
+
+class ThresholdSweep:
+    """Cumulative confusion counts at every distinct score, highest score first."""
+
+    def __init__(self, thresholds, tp, fp, n_pos, n_neg, caught_loss=None, total_loss=None):
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.tp    = np.asarray(tp, dtype=np.int64)
+        self.fp    = np.asarray(fp, dtype=np.int64)
+        self.n_pos = int(n_pos)
+        self.n_neg = int(n_neg)
+        self.caught_loss = None if caught_loss is None else np.asarray(caught_loss, dtype=np.float64)
+        self.total_loss  = None if total_loss is None else float(total_loss)
+
+    @classmethod
+    def from_scores(cls, y_true, y_prob, loss=None):
+        """Build from labels and scores; ``loss`` is the per-row fraud loss, if known."""
+        y_prob = np.asarray(y_prob, dtype=np.float64)
+        y_true = np.asarray(y_true).astype(bool)
+        order  = np.argsort(-y_prob, kind="stable")
+        probs  = y_prob[order]
+        tp = np.cumsum(y_true[order])
+        fp = np.arange(1, len(probs) + 1) - tp
+        # last row of each run of equal scores
+        last = np.r_[np.flatnonzero(np.diff(probs)), len(probs) - 1].astype(np.int64)
+        n_pos = int(y_true.sum())
+        caught = total = None
+        if loss is not None:
+            fraud_loss = np.where(y_true, np.asarray(loss, dtype=np.float64), 0.0)
+            caught = np.cumsum(fraud_loss[order])[last]
+            total  = fraud_loss.sum()
+        return cls(probs[last], tp[last], fp[last], n_pos, len(y_true) - n_pos, caught, total)
+
+    def arrays(self):
+        """Arrays for ``model_registry.save_model(artifacts=...)``."""
+        arrays = {"thresholds": self.thresholds, "tp": self.tp, "fp": self.fp,
+                  "n_pos": np.int64(self.n_pos), "n_neg": np.int64(self.n_neg)}
+        if self.caught_loss is not None:
+            arrays["caught_loss"] = self.caught_loss
+            arrays["total_loss"]  = np.float64(self.total_loss)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays["thresholds"], arrays["tp"], arrays["fp"],
+                   arrays["n_pos"], arrays["n_neg"],
+                   arrays.get("caught_loss"), arrays.get("total_loss"))
+
+    @property
+    def has_loss(self):
+        return self.caught_loss is not None
+
+    def counts(self, threshold):
+        """``{"TP", "FP", "FN", "TN"}`` when flagging scores ``>= threshold``."""
+        # thresholds are descending, so -thresholds is sorted ascending
+        k = int(np.searchsorted(-self.thresholds, -threshold, side="right"))
+        tp = int(self.tp[k - 1]) if k else 0
+        fp = int(self.fp[k - 1]) if k else 0
+        return {"TP": tp, "FP": fp, "FN": self.n_pos - tp, "TN": self.n_neg - fp}
+
+    def metrics(self, threshold):
+        c = self.counts(threshold)
+        flagged   = c["TP"] + c["FP"]
+        precision = c["TP"] / flagged if flagged else 0.0
+        recall    = c["TP"] / self.n_pos if self.n_pos else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        total = self.n_pos + self.n_neg
+        return {
+            "Precision": precision,
+            "Recall":    recall,
+            "F1-Score":  f1,
+            "Accuracy":  (c["TP"] + c["TN"]) / total if total else 0.0,
+            **c,
+        }
+
+    def roc_points(self, max_points=2000):
+        """``(fpr, tpr)`` starting at (0, 0), thinned to ``max_points`` for plotting."""
+        idx = _thin(len(self.thresholds), max_points)
+        fpr = np.r_[0.0, self.fp[idx] / max(self.n_neg, 1)]
+        tpr = np.r_[0.0, self.tp[idx] / max(self.n_pos, 1)]
+        return fpr, tpr
+
+    def pr_points(self, max_points=2000):
+        """``(recall, precision)`` starting at recall 0, thinned to ``max_points``."""
+        idx = _thin(len(self.thresholds), max_points)
+        tp, fp = self.tp[idx], self.fp[idx]
+        recall    = np.r_[0.0, tp / max(self.n_pos, 1)]
+        precision = np.r_[1.0, tp / np.maximum(tp + fp, 1)]
+        return recall, precision
+
+    def cost_curve(self, review_cost, fraud_loss=None):
+        """Expected total cost at every candidate threshold, in one vectorized pass.
+
+        cost = ``review_cost`` × alerts + loss on missed fraud. The loss is the
+        per-transaction loss given to ``from_scores`` or, if ``fraud_loss`` is
+        set, a flat amount per fraud case. The first entry flags nothing.
+        Returns ``(thresholds, cost)``.
+        """
+        if fraud_loss is not None:
+            caught, total = self.tp * float(fraud_loss), self.n_pos * float(fraud_loss)
+        elif self.has_loss:
+            caught, total = self.caught_loss, self.total_loss
+        else:
+            raise ValueError("sweep has no per-transaction loss; pass fraud_loss")
+        alerts = self.tp + self.fp
+        cost = np.r_[total, review_cost * alerts + (total - caught)]
+        top = self.thresholds[0] if len(self.thresholds) else 1.0
+        thresholds = np.r_[np.nextafter(top, np.inf), self.thresholds]
+        return thresholds, cost
+
+    def min_cost_threshold(self, review_cost, fraud_loss=None):
+        """``(threshold, cost)`` minimising ``cost_curve``."""
+        thresholds, cost = self.cost_curve(review_cost, fraud_loss)
+        i = int(np.argmin(cost))
+        return float(thresholds[i]), float(cost[i])
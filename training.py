@@ -0,0 +1,88 @@
+"""XGBoost training and evaluation shared by the Model Training page and tools."""
+from imblearn.over_sampling import SMOTE
+from sklearn.metrics import (
+    accuracy_score, average_precision_score, precision_score, recall_score,
+    f1_score, confusion_matrix, roc_auc_score, classification_report
+)
+from sklearn.model_selection import train_test_split
+from xgboost import XGBClassifier
+
+# Hyperparameters exposed on the Model Training page
+XGB_PARAMS = ["n_estimators", "max_depth", "learning_rate", "subsample",
+              "colsample_bytree", "scale_pos_weight"]
+
+
+def split(X, y, test_size, seed=42):
+    """Stratified train/test split used by every training mode."""
+    return train_test_split(X, y, test_size=test_size, random_state=seed, stratify=y)
+
+
+def smote_balance(X_train, y_train, smote_strategy, seed=42):
+    return SMOTE(random_state=seed, sampling_strategy=smote_strategy).fit_resample(X_train, y_train)
+
+
+def make_model(params, n_jobs=-1, seed=42):
+    """XGBClassifier configured like the Model Training page."""
+    return XGBClassifier(
+        **{k: params[k] for k in XGB_PARAMS if k in params},
+        random_state=seed, n_jobs=n_jobs, eval_metric="logloss"
+    )
+
+
+def fit_early_stopping(params, X_train, y_train, X_val, y_val, patience=20,
+                       stop_metric="aucpr", sample_weight=None, n_jobs=-1, seed=42):
+    """Fit until ``stop_metric`` on the validation set stalls for ``patience`` rounds.
+
+    ``n_estimators`` becomes the upper bound. The returned model is cut to the
+    best iteration, so scoring (and the saved artifact) only carries the trees
+    that helped. Returns ``(model, info)`` with the best iteration and the
+    per-round validation curves.
+    """
+    metrics = [m for m in ("logloss", "aucpr") if m != stop_metric] + [stop_metric]
+    model = XGBClassifier(
+        **{k: params[k] for k in XGB_PARAMS if k in params},
+        random_state=seed, n_jobs=n_jobs, eval_metric=metrics,   # last metric drives stopping
+        early_stopping_rounds=patience
+    )
+    model.fit(X_train, y_train, sample_weight=sample_weight,
+              eval_set=[(X_val, y_val)], verbose=False)
+    best = model.best_iteration
+    info = {"best_iteration": best, "rounds_trained": model.get_booster().num_boosted_rounds(),
+            "stop_metric": stop_metric, "best_score": model.best_score,
+            "curves": model.evals_result()["validation_0"]}
+    trimmed = XGBClassifier()
+    trimmed.load_model(bytearray(model.get_booster()[: best + 1].save_raw("ubj")))
+    return trimmed, info
+
+
+def score_metrics(y_true, y_prob, threshold=0.5):
+    """Headline metrics used to rank models (no report / confusion matrix).
+
+    A score counts as fraud when it is ``>= threshold``, like everywhere
+    else that flags transactions (``ThresholdSweep``, ``FastScorer``).
+    """
+    y_pred = (y_prob >= threshold).astype(int)
+    return {
+        "Test Accuracy":     accuracy_score(y_true, y_pred),
+        "Precision":         precision_score(y_true, y_pred, zero_division=0),
+        "Recall":            recall_score(y_true, y_pred, zero_division=0),
+        "F1-Score":          f1_score(y_true, y_pred, zero_division=0),
+        "ROC-AUC":           roc_auc_score(y_true, y_prob),
+        "Average Precision": average_precision_score(y_true, y_prob),
+    }
+
+
+def report_metrics(y_test, y_prob):
+    """``score_metrics`` plus the confusion matrix and classification report."""
+    y_pred = (y_prob >= 0.5).astype(int)
+    metrics = score_metrics(y_test, y_prob)
+    metrics["CM"]     = confusion_matrix(y_test, y_pred)
+    metrics["Report"] = classification_report(y_test, y_pred,
+                                              target_names=["Legitimate", "Fraudulent"])
+    return metrics
+
+
+def evaluate(model, X_test, y_test):
+    """Return ``(y_prob, metrics)`` in the shape the Performance Report expects."""
+    y_prob = model.predict_proba(X_test)[:, 1]
+    return y_prob, report_metrics(y_test, y_prob)
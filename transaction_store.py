@@ -0,0 +1,217 @@
+"""Embedded SQLite store of model-scored transactions behind fdapp's dashboard.
+
+    python transaction_store.py history.csv [--model MODEL_ID]
+
+``build_store`` scores a PaySim dataset chunk by chunk with a registered
+model and writes every transaction with its fraud probability, a 0–100 risk
+score and a status: ``Fraud`` at or above the model's decision threshold,
+``Pending`` (manual review) from ``REVIEW_FRACTION`` of it, ``Verified``
+below. ``status``, ``time`` and ``amount`` are indexed (and both account
+columns, for searches), so the dashboard's KPI cards, charts and filters
+are index lookups and GROUP BY queries instead of Python loops over rows.
+
+PaySim ``step`` is an hour index; ``time`` (Unix seconds) puts the last step
+at build time. A store is keyed by dataset key and model id, so retraining
+or a new dataset gets a new file.
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from dataset_cache import CACHE_DIR
+
+STORE_DIR = os.path.join(os.path.dirname(CACHE_DIR), "transactions")
+
+STATUSES = ["Verified", "Fraud", "Pending"]
+REVIEW_FRACTION = 0.5   # probabilities in [threshold * this, threshold) go to review
+
+_CHUNK_ROWS = 200_000
+_COLUMNS = ["id", "step", "time", "type", "amount", "nameOrig", "nameDest",
+            "oldbalanceOrg", "newbalanceOrig", "oldbalanceDest", "newbalanceDest",
+            "isFraud", "probability", "risk_score", "status"]
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE transactions (
+    id INTEGER PRIMARY KEY, step INTEGER, time INTEGER, type TEXT, amount REAL,
+    nameOrig TEXT, nameDest TEXT, oldbalanceOrg REAL, newbalanceOrig REAL,
+    oldbalanceDest REAL, newbalanceDest REAL, isFraud INTEGER,
+    probability REAL, risk_score INTEGER, status TEXT
+);
+"""
+_INDEXES = """
+CREATE INDEX idx_status_time ON transactions (status, time);
+CREATE INDEX idx_time ON transactions (time);
+CREATE INDEX idx_amount ON transactions (amount);
+CREATE INDEX idx_orig ON transactions (nameOrig);
+CREATE INDEX idx_dest ON transactions (nameDest);
+"""
+
+
+def store_path(key, model_id, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f"{key}-{model_id}.sqlite")
+
+
+def label_status(prob, threshold):
+    """``STATUSES`` label per probability."""
+    return np.where(prob >= threshold, "Fraud",
+                    np.where(prob >= threshold * REVIEW_FRACTION, "Pending", "Verified"))
+
+
+def build_store(df, path, model, le, threshold, model_id="", end_time=None,
+                chunksize=_CHUNK_ROWS):
+    """Score ``df`` (PaySim columns) into a new SQLite store at ``path``."""
+    from batch_score import score_chunk
+
+    end_time = int(time.time() if end_time is None else end_time)
+    last_step = int(df["step"].max()) if len(df) else 0
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;" + _SCHEMA)
+        insert = f"INSERT INTO transactions VALUES ({', '.join('?' * len(_COLUMNS))})"
+        for lo in range(0, len(df), chunksize):
+            scored = score_chunk(df.iloc[lo:lo + chunksize], model, le, threshold)
+            prob = scored["fraud_probability"].to_numpy(dtype=np.float64)
+            step = scored["step"].to_numpy(dtype=np.int64)
+            cols = {c: scored[c].tolist() for c in _COLUMNS[3:12]}
+            cols.update(id=range(lo, lo + len(scored)), step=step.tolist(),
+                        time=(end_time - (last_step - step) * 3600).tolist(),
+                        probability=prob.tolist(),
+                        risk_score=np.rint(prob * 100).astype(np.int64).tolist(),
+                        status=label_status(prob, threshold).tolist())
+            conn.executemany(insert, zip(*(cols[c] for c in _COLUMNS)))
+        conn.executescript(_INDEXES)
+        conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                         [("model_id", model_id), ("threshold", str(threshold)),
+                          ("end_time", str(end_time))])
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.close()
+        os.replace(tmp, path)
+    except BaseException:
+        conn.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
+
+
+def open_store(path):
+    """Read-only connection to a store (shareable across threads)."""
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+
+def load_store(key, df, model_id=None, store_dir=STORE_DIR):
+    """Connection to the store of dataset ``key`` scored by the resolved model.
+
+    Scores and writes it on first use (this loads the model, so it imports
+    xgboost); later calls only open the file. Raises FileNotFoundError if
+    no model trained on a dataset is registered: a store is never scored
+    by a model without one.
+    """
+    import model_registry
+
+    model_id = model_registry.resolve_model_id(model_id)
+    path = store_path(key, model_id, store_dir)
+    if not os.path.exists(path):
+        model, le, meta = model_registry.load_model(model_id)
+        build_store(df, path, model, le, model_registry.decision_threshold(meta), model_id)
+    return open_store(path)
+
+
+# ─── Queries ──────────────────────────────────────────────────────────────────
+
+def meta(conn):
+    return dict(conn.execute("SELECT key, value FROM meta"))
+
+
+def status_counts(conn, since=None):
+    """Transactions per status (all of ``STATUSES``), optionally from ``since`` on."""
+    sql, args = "SELECT status, COUNT(*) FROM transactions", ()
+    if since is not None:
+        # One index range per status instead of a scan over time
+        sql, args = sql + " WHERE status IN (?, ?, ?) AND time >= ?", (*STATUSES, since)
+    counts = dict(conn.execute(sql + " GROUP BY status", args))
+    return {s: counts.get(s, 0) for s in STATUSES}
+
+
+def average_risk(conn):
+    return conn.execute("SELECT AVG(risk_score) FROM transactions").fetchone()[0] or 0.0
+
+
+def daily_counts(conn, status="Fraud", days=30):
+    """``(day_start, count)`` rows for ``status`` over the last ``days`` days."""
+    end = int(meta(conn)["end_time"])
+    start = end - days * 86400
+    return conn.execute(
+        "SELECT ? + (time - ?) / 86400 * 86400 AS day, COUNT(*) FROM transactions "
+        "WHERE status = ? AND time > ? GROUP BY day ORDER BY day",
+        (start, start, status, start)).fetchall()
+
+
+def type_counts(conn):
+    return conn.execute("SELECT type, COUNT(*) FROM transactions GROUP BY type "
+                        "ORDER BY COUNT(*) DESC").fetchall()
+
+
+def risk_histogram(conn, width=10):
+    """``(bucket_start, count)`` of risk scores in ``width``-point buckets."""
+    return conn.execute(f"SELECT MIN(risk_score / {int(width)} * {int(width)}, 100 - {int(width)}) "
+                        "AS b, COUNT(*) FROM transactions GROUP BY b ORDER BY b").fetchall()
+
+
+def search(conn, status=None, min_amount=None, max_amount=None, account=None, txn_id=None,
+           limit=500, max_count=10_000):
+    """Latest matching transactions (as dicts) and the number of matches.
+
+    Counting stops at ``max_count``, so a broad filter never walks the
+    whole table.
+    """
+    where, args = [], []
+    for cond, value in [("status = ?", status), ("{amount} >= ?", min_amount),
+                        ("{amount} <= ?", max_amount), ("id = ?", txn_id)]:
+        if value is not None and value != "":
+            where.append(cond)
+            args.append(value)
+    if account:
+        where.append("(nameOrig = ? OR nameDest = ?)")
+        args += [account, account]
+    clause = f" WHERE {' AND '.join(where)}" if where else ""
+    # "+amount" keeps SQLite off the amount index: with a status, the
+    # (status, time) index is the narrower path for both queries
+    total = conn.execute(f"SELECT COUNT(*) FROM (SELECT 1 FROM transactions"
+                         f"{clause.format(amount='+amount' if status else 'amount')} LIMIT ?)",
+                         (*args, max_count)).fetchone()[0]
+    # Broad filters walk the time index newest first and stop after `limit`
+    # rows; a narrow amount range fetches its few matches and sorts them
+    narrow = not status and total < max_count
+    clause = clause.format(amount="amount" if narrow else "+amount")
+    cur = conn.execute(f"SELECT * FROM transactions{clause} ORDER BY time DESC, id DESC LIMIT ?",
+                       (*args, limit))
+    names = [d[0] for d in cur.description]
+    return [dict(zip(names, row)) for row in cur], total
+
+
+def main(argv=None):
+    from dataset_cache import load_dataset
+
+    parser = argparse.ArgumentParser(description="Score a dataset into the dashboard store")
+    parser.add_argument("source", help="PaySim-format CSV")
+    parser.add_argument("--model", help="registry model id (default: pinned/newest)")
+    args = parser.parse_args(argv)
+
+    key, df = load_dataset(args.source)
+    t0 = time.perf_counter()
+    conn = load_store(key, df, args.model)
+    elapsed = time.perf_counter() - t0
+    counts = status_counts(conn)
+    print(f"{sum(counts.values()):,} transactions ({elapsed:.1f}s) — "
+          + ", ".join(f"{s} {n:,}" for s, n in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Per-account velocity features from a streaming window over ``step``.
+
+    python velocity.py history.csv [--window 24] [--out velocity.parquet]
+
+``VelocityEngine`` keeps rolling state for every sender (``nameOrig``) and
+receiver (``nameDest``) active in the last ``window`` steps and gives each
+transaction, from the history before it:
+
+- ``*_txn_count`` / ``*_amount_sum``: transactions and amount in the window,
+- ``orig_distinct_dest`` / ``dest_distinct_orig``: distinct counterparties,
+- ``*_steps_since_last``: steps since the account's previous transaction,
+  capped at ``window`` when there is none in the window.
+
+Account ids are hashed to 64 bits and kept in open-addressing NumPy tables
+(key plus a few int32 / float64 columns, no Python object per account).
+Each step's transactions are remembered until they leave the window; then
+they are subtracted from their accounts, and accounts with nothing left in
+the window are evicted. Memory follows the accounts and transactions inside
+the window, not the length of the stream, so the same pass works for batch
+training over a whole file and for online scoring.
+
+Rows must arrive in non-decreasing ``step`` order across calls (PaySim files
+are written that way); rows within one call are ordered by ``step`` first.
+"""
+import argparse
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+VELOCITY_COLS = [
+    "orig_txn_count", "orig_amount_sum", "orig_distinct_dest", "orig_steps_since_last",
+    "dest_txn_count", "dest_amount_sum", "dest_distinct_orig", "dest_steps_since_last",
+]
+
+DEFAULT_WINDOW = 24   # PaySim steps are hours
+
+_EMPTY, _TOMBSTONE = np.uint64(0), np.uint64(1)
+_MIN_CAPACITY = 1 << 12
+
+_ACCOUNT_COLS = {"count": np.int32, "amount": np.float64, "last": np.int32, "distinct": np.int32}
+
+
+def account_keys(names):
+    """64-bit hashes of account ids (0 and 1 are reserved by the tables)."""
+    h = pd.util.hash_pandas_object(pd.Series(names), index=False).to_numpy()
+    return np.maximum(h, np.uint64(2))
+
+
+def account_key(name):
+    """``account_keys`` for a single id, without the per-Series overhead."""
+    h = pd.util.hash_array(np.array([name], dtype=object), categorize=False)[0]
+    return max(h, np.uint64(2))
+
+
+def _pair_keys(orig, dest):
+    with np.errstate(over="ignore"):
+        h = orig ^ (dest * np.uint64(0x9E3779B97F4A7C15) + np.uint64(0x632BE59BD9B4E019))
+        h ^= h >> np.uint64(29)
+    return np.maximum(h, np.uint64(2))
+
+
+class _HashTable:
+    """Linear-probing uint64 → position table with parallel value columns."""
+
+    def __init__(self, columns, capacity=_MIN_CAPACITY):
+        self.columns = columns
+        self.generation = -1   # bumped on every rebuild, which moves positions
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        self.keys = np.zeros(capacity, dtype=np.uint64)
+        self.values = {name: np.zeros(capacity, dtype=dt) for name, dt in self.columns.items()}
+        self.mask = np.uint64(capacity - 1)
+        self.size = 0   # live keys
+        self.used = 0   # live keys + tombstones
+        self.generation += 1
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + sum(v.nbytes for v in self.values.values())
+
+    def find(self, keys):
+        """Positions of ``keys``, -1 where absent."""
+        pos = (keys & self.mask).astype(np.int64)
+        out = np.full(len(keys), -1, dtype=np.int64)
+        todo = np.arange(len(keys))
+        while len(todo):
+            k = self.keys[pos[todo]]
+            hit = k == keys[todo]
+            out[todo[hit]] = pos[todo[hit]]
+            todo = todo[~hit & (k != _EMPTY)]
+            pos[todo] = (pos[todo] + 1) & int(self.mask)
+        return out
+
+    def find_or_insert(self, keys):
+        """Positions of ``keys``, inserting absent ones; returns ``(pos, was_absent)``."""
+        pos = self.find(keys)
+        missing = pos < 0
+        if missing.any():
+            generation = self.generation
+            new_keys = np.unique(keys[missing])
+            new_pos = self.insert(new_keys)
+            if self.generation != generation:
+                pos = self.find(keys)
+            else:
+                pos[missing] = new_pos[np.searchsorted(new_keys, keys[missing])]
+        return pos, missing
+
+    def insert(self, keys):
+        """Add unique, absent ``keys`` with zeroed values; returns their positions."""
+        if (self.used + len(keys)) * 2 > len(self.keys):
+            self._rehash(self.size + len(keys))
+        return self._place(keys)
+
+    def _place(self, keys):
+        pos = (keys & self.mask).astype(np.int64)
+        out = np.empty(len(keys), dtype=np.int64)
+        todo = np.arange(len(keys))
+        while len(todo):
+            cand = todo[self.keys[pos[todo]] <= _TOMBSTONE]
+            # one key per free position per round; the rest probe on
+            _, first = np.unique(pos[cand], return_index=True)
+            win = cand[first]
+            self.used += int((self.keys[pos[win]] == _EMPTY).sum())
+            self.keys[pos[win]] = keys[win]
+            out[win] = pos[win]
+            placed = np.zeros(len(keys), dtype=bool)
+            placed[win] = True
+            todo = todo[~placed[todo]]
+            pos[todo] = (pos[todo] + 1) & int(self.mask)
+        self.size += len(keys)
+        return out
+
+    def delete(self, pos):
+        self.keys[pos] = _TOMBSTONE
+        for v in self.values.values():
+            v[pos] = 0
+        self.size -= len(pos)
+
+    def _rehash(self, n):
+        # sized from the live keys, so the table also shrinks after evictions
+        live = self.keys > _TOMBSTONE
+        keys, values = self.keys[live], {k: v[live] for k, v in self.values.items()}
+        capacity = max(_MIN_CAPACITY, 1 << int(3 * n).bit_length())
+        self._alloc(capacity)
+        pos = self._place(keys)
+        for name, v in values.items():
+            self.values[name][pos] = v
+
+
+class VelocityEngine:
+    """Rolling per-account state over the last ``window`` steps."""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.orig  = _HashTable(_ACCOUNT_COLS)
+        self.dest  = _HashTable(_ACCOUNT_COLS)
+        self.pairs = _HashTable({"count": np.int32})
+        self.step  = None
+        self._events = deque()   # (step, orig keys, dest keys, pair keys, amounts)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the tables and the in-window transactions."""
+        events = sum(a.nbytes for e in self._events for a in e[1:])
+        return self.orig.nbytes + self.dest.nbytes + self.pairs.nbytes + events
+
+    def stats(self):
+        return {"senders": self.orig.size, "receivers": self.dest.size,
+                "pairs": self.pairs.size, "events": sum(len(e[4]) for e in self._events),
+                "state_mb": self.nbytes / 2 ** 20}
+
+    def update(self, df):
+        """Velocity features for ``df``'s rows, then add the rows to the state.
+
+        ``df`` needs ``step``, ``amount``, ``nameOrig`` and ``nameDest`` (a
+        DataFrame or a list of transaction dicts). Returns a float64 frame of
+        ``VELOCITY_COLS`` aligned with ``df``.
+        """
+        if not isinstance(df, pd.DataFrame):
+            df = pd.DataFrame(df, columns=["step", "amount", "nameOrig", "nameDest"])
+        index = df.index
+        steps = df["step"].to_numpy(dtype=np.int64)
+        out = np.empty((len(df), len(VELOCITY_COLS)), dtype=np.float64)
+        if len(df):
+            if self.step is not None and steps.min() < self.step:
+                raise ValueError(f"step {steps.min()} arrived after step {self.step}; "
+                                 "rows must be in non-decreasing step order")
+            order = np.argsort(steps, kind="stable")
+            steps = steps[order]
+            orig = account_keys(df["nameOrig"])[order]
+            dest = account_keys(df["nameDest"])[order]
+            amount = df["amount"].to_numpy(dtype=np.float64)[order]
+            bounds = np.flatnonzero(np.r_[True, steps[1:] != steps[:-1], True])
+            feats = np.empty_like(out)
+            for a, b in zip(bounds[:-1], bounds[1:]):
+                feats[a:b] = self._step(int(steps[a]), orig[a:b], dest[a:b], amount[a:b])
+            out[order] = feats
+        return pd.DataFrame(out, columns=VELOCITY_COLS, index=index)
+
+    def _step(self, step, orig, dest, amount):
+        self._expire(step)
+        self.step = step
+        pair = _pair_keys(orig, dest)
+        pair_pos, missing = self.pairs.find_or_insert(pair)
+        new_pair = missing & ~pd.Series(pair).duplicated().to_numpy()
+        upos, inv = np.unique(pair_pos, return_inverse=True)
+        self.pairs.values["count"][upos] += np.bincount(inv).astype(np.int32)
+
+        feats = np.column_stack([self._account_side(self.orig, orig, amount, new_pair, step),
+                                 self._account_side(self.dest, dest, amount, new_pair, step)])
+        self._events.append((step, orig, dest, pair, amount))
+        return feats
+
+    def _account_side(self, table, keys, amount, new_pair, step):
+        pos, _ = table.find_or_insert(keys)
+        v = table.values
+
+        # history before each row = table state + earlier rows of this step
+        groups = pd.Series(amount).groupby(pos, sort=False)
+        earlier = groups.cumcount().to_numpy()
+        earlier_amount = groups.cumsum().to_numpy() - amount
+        earlier_pairs = (pd.Series(new_pair.astype(np.int32)).groupby(pos, sort=False)
+                         .cumsum().to_numpy() - new_pair)
+        count = v["count"][pos]
+        since = np.where(earlier > 0, 0,
+                         np.where(count > 0, step - v["last"][pos], self.window))
+        feats = np.column_stack([count + earlier, v["amount"][pos] + earlier_amount,
+                                 v["distinct"][pos] + earlier_pairs, since])
+
+        upos, inv = np.unique(pos, return_inverse=True)
+        v["count"][upos]    += np.bincount(inv).astype(np.int32)
+        v["amount"][upos]   += np.bincount(inv, amount)
+        v["distinct"][upos] += np.bincount(inv, new_pair).astype(np.int32)
+        v["last"][upos]      = step
+        return feats
+
+    def _expire(self, step):
+        expired = []
+        while self._events and self._events[0][0] <= step - self.window:
+            expired.append(self._events.popleft())
+        if not expired:
+            return
+        orig, dest, pair, amount = (np.concatenate([e[i] for e in expired]) for i in range(1, 5))
+
+        # pairs with no transaction left in the window stop counting as counterparties
+        upair, first, inv = np.unique(pair, return_index=True, return_inverse=True)
+        pair_pos = self.pairs.find(upair)
+        self.pairs.values["count"][pair_pos] -= np.bincount(inv).astype(np.int32)
+        dead = self.pairs.values["count"][pair_pos] == 0
+        for table, keys in ((self.orig, orig), (self.dest, dest)):
+            uk, kinv = np.unique(keys[first[dead]], return_inverse=True)
+            table.values["distinct"][table.find(uk)] -= np.bincount(kinv).astype(np.int32)
+        self.pairs.delete(pair_pos[dead])
+
+        for table, keys in ((self.orig, orig), (self.dest, dest)):
+            uk, kinv = np.unique(keys, return_inverse=True)
+            pos = table.find(uk)
+            table.values["count"][pos]  -= np.bincount(kinv).astype(np.int32)
+            table.values["amount"][pos] -= np.bincount(kinv, amount)
+            table.delete(pos[table.values["count"][pos] == 0])   # evict idle accounts
+
+
+def add_velocity_features(chunks, window=DEFAULT_WINDOW, engine=None):
+    """Yield each chunk with ``VELOCITY_COLS`` appended, in one streaming pass."""
+    engine = engine or VelocityEngine(window)
+    for chunk in chunks:
+        yield pd.concat([chunk, engine.update(chunk)], axis=1)
+
+
+def main(argv=None):
+    from ingest import CHUNK_ROWS, read_csv_chunks
+    from extmem_training import peak_rss_mb
+
+    parser = argparse.ArgumentParser(description="Stream per-account velocity features for a PaySim CSV")
+    parser.add_argument("source", help="PaySim-format CSV in step order")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="steps of history kept")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--out", help="write the features (with step, nameOrig, nameDest) as Parquet")
+    args = parser.parse_args(argv)
+
+    engine = VelocityEngine(args.window)
+    writer, rows, peak_state = None, 0, 0.0
+    t0 = time.perf_counter()
+    try:
+        for chunk in read_csv_chunks(args.source, args.chunk_rows):
+            feats = engine.update(chunk)
+            rows += len(chunk)
+            peak_state = max(peak_state, engine.nbytes / 2 ** 20)
+            if args.out:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(pd.concat(
+                    [chunk[["step", "nameOrig", "nameDest"]], feats], axis=1), preserve_index=False)
+                writer = writer or pq.ParquetWriter(args.out, table.schema)
+                writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    seconds = time.perf_counter() - t0
+    s = engine.stats()
+    print(f"{rows:,} rows in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/s), "
+          f"window {args.window} steps")
+    print(f"in window at the end: {s['senders']:,} senders, {s['receivers']:,} receivers, "
+          f"{s['pairs']:,} pairs, {s['events']:,} transactions")
+    print(f"peak state {peak_state:.1f} MB, peak RSS {peak_rss_mb():.0f} MB")
+    if args.out:
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
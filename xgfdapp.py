@@ -1,18 +1,24 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-import io
-
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score,
-    confusion_matrix, roc_auc_score, roc_curve, classification_report
+import os
+import time
+
+from features import FEATURE_COLS
+from account_index import load_index
+from analytics_cube import build_cube, density_sample
+from dataset_cache import dataset_key, load_correlation, load_dataset, load_features
+from fast_scorer import FastScorer
+from model_registry import (
+    decision_threshold, list_models, load_artifact, load_meta, load_model, pin_model,
+    pinned_model_id, resolve_model_id, save_model, update_meta
 )
-from xgboost import XGBClassifier
-from imblearn.over_sampling import SMOTE
+from ingest import CORR_COLS, summarize_csv, summarize_frame
+from thresholds import ThresholdSweep
+
+# Plotly and the training stack (xgboost, scikit-learn, imblearn) are imported
+# by the pages that use them, so a cold start only pays for what it renders.
+# Check with: python startup_bench.py
 
 # ─── Page Config ────────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -434,35 +440,129 @@ def apply_theme(fig):
 
 # ─── Session State ───────────────────────────────────────────────────────────────
 for key, default in [
-    ("data", None), ("model", None), ("le_type", None),
+    ("data", None), ("data_key", None), ("model", None), ("le_type", None),
     ("X_test", None), ("y_test", None), ("y_prob", None),
-    ("metrics", None)
+    ("metrics", None), ("summary", None), ("model_id", None), ("rebalance_runs", [])
 ]:
     if key not in st.session_state:
         st.session_state[key] = default
 
 # ─── Helpers ─────────────────────────────────────────────────────────────────────
-@st.cache_data
-def load_csv(file):
-    return pd.read_csv(file)
-
-def engineer_features(df):
-    d = df.copy()
-    d["balanceDiff_Orig"]   = d["oldbalanceOrg"]  - d["newbalanceOrig"]
-    d["balanceDiff_Dest"]   = d["newbalanceDest"]  - d["oldbalanceDest"]
-    d["isOriginEmpty"]      = (d["newbalanceOrig"] == 0).astype(int)
-    d["amountPercent_Orig"] = d["amount"] / (d["oldbalanceOrg"] + 1)
-    d["errorBalanceOrig"]   = d["balanceDiff_Orig"] - d["amount"]
-    d["errorBalanceDest"]   = d["balanceDiff_Dest"] - d["amount"]
-    le = LabelEncoder()
-    d["type_encoded"]       = le.fit_transform(d["type"])
-    return d, le
-
-FEATURE_COLS = [
-    "step", "type_encoded", "amount", "oldbalanceOrg", "newbalanceOrig",
-    "oldbalanceDest", "newbalanceDest", "balanceDiff_Orig", "balanceDiff_Dest",
-    "isOriginEmpty", "amountPercent_Orig", "errorBalanceOrig", "errorBalanceDest"
-]
+@st.cache_resource(show_spinner="Opening dataset…")
+def open_dataset(key, _source):
+    # Memory-mapped Arrow cache; _source is only read on the first open of a key
+    return load_dataset(_source, key=key)[1]
+
+@st.cache_resource(show_spinner="Engineering features…")
+def open_features(key, _df):
+    return load_features(key, _df)
+
+@st.cache_resource(show_spinner="Aggregating analytics…")
+def open_cube(key, _df):
+    # Built once per dataset; every Analytics chart reads these aggregates
+    return build_cube(_df)
+
+@st.cache_resource(show_spinner="Accumulating correlations…")
+def open_correlation(key, _df):
+    # Running co-moments on disk; an appended dataset only adds its new rows
+    corr = load_correlation(key, _df)
+    if corr is None:   # not PaySim-typed: fall back to the engineered features
+        df_fe, _ = open_features(key, _df)
+        corr = df_fe[CORR_COLS].corr()
+    return corr
+
+@st.cache_data(show_spinner="Binning balance scatter…")
+def balance_points(key, side, _df):
+    x, y = {"Origin": ("oldbalanceOrg", "newbalanceOrig"),
+            "Destination": ("oldbalanceDest", "newbalanceDest")}[side]
+    return density_sample(_df, x, y)
+
+@st.cache_resource(show_spinner="Indexing accounts…")
+def open_account_index(key, _df):
+    return load_index(key, _df)
+
+@st.cache_data(show_spinner="Profiling dataset…")
+def frame_summary(key, _df):
+    # Same shape as load_summary, computed once per loaded dataset
+    return summarize_frame(_df)
+
+@st.cache_data(show_spinner="Streaming dataset in chunks…")
+def load_summary(source, mtime=None):
+    # mtime only keys the cache so edited server-side files are re-read
+    return summarize_csv(source)
+
+@st.cache_resource(show_spinner="Loading model from registry…")
+def registered_model(model_id):
+    return load_model(model_id)
+
+def restore_model(model_id):
+    """Make a registered model (and its saved evaluation, if any) the active one."""
+    model, le, meta = registered_model(model_id)
+    st.session_state.model    = model
+    st.session_state.le_type  = le
+    st.session_state.model_id = model_id
+    evaluation = load_artifact(model_id, "evaluation")
+    if evaluation is not None:
+        metrics = dict(meta["metrics"])
+        metrics["CM"] = np.array(metrics["CM"])
+        st.session_state.y_test  = pd.Series(evaluation["y_test"], name="isFraud")
+        st.session_state.y_prob  = evaluation["y_prob"]
+        st.session_state.metrics = metrics
+    else:
+        st.session_state.y_test  = None
+        st.session_state.y_prob  = None
+        st.session_state.metrics = None
+
+@st.cache_resource
+def fast_scorer(model_id, threshold, _model, _le):
+    return FastScorer(_model, _le, threshold)
+
+@st.cache_resource
+def threshold_sweep(model_id, _y_test, _y_prob):
+    # Saved with the model at training time; rebuilt (one sort) for older models
+    arrays = load_artifact(model_id, "threshold_sweep")
+    if arrays is not None:
+        return ThresholdSweep.from_arrays(arrays)
+    return ThresholdSweep.from_scores(_y_test, _y_prob)
+
+def account_history(widget_key):
+    """Account id box + the loaded dataset's transactions for that account."""
+    c1, c2 = st.columns([3, 2])
+    account = c1.text_input("Account ID (nameOrig / nameDest)", key=f"{widget_key}_account",
+                            placeholder="C1231006815").strip()
+    direction = c2.radio("Direction", ["both", "sent", "received"], horizontal=True,
+                         key=f"{widget_key}_direction")
+    if not account:
+        return
+    df = st.session_state.data
+    index = open_account_index(st.session_state.data_key, df)
+    t0 = time.perf_counter_ns()
+    hits = index.lookup(df, account, direction)
+    elapsed_us = (time.perf_counter_ns() - t0) / 1e3
+    st.caption(f"{len(hits):,} transaction(s) for `{account}` · index lookup {elapsed_us:,.0f} µs")
+    if len(hits):
+        st.dataframe(hits, use_container_width=True)
+
+def class_box_figure(cube, col, title, y_label=None):
+    """Box per isFraud class drawn from the cube's precomputed box statistics."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for fraud, color in [(0, "#0D9E7E"), (1, "#D93025")]:
+        b = cube.box(col, fraud)
+        if b is None:
+            continue
+        fig.add_trace(go.Box(x=[fraud], q1=[b["q1"]], median=[b["median"]], q3=[b["q3"]],
+                             lowerfence=[b["lowerfence"]], upperfence=[b["upperfence"]],
+                             name=str(fraud), legendgroup=str(fraud), marker_color=color))
+        # Outliers (capped sample) as their own trace, since precomputed boxes carry no points
+        fig.add_trace(go.Scatter(x=np.full(len(b["outliers"]), fraud), y=b["outliers"],
+                                 mode="markers", name=str(fraud), legendgroup=str(fraud),
+                                 showlegend=False, marker=dict(color=color, size=4)))
+    fig.update_layout(title=title, xaxis_title="Is Fraud" if y_label else "isFraud",
+                      yaxis_title=y_label or col, legend_title_text="isFraud")
+    fig.update_xaxes(tickvals=[0, 1])
+    return fig
 
 def page_header(badge, title, subtitle):
     st.markdown(f"""
@@ -473,6 +573,19 @@ def page_header(badge, title, subtitle):
     </div>
     """, unsafe_allow_html=True)
 
+def require_model():
+    """Load the session's registered model on the pages that score with it."""
+    if st.session_state.model is None and st.session_state.model_id is not None:
+        restore_model(st.session_state.model_id)
+
+# Serve the pinned / newest registered model instead of retraining per session;
+# only its id is resolved here, loading it (and xgboost) waits for require_model()
+if st.session_state.model_id is None:
+    try:
+        st.session_state.model_id = resolve_model_id()
+    except FileNotFoundError:
+        pass
+
 # ─── Sidebar ──────────────────────────────────────────────────────────────────────
 with st.sidebar:
     st.markdown("""
@@ -494,6 +607,13 @@ with st.sidebar:
             Dataset active — {len(df_info):,} records
         </div>
         """, unsafe_allow_html=True)
+    elif st.session_state.summary is not None:
+        st.markdown(f"""
+        <div class="sf-status-bar">
+            <div class="sf-status-dot"></div>
+            Dataset profiled — {st.session_state.summary["rows"]:,} records
+        </div>
+        """, unsafe_allow_html=True)
 
     st.markdown('<div class="sf-nav-label">Platform</div>', unsafe_allow_html=True)
     page = st.radio(
@@ -510,11 +630,12 @@ with st.sidebar:
     )
 
     st.markdown('<div class="sf-sep"></div>', unsafe_allow_html=True)
-    st.markdown("""
+    st.markdown(f"""
     <div style="font-family:'DM Mono',monospace; font-size:0.68rem; color:#9CA3AF; line-height:1.8; padding: 0 4px;">
         <div>ENGINE &nbsp;&nbsp;&nbsp; XGBoost v2</div>
         <div>BALANCE &nbsp; SMOTE</div>
         <div>VERSION &nbsp; 3.1.0</div>
+        <div>MODEL &nbsp;&nbsp;&nbsp; {st.session_state.model_id or "—"}</div>
     </div>
     """, unsafe_allow_html=True)
 
@@ -546,7 +667,7 @@ if page == "🏠  Overview":
         c1.metric("Total Records",   f"{len(df_s):,}")
         c2.metric("Fraud Cases",     f"{int(fc_s):,}")
         c3.metric("Fraud Rate",      f"{fc_s/len(df_s)*100:.3f}%")
-        model_status = "✓ Trained" if st.session_state.model else "Not Trained"
+        model_status = "✓ Trained" if st.session_state.model_id else "Not Trained"
         c4.metric("Model Status",    model_status)
         st.markdown('<div class="sf-sep"></div>', unsafe_allow_html=True)
 
@@ -627,43 +748,79 @@ if page == "🏠  Overview":
 elif page == "📊  Data Intelligence":
     page_header("Data Intelligence", "Transaction Dataset Explorer",
                 "Upload your fraud dataset to begin profiling and analysis")
+    import plotly.express as px
 
+    streaming = st.checkbox("Streaming ingestion (large files)",
+                            help="Profile the file chunk by chunk with compact dtypes "
+                                 "instead of loading it into memory")
     uploaded = st.file_uploader("Drop your CSV file here", type=["csv"],
                                  help="PaySim-format or similar transaction dataset")
-
-    if uploaded:
-        df = load_csv(uploaded)
-        st.session_state.data = df
-        st.success(f"✓ Dataset loaded — {df.shape[0]:,} rows × {df.shape[1]} columns")
-
-        tab1, tab2, tab3, tab4 = st.tabs([
-            "  Preview  ", "  Statistics  ", "  Schema  ", "  Target Distribution  "
+    server_path = ""
+    if not uploaded:
+        server_path = st.text_input("…or a CSV path on the server",
+                                    placeholder="/data/paysim_full.csv").strip()
+        if server_path and not os.path.isfile(server_path):
+            st.error(f"File not found: {server_path}")
+            server_path = ""
+
+    if uploaded or server_path:
+        if streaming:
+            source  = uploaded or server_path
+            mtime   = os.path.getmtime(server_path) if server_path else None
+            summary = load_summary(source, mtime)
+            st.session_state.data    = None
+            st.session_state.summary = summary
+            st.success(f"✓ Dataset profiled — {summary['rows']:,} rows × "
+                       f"{len(summary['columns'])} columns (streamed)")
+            st.info("Streaming mode keeps only summaries in memory. Analytics (beyond the "
+                    "correlation matrix) and Model Training need the dataset loaded — "
+                    "turn streaming off to use them.")
+        else:
+            source = uploaded or server_path
+            key    = dataset_key(source)
+            df     = open_dataset(key, source)
+            st.session_state.data     = df
+            st.session_state.data_key = key
+            summary = frame_summary(key, df)
+            st.session_state.summary = summary
+            st.success(f"✓ Dataset loaded — {df.shape[0]:,} rows × {df.shape[1]} columns")
+
+        n_rows = summary["rows"]
+        tab1, tab2, tab3, tab4, tab5 = st.tabs([
+            "  Preview  ", "  Statistics  ", "  Schema  ", "  Target Distribution  ",
+            "  Account History  "
         ])
 
         with tab1:
-            st.dataframe(df.head(25), use_container_width=True)
+            st.dataframe(summary["head"], use_container_width=True)
             c1, c2, c3, c4 = st.columns(4)
-            c1.metric("Rows",          f"{df.shape[0]:,}")
-            c2.metric("Columns",        df.shape[1])
-            c3.metric("Missing Values", int(df.isnull().sum().sum()))
-            c4.metric("Duplicates",     int(df.duplicated().sum()))
+            c1.metric("Rows",          f"{n_rows:,}")
+            c2.metric("Columns",        len(summary["columns"]))
+            c3.metric("Missing Values", int(summary["missing"].sum()))
+            c4.metric("Duplicates",     int(summary["duplicates"]),
+                      help="Estimated count of repeated rows from a fixed 32 MiB Bloom "
+                           "filter; it never misses a duplicate and over-counts by about "
+                           f"{summary['duplicates_error']:.2g} rows on average")
 
         with tab2:
-            st.dataframe(df.describe().round(2), use_container_width=True)
+            st.dataframe(summary["describe"].round(2), use_container_width=True)
 
         with tab3:
-            buf = io.StringIO(); df.info(buf=buf)
-            st.code(buf.getvalue(), language="text")
+            st.code(f"Rows:          {n_rows:,}\n"
+                    f"Columns:       {len(summary['columns'])}\n"
+                    f"Memory usage:  {summary['memory_bytes']/1024**2:,.1f} MB",
+                    language="text")
             miss = pd.DataFrame({
-                "Column":    df.columns,
-                "Dtype":     df.dtypes.values.astype(str),
-                "Missing":   df.isnull().sum().values,
-                "% Missing": (df.isnull().sum().values / len(df) * 100).round(2)
+                "Column":    summary["columns"],
+                "Dtype":     summary["dtypes"].values,
+                "Non-Null":  (n_rows - summary["missing"].values),
+                "Missing":   summary["missing"].values,
+                "% Missing": (summary["missing"].values / n_rows * 100).round(2)
             })
             st.dataframe(miss, use_container_width=True)
 
         with tab4:
-            counts = df["isFraud"].value_counts()
+            counts = summary["class_counts"].reindex([0, 1], fill_value=0)
             c1, c2 = st.columns(2)
             with c1:
                 fig = px.pie(values=counts.values, names=["Legitimate", "Fraudulent"],
@@ -682,7 +839,13 @@ elif page == "📊  Data Intelligence":
                 st.plotly_chart(fig, use_container_width=True)
             c1.metric("Fraudulent",  f"{counts.get(1,0):,}")
             c2.metric("Legitimate",  f"{counts.get(0,0):,}")
-            st.metric("Fraud Rate",  f"{counts.get(1,0)/len(df)*100:.4f}%")
+            st.metric("Fraud Rate",  f"{counts.get(1,0)/n_rows*100:.4f}%")
+
+        with tab5:
+            if st.session_state.data is None:
+                st.info("Account lookups need the dataset loaded — turn streaming off.")
+            else:
+                account_history("di")
     else:
         st.markdown("""
         <div class="sf-card" style="text-align:center; padding:60px; border-style:dashed;">
@@ -702,33 +865,44 @@ elif page == "📊  Data Intelligence":
 elif page == "📈  Analytics":
     page_header("Analytics", "Fraud Pattern Visualizations",
                 "Explore transaction patterns and identify fraud signals")
-    if st.session_state.data is None:
+    import plotly.express as px
+    import plotly.graph_objects as go
+    streamed = st.session_state.data is None
+    if streamed and (st.session_state.summary or {}).get("correlation") is None:
         st.warning("⚠️ Upload a dataset in Data Intelligence first.")
         st.stop()
 
-    df = st.session_state.data
-    viz = st.selectbox("Select Analysis", [
-        "Transaction Type Breakdown",
-        "Amount Distribution",
-        "Balance Flow Analysis",
-        "Feature Correlation Matrix"
-    ])
+    if streamed:
+        # Streaming ingestion only keeps the running correlation statistics
+        st.info("Streamed dataset — showing the correlation matrix accumulated during "
+                "ingestion. Turn streaming off for the other views.")
+        viz = "Feature Correlation Matrix"
+    else:
+        df   = st.session_state.data
+        cube = open_cube(st.session_state.data_key, df)
+        viz = st.selectbox("Select Analysis", [
+            "Transaction Type Breakdown",
+            "Amount Distribution",
+            "Balance Flow Analysis",
+            "Feature Correlation Matrix"
+        ])
 
     if viz == "Transaction Type Breakdown":
+        by_type = cube.by_type()
         c1, c2 = st.columns(2)
         with c1:
-            tc = df["type"].value_counts()
+            tc = by_type["count"].sort_values(ascending=False)
             fig = px.bar(x=tc.index, y=tc.values, title="Volume by Transaction Type",
                          color=tc.values, color_continuous_scale=[[0,"#E2E8F0"],[1,"#B8860B"]])
             apply_theme(fig); st.plotly_chart(fig, use_container_width=True)
         with c2:
-            ft = df.groupby("type")["isFraud"].sum().sort_values(ascending=False)
+            ft = by_type["fraud"].sort_values(ascending=False)
             fig = px.bar(x=ft.index, y=ft.values, title="Fraud Incidents by Type",
                          color=ft.values, color_continuous_scale=[[0,"#FECACA"],[1,"#D93025"]])
             apply_theme(fig); st.plotly_chart(fig, use_container_width=True)
 
         # Fraud rate per type
-        fraud_rate = df.groupby("type")["isFraud"].mean().sort_values(ascending=False) * 100
+        fraud_rate = by_type["fraud_rate"].sort_values(ascending=False)
         fig = px.bar(x=fraud_rate.index, y=fraud_rate.values,
                      title="Fraud Rate (%) by Transaction Type",
                      color=fraud_rate.values,
@@ -736,57 +910,69 @@ elif page == "📈  Analytics":
                      labels={"y":"Fraud Rate (%)"})
         apply_theme(fig); st.plotly_chart(fig, use_container_width=True)
 
+        # Fraud over time, per step bucket
+        by_step = cube.by_step()
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=by_step["step"], y=by_step["fraud"], name="Fraud cases",
+                             marker_color="#D93025"))
+        fig.add_trace(go.Scatter(x=by_step["step"], y=by_step["fraud"] / by_step["count"].clip(lower=1) * 100,
+                                 name="Fraud rate (%)", yaxis="y2", mode="lines",
+                                 line=dict(color="#B8860B")))
+        fig.update_layout(title=f"Fraud over Time ({cube.step_bucket}-step buckets)",
+                          xaxis_title="Step", yaxis2=dict(overlaying="y", side="right"))
+        apply_theme(fig); st.plotly_chart(fig, use_container_width=True)
+
     elif viz == "Amount Distribution":
         c1, c2 = st.columns(2)
         with c1:
             fig = go.Figure()
-            fig.add_trace(go.Histogram(x=df[df["isFraud"]==0]["amount"],
-                                       name="Legitimate", marker_color="#0D9E7E", opacity=0.7, nbinsx=60))
-            fig.add_trace(go.Histogram(x=df[df["isFraud"]==1]["amount"],
-                                       name="Fraudulent", marker_color="#D93025", opacity=0.7, nbinsx=60))
-            fig.update_layout(title="Amount Distribution Overlay", barmode="overlay")
+            for label, fraud, color in [("Legitimate", 0, "#0D9E7E"), ("Fraudulent", 1, "#D93025")]:
+                edges, counts = cube.histogram("amount", is_fraud=fraud)
+                fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+                                     name=label, marker_color=color, opacity=0.7))
+            fig.update_layout(title="Amount Distribution Overlay", barmode="overlay", bargap=0)
             apply_theme(fig); st.plotly_chart(fig, use_container_width=True)
         with c2:
-            fig = px.box(df, x="isFraud", y="amount", title="Amount by Fraud Status",
-                         color="isFraud",
-                         color_discrete_map={0:"#0D9E7E",1:"#D93025"},
-                         labels={"isFraud":"Is Fraud","amount":"Transaction Amount"})
+            fig = class_box_figure(cube, "amount", "Amount by Fraud Status", "Transaction Amount")
             apply_theme(fig); st.plotly_chart(fig, use_container_width=True)
 
     elif viz == "Balance Flow Analysis":
         side = st.radio("Account Side", ["Origin", "Destination"], horizontal=True)
+        # Every fraud row plus one point per occupied density cell of the legit rows
+        pts = balance_points(st.session_state.data_key, side, df)
+        fraud = pts["isFraud"] == 1
+        n_fraud, fraud_rows = int(fraud.sum()), int(pts["rows"][fraud].sum())
+        caption = ((f"All {n_fraud:,} fraud points" if n_fraud == fraud_rows
+                    else f"{fraud_rows:,} fraud rows thinned to {n_fraud:,} points")
+                   + f" · {int(pts['rows'][~fraud].sum()):,} legitimate rows binned into "
+                     f"{int((~fraud).sum()):,} density cells")
         c1, c2 = st.columns(2)
         if side == "Origin":
             with c1:
-                samp = df.sample(min(8000, len(df)))
-                fig = px.scatter(samp, x="oldbalanceOrg", y="newbalanceOrig", color="isFraud",
-                                 title="Origin: Old vs New Balance",
+                fig = px.scatter(pts, x="oldbalanceOrg", y="newbalanceOrig", color="isFraud",
+                                 title="Origin: Old vs New Balance", hover_data=["rows"],
                                  color_discrete_map={0:"#0D9E7E",1:"#D93025"}, opacity=0.55)
                 apply_theme(fig); st.plotly_chart(fig, use_container_width=True)
+                st.caption(caption)
             with c2:
-                fig = px.box(df, x="isFraud", y="oldbalanceOrg",
-                             title="Origin Old Balance by Class",
-                             color="isFraud", color_discrete_map={0:"#0D9E7E",1:"#D93025"})
+                fig = class_box_figure(cube, "oldbalanceOrg", "Origin Old Balance by Class")
                 apply_theme(fig); st.plotly_chart(fig, use_container_width=True)
         else:
             with c1:
-                samp = df.sample(min(8000, len(df)))
-                fig = px.scatter(samp, x="oldbalanceDest", y="newbalanceDest", color="isFraud",
-                                 title="Destination: Old vs New Balance",
+                fig = px.scatter(pts, x="oldbalanceDest", y="newbalanceDest", color="isFraud",
+                                 title="Destination: Old vs New Balance", hover_data=["rows"],
                                  color_discrete_map={0:"#0D9E7E",1:"#D93025"}, opacity=0.55)
                 apply_theme(fig); st.plotly_chart(fig, use_container_width=True)
+                st.caption(caption)
             with c2:
-                fig = px.box(df, x="isFraud", y="oldbalanceDest",
-                             title="Destination Old Balance by Class",
-                             color="isFraud", color_discrete_map={0:"#0D9E7E",1:"#D93025"})
+                fig = class_box_figure(cube, "oldbalanceDest", "Destination Old Balance by Class")
                 apply_theme(fig); st.plotly_chart(fig, use_container_width=True)
 
     elif viz == "Feature Correlation Matrix":
-        df_fe, _ = engineer_features(df)
-        num_cols = ["step","amount","oldbalanceOrg","newbalanceOrig","oldbalanceDest",
-                    "newbalanceDest","balanceDiff_Orig","balanceDiff_Dest","isOriginEmpty",
-                    "amountPercent_Orig","errorBalanceOrig","errorBalanceDest","type_encoded","isFraud"]
-        corr = df_fe[num_cols].corr()
+        if streamed:
+            corr = st.session_state.summary["correlation"]
+        else:
+            corr = open_correlation(st.session_state.data_key, df)
         fig = px.imshow(corr, text_auto=".2f", aspect="auto",
                         title="Feature Correlation Heatmap",
                         color_continuous_scale=[[0,"#D93025"],[0.5,"#F5F7FA"],[1,"#0D9E7E"]],
@@ -799,78 +985,286 @@ elif page == "📈  Analytics":
 elif page == "🤖  Model Training":
     page_header("Model Training", "Configure & Train XGBoost",
                 "Tune hyperparameters and fit the fraud detection model with SMOTE balancing")
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from crossval import cross_validate, cross_validate_serial, summarize as cv_summary
+    from rebalance import REBALANCE_MODES, rebalance
+    from training import evaluate, fit_early_stopping, make_model, split
+    from hpsearch import (
+        OBJECTIVES, SEARCH_SPACE, grid_configs, random_configs, run_search,
+        successive_halving, threads_per_trial
+    )
+    require_model()
+
+    registry = list_models()
+    with st.expander(f"🗂️ Model Registry — {len(registry)} saved model(s)"):
+        if not registry:
+            st.caption("Trained models are saved here automatically and shared with the dashboard app.")
+        else:
+            pinned = pinned_model_id()
+            st.dataframe(pd.DataFrame([{
+                "Model":   m["model_id"] + ("  📌" if m["model_id"] == pinned else ""),
+                "Source":  m["source"],
+                "Dataset": (m["dataset_hash"] or "synthetic")[:12],
+                "ROC-AUC": m["metrics"].get("ROC-AUC"),
+                "F1":      m["metrics"].get("F1-Score", m["metrics"].get("f1")),
+            } for m in registry]), use_container_width=True, hide_index=True)
+            ids = [m["model_id"] for m in registry]
+            chosen = st.selectbox("Registered model", ids,
+                                  index=ids.index(st.session_state.model_id)
+                                  if st.session_state.model_id in ids else 0)
+            r1, r2, r3 = st.columns(3)
+            if r1.button("Load model"):
+                restore_model(chosen)
+                st.rerun()
+            if r2.button("📌 Pin for all sessions"):
+                pin_model(chosen)
+                st.rerun()
+            if r3.button("Unpin", disabled=pinned is None):
+                pin_model(None)
+                st.rerun()
+
     if st.session_state.data is None:
         st.warning("⚠️ Upload a dataset in Data Intelligence first.")
         st.stop()
 
     df = st.session_state.data
 
+    mode = st.radio("Training Mode", ["Single model", "Cross-validation", "Hyperparameter search"],
+                    horizontal=True)
+
     c1, c2 = st.columns(2)
     with c1:
         st.markdown('<div class="sf-card">', unsafe_allow_html=True)
         st.markdown("**⚖️ Data Splitting & Sampling**")
         test_size       = st.slider("Test Set Size (%)", 10, 40, 20) / 100
-        smote_strategy  = st.slider("SMOTE Strategy (minority ratio)", 0.1, 1.0, 0.5, 0.05)
+        balance_mode    = st.selectbox("Rebalancing", REBALANCE_MODES,
+                                       help="Streamed SMOTE writes synthetic rows in batches; "
+                                            "undersampling and class weights add no rows")
+        smote_strategy  = st.slider("Target minority ratio", 0.1, 1.0, 0.5, 0.05,
+                                    disabled=balance_mode == "None")
         st.markdown('</div>', unsafe_allow_html=True)
 
-    with c2:
-        st.markdown('<div class="sf-card">', unsafe_allow_html=True)
-        st.markdown("**🧠 XGBoost Hyperparameters**")
-        n_estimators     = st.slider("n_estimators",        50, 500, 100, 50)
-        max_depth        = st.slider("max_depth",             3, 12, 6)
-        learning_rate    = st.slider("learning_rate",      0.01, 0.30, 0.10, 0.01)
-        st.markdown('</div>', unsafe_allow_html=True)
-
-    c1b, c2b, c3b = st.columns(3)
-    subsample        = c1b.slider("subsample",          0.5, 1.0, 0.8, 0.05)
-    colsample_bytree = c2b.slider("colsample_bytree",   0.5, 1.0, 0.8, 0.05)
-    scale_pos_weight = c3b.number_input("scale_pos_weight",  1, 300, 1,
-                                        help="Increase to penalise missed fraud (class weight)")
-
-    st.markdown("")
-    if st.button("  🚀  Train XGBoost Model  ", type="primary"):
-        with st.spinner("Engineering features · Applying SMOTE · Training XGBoost…"):
-            df_fe, le_type = engineer_features(df)
-            st.session_state.le_type = le_type
+    trained = None
+    if mode != "Hyperparameter search":
+        with c2:
+            st.markdown('<div class="sf-card">', unsafe_allow_html=True)
+            st.markdown("**🧠 XGBoost Hyperparameters**")
+            n_estimators     = st.slider("n_estimators",        50, 500, 100, 50,
+                                             help="Upper bound when early stopping is on")
+            max_depth        = st.slider("max_depth",             3, 12, 6)
+            learning_rate    = st.slider("learning_rate",      0.01, 0.30, 0.10, 0.01)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+        c1b, c2b, c3b = st.columns(3)
+        subsample        = c1b.slider("subsample",          0.5, 1.0, 0.8, 0.05)
+        colsample_bytree = c2b.slider("colsample_bytree",   0.5, 1.0, 0.8, 0.05)
+        class_weighted   = balance_mode == "Class weights"
+        scale_pos_weight = c3b.number_input("scale_pos_weight",  1, 300, 1,
+                                            disabled=class_weighted,
+                                            help="Increase to penalise missed fraud (class weight); "
+                                                 "fixed at 1 when rebalancing with class weights")
+        if class_weighted:   # the sample weights already up-weight fraud
+            scale_pos_weight = 1
+        params = dict(
+            n_estimators=n_estimators, max_depth=max_depth,
+            learning_rate=learning_rate, subsample=subsample,
+            colsample_bytree=colsample_bytree, scale_pos_weight=scale_pos_weight
+        )
+
+    if mode == "Single model":
+        e1, e2, e3 = st.columns(3)
+        early_stop  = e1.checkbox("Early stopping", value=True,
+                                  help="Hold out 20% of the training set (before rebalancing) and stop "
+                                       "when the validation metric stops improving")
+        patience    = e2.slider("Patience (rounds)", 5, 100, 20, 5, disabled=not early_stop)
+        stop_metric = e3.selectbox("Stop on", ["aucpr", "logloss"], disabled=not early_stop)
+
+        st.markdown("")
+        if st.button("  🚀  Train XGBoost Model  ", type="primary"):
+            with st.spinner(f"Engineering features · Rebalancing ({balance_mode}) · Training XGBoost…"):
+                df_fe, le_type = open_features(st.session_state.data_key, df)
+                X_train, X_test, y_train, y_test = split(
+                    df_fe[FEATURE_COLS], df_fe["isFraud"], test_size
+                )
+                if early_stop:
+                    X_fit, X_val, y_fit, y_val = split(X_train, y_train, 0.2)
+                    X_bal, y_bal, weights, balance = rebalance(X_fit, y_fit, balance_mode,
+                                                               smote_strategy)
+                    model, es = fit_early_stopping(params, X_bal, y_bal, X_val, y_val,
+                                                   patience=patience, stop_metric=stop_metric,
+                                                   sample_weight=weights)
+                    curves = es.pop("curves")
+                    params["early_stopping"] = dict(es, patience=patience)
+                else:
+                    X_bal, y_bal, weights, balance = rebalance(X_train, y_train, balance_mode,
+                                                               smote_strategy)
+                    model = make_model(params)
+                    model.fit(X_bal, y_bal, sample_weight=weights)
+                trained = model, params
+
+    elif mode == "Cross-validation":
+        cpus = os.cpu_count() or 1
+        v1, v2, v3 = st.columns(3)
+        k_folds   = v1.slider("Folds (stratified)", 3, 10, 5)
+        n_workers = (v2.slider("Parallel folds (processes)", 1, min(cpus, k_folds), min(cpus, k_folds))
+                     if cpus > 1 else 1)
+        v2.caption(f"Each fold gets {threads_per_trial(n_workers)} XGBoost thread(s).")
+        time_serial = v3.checkbox("Also time a serial run", value=False,
+                                  help="Runs the same folds in-process, one after another, "
+                                       "to measure the wall-clock speedup")
+
+        st.markdown("")
+        if st.button("  🔁  Run Cross-Validation  ", type="primary"):
+            df_fe, _ = open_features(st.session_state.data_key, df)
+            progress = st.progress(0.0, text="Starting workers…")
+
+            def show(rows):
+                progress.progress(len(rows) / k_folds, text=f"{len(rows)}/{k_folds} folds")
+
+            # rebalancing happens inside each fold, on that fold's training rows
+            rows, wall = cross_validate(df_fe[FEATURE_COLS], df_fe["isFraud"], params, k=k_folds,
+                                        balance_mode=balance_mode, ratio=smote_strategy,
+                                        n_workers=n_workers, on_result=show)
+            progress.empty()
+            summary = cv_summary(rows)
+
+            st.success(f"✓ {k_folds}-fold cross-validation finished in {wall:.1f}s.")
+            c1, c2, c3, c4, c5 = st.columns(5)
+            for col, (label, key) in zip([c1, c2, c3, c4, c5], [
+                    ("Precision", "Precision"), ("Recall", "Recall"), ("F1-Score", "F1-Score"),
+                    ("ROC-AUC", "ROC-AUC"), ("Avg Precision", "Average Precision")]):
+                col.metric(label, f"{summary.loc[key, 'mean']*100:.2f}%",
+                           delta=f"± {summary.loc[key, 'std']*100:.2f}", delta_color="off")
+
+            fold_time = sum(r["seconds"] for r in rows)
+            if time_serial:
+                with st.spinner("Timing the serial baseline…"):
+                    _, serial_wall = cross_validate_serial(
+                        df_fe[FEATURE_COLS], df_fe["isFraud"], params, k=k_folds,
+                        balance_mode=balance_mode, ratio=smote_strategy)
+                st.info(f"Serial run {serial_wall:.1f}s vs parallel {wall:.1f}s — "
+                        f"{serial_wall / wall:.2f}× speedup with {n_workers} process(es).")
+            else:
+                st.info(f"Folds took {fold_time:.1f}s of compute in {wall:.1f}s wall-clock — "
+                        f"≈{fold_time / wall:.2f}× over running them back to back.")
 
-            X = df_fe[FEATURE_COLS]
-            y = df_fe["isFraud"]
+            st.dataframe(pd.DataFrame(rows).round(4), use_container_width=True, hide_index=True)
 
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size, random_state=42, stratify=y
+    else:
+        cpus = os.cpu_count() or 1
+        with c2:
+            st.markdown('<div class="sf-card">', unsafe_allow_html=True)
+            st.markdown("**🔎 Search Settings**")
+            strategy  = st.selectbox("Strategy", ["Random", "Grid", "Successive halving"])
+            objective = st.selectbox("Optimise", OBJECTIVES,
+                                     help="Scored on a stratified validation split of the training set")
+            n_trials  = st.slider("Trials / starting configs", 4, 108, 24, 4,
+                                  disabled=strategy == "Grid")
+            n_workers = (st.slider("Parallel trials (processes)", 1, cpus, max(1, cpus // 2))
+                         if cpus > 1 else 1)
+            st.caption(f"Each trial gets {threads_per_trial(n_workers)} XGBoost thread(s).")
+            st.markdown('</div>', unsafe_allow_html=True)
+
+        with st.expander("Search space"):
+            space = {}
+            for name, values in SEARCH_SPACE.items():
+                if name == "n_estimators" and strategy == "Successive halving":
+                    continue   # boosting rounds are the halving budget
+                if name == "scale_pos_weight" and balance_mode == "Class weights":
+                    space[name] = [1]   # the sample weights already up-weight fraud
+                    continue
+                space[name] = st.multiselect(name, values, default=values) or values
+            configs = grid_configs(space)
+            if strategy != "Grid":
+                configs = random_configs(space, n_trials)
+            st.caption(f"{len(configs)} configuration(s) will be trained.")
+
+        st.markdown("")
+        if st.button("  🔎  Run Hyperparameter Search  ", type="primary"):
+            df_fe, le_type = open_features(st.session_state.data_key, df)
+            X_train, X_test, y_train, y_test = split(
+                df_fe[FEATURE_COLS], df_fe["isFraud"], test_size
             )
-            smote = SMOTE(random_state=42, sampling_strategy=smote_strategy)
-            X_bal, y_bal = smote.fit_resample(X_train, y_train)
-
-            model = XGBClassifier(
-                n_estimators=n_estimators, max_depth=max_depth,
-                learning_rate=learning_rate, subsample=subsample,
-                colsample_bytree=colsample_bytree, scale_pos_weight=scale_pos_weight,
-                random_state=42, n_jobs=-1, eval_metric="logloss",
-                use_label_encoder=False
+            X_fit, X_val, y_fit, y_val = split(X_train, y_train, 0.2)
+            X_bal, y_bal, weights, balance = rebalance(X_fit, y_fit, balance_mode, smote_strategy)
+
+            progress = st.progress(0.0, text="Starting workers…")
+            board    = st.empty()
+            total    = len(configs) if strategy != "Successive halving" else None
+
+            def show(result):
+                if total:
+                    progress.progress(len(result.rows) / total,
+                                      text=f"{len(result.rows)}/{total} trials")
+                else:
+                    progress.progress(1.0, text=f"{len(result.rows)} trials")
+                board.dataframe(pd.DataFrame(result.rows).round(4),
+                                use_container_width=True, hide_index=True)
+
+            data = (X_bal, y_bal, X_val, y_val, weights)
+            if strategy == "Successive halving":
+                result = successive_halving(configs, data, n_workers, objective, on_result=show)
+            else:
+                result = run_search(configs, data, n_workers, objective, on_result=show)
+            progress.empty()
+
+            best   = result.best
+            params = {k: best[k] for k in SEARCH_SPACE}
+            params["search"] = {"strategy": strategy, "objective": objective,
+                                "trials": len(result.rows), objective: best[objective]}
+            st.info(f"Best trial #{best['trial']} — validation {objective} "
+                    f"{best[objective]:.4f}. Evaluating on the test set.")
+            trained = result.best_model(), params
+
+    if trained:
+        model, params = trained
+        with st.spinner("Evaluating on the test set…"):
+            y_prob, metrics = evaluate(model, X_test, y_test)
+            params = dict(test_size=test_size, rebalance=balance_mode,
+                          smote_strategy=smote_strategy, **params)
+            model_id = save_model(
+                model, le_type.classes_, params, metrics,
+                dataset_hash=st.session_state.data_key,
+                artifacts={
+                    "evaluation":      {"y_test": y_test.to_numpy(), "y_prob": y_prob},
+                    "threshold_sweep": ThresholdSweep.from_scores(
+                        y_test, y_prob, loss=X_test["amount"].to_numpy()).arrays(),
+                }
             )
-            model.fit(X_bal, y_bal)
-
-            y_pred = model.predict(X_test)
-            y_prob = model.predict_proba(X_test)[:, 1]
-
-            metrics = {
-                "Test Accuracy": accuracy_score(y_test, y_pred),
-                "Precision":     precision_score(y_test, y_pred),
-                "Recall":        recall_score(y_test, y_pred),
-                "F1-Score":      f1_score(y_test, y_pred),
-                "ROC-AUC":       roc_auc_score(y_test, y_prob),
-                "CM":            confusion_matrix(y_test, y_pred),
-                "Report":        classification_report(y_test, y_pred,
-                                                        target_names=["Legitimate","Fraudulent"])
-            }
-            st.session_state.model   = model
-            st.session_state.X_test  = X_test
-            st.session_state.y_test  = y_test
-            st.session_state.y_prob  = y_prob
-            st.session_state.metrics = metrics
+            st.session_state.model    = model
+            st.session_state.le_type  = le_type
+            st.session_state.model_id = model_id
+            st.session_state.X_test   = X_test
+            st.session_state.y_test   = y_test
+            st.session_state.y_prob   = y_prob
+            st.session_state.metrics  = metrics
+            st.session_state.rebalance_runs.append({
+                "Model": model_id, "Rebalancing": balance["mode"], "Ratio": balance["ratio"],
+                "Seconds": balance["seconds"], "Peak MB": balance["peak_mb"],
+                "Rows in": balance["rows_in"], "Rows out": balance["rows_out"],
+                "F1": metrics["F1-Score"], "Avg Precision": metrics["Average Precision"],
+            })
 
-        st.success("✓ XGBoost trained successfully! Navigate to Performance Report for full results.")
+        st.success(f"✓ XGBoost trained successfully and saved as model `{model_id}`! "
+                   "Navigate to Performance Report for full results.")
+        st.caption(f"Rebalancing ({balance['mode']}) took {balance['seconds']:.2f}s with a "
+                   f"{balance['peak_mb']:.1f} MB allocation peak — "
+                   f"{balance['rows_in']:,} → {balance['rows_out']:,} training rows.")
+        if len(st.session_state.rebalance_runs) > 1:
+            with st.expander("⚖️ Rebalancing comparison (this session)"):
+                st.dataframe(pd.DataFrame(st.session_state.rebalance_runs).round(4),
+                             use_container_width=True, hide_index=True)
+        if "early_stopping" in params:
+            es = params["early_stopping"]
+            st.info(f"Early stopping kept {es['best_iteration'] + 1} of "
+                    f"{params['n_estimators']} trees (best validation {es['stop_metric']} "
+                    f"{es['best_score']:.4f}, {es['rounds_trained']} rounds trained).")
+            fig = go.Figure([go.Scatter(y=v, mode="lines", name=k) for k, v in curves.items()])
+            fig.add_vline(x=es["best_iteration"], line_dash="dash", line_color="#B8860B")
+            fig.update_layout(title="Validation Metrics per Boosting Round",
+                              xaxis_title="Round", yaxis_title="Metric")
+            apply_theme(fig); st.plotly_chart(fig, use_container_width=True)
         c1, c2, c3, c4, c5 = st.columns(5)
         c1.metric("Accuracy",  f"{metrics['Test Accuracy']*100:.2f}%")
         c2.metric("Precision", f"{metrics['Precision']*100:.2f}%")
@@ -895,6 +1289,8 @@ elif page == "🤖  Model Training":
 elif page == "🔍  Transaction Scan":
     page_header("Transaction Scan", "Real-Time Fraud Scoring",
                 "Enter transaction details to receive an instant fraud risk assessment")
+    import plotly.graph_objects as go
+    require_model()
     if st.session_state.model is None:
         st.warning("⚠️ Train the XGBoost model first in Model Training.")
         st.stop()
@@ -916,21 +1312,12 @@ elif page == "🔍  Transaction Scan":
     st.markdown('</div>', unsafe_allow_html=True)
 
     if st.button("  🔍  Analyze Transaction  ", type="primary"):
-        le        = st.session_state.le_type
-        type_enc  = le.transform([trans_type])[0]
-        bd_o      = old_orig - new_orig
-        bd_d      = new_dest - old_dest
-        is_empty  = int(new_orig == 0)
-        amt_pct   = amount / (old_orig + 1)
-        err_o     = bd_o - amount
-        err_d     = bd_d - amount
-
-        feats = np.array([[step, type_enc, amount, old_orig, new_orig,
-                           old_dest, new_dest, bd_o, bd_d, is_empty, amt_pct, err_o, err_d]])
-
-        model  = st.session_state.model
-        pred   = model.predict(feats)[0]
-        prob   = model.predict_proba(feats)[0]
+        threshold = decision_threshold(load_meta(st.session_state.model_id))
+        scorer = fast_scorer(st.session_state.model_id, threshold,
+                             st.session_state.model, st.session_state.le_type)
+        p_fraud, pred, feats = scorer.score(step, trans_type, amount,
+                                            old_orig, new_orig, old_dest, new_dest)
+        prob  = [1 - p_fraud, p_fraud]
 
         st.markdown('<div class="sf-sep"></div>', unsafe_allow_html=True)
         st.subheader("Risk Assessment")
@@ -947,7 +1334,7 @@ elif page == "🔍  Transaction Scan":
         c3.metric("Confidence (Legit)",    f"{prob[0]*100:.2f}%")
 
         # Gauge
-        bar_color = "#D93025" if prob[1] > 0.5 else "#0D9E7E"
+        bar_color = "#D93025" if pred == 1 else "#0D9E7E"
         fig = go.Figure(go.Indicator(
             mode="gauge+number+delta",
             value=round(prob[1]*100, 2),
@@ -963,7 +1350,7 @@ elif page == "🔍  Transaction Scan":
                     {"range":[30,70],  "color":"rgba(184,134,11,0.08)"},
                     {"range":[70,100], "color":"rgba(217,48,37,0.1)"}
                 ],
-                "threshold":{"line":{"color":"#0F172A","width":2},"thickness":0.75,"value":50}
+                "threshold":{"line":{"color":"#0F172A","width":2},"thickness":0.75,"value":threshold*100}
             }
         ))
         apply_theme(fig)
@@ -972,8 +1359,16 @@ elif page == "🔍  Transaction Scan":
 
         # Engineered features breakdown
         with st.expander("🔬 View Engineered Features Used for Prediction"):
-            feat_df = pd.DataFrame({"Feature": FEATURE_COLS, "Value": feats[0]})
+            feat_df = pd.DataFrame({"Feature": FEATURE_COLS, "Value": feats})
             st.dataframe(feat_df, use_container_width=True)
+        lat = scorer.latency_us()
+        st.caption(f"Decision threshold {threshold:.4g} · "
+                   f"scoring latency — p50 {lat['p50']:.0f} µs · p99 {lat['p99']:.0f} µs "
+                   f"over {lat['count']:,} scans")
+
+    if st.session_state.data is not None:
+        with st.expander("🗂️ Account History — other activity in the loaded dataset"):
+            account_history("scan")
 
 # ══════════════════════════════════════════════════════════════════════════════════
 # PERFORMANCE REPORT
@@ -981,13 +1376,16 @@ elif page == "🔍  Transaction Scan":
 elif page == "📉  Performance Report":
     page_header("Performance Report", "XGBoost Model Evaluation",
                 "Comprehensive metrics, visualizations, and threshold sensitivity analysis")
+    import plotly.express as px
+    import plotly.graph_objects as go
+    require_model()
     if st.session_state.metrics is None:
         st.warning("⚠️ Train the XGBoost model first in Model Training.")
         st.stop()
 
-    m   = st.session_state.metrics
-    y_t = st.session_state.y_test
-    y_p = st.session_state.y_prob
+    m     = st.session_state.metrics
+    sweep = threshold_sweep(st.session_state.model_id,
+                            st.session_state.y_test, st.session_state.y_prob)
 
     # Key metrics
     c1, c2, c3, c4, c5 = st.columns(5)
@@ -1016,7 +1414,7 @@ elif page == "📉  Performance Report":
     # ROC Curve
     with col2:
         st.subheader("ROC Curve")
-        fpr, tpr, _ = roc_curve(y_t, y_p)
+        fpr, tpr = sweep.roc_points()
         fig = go.Figure()
         fig.add_trace(go.Scatter(
             x=fpr, y=tpr, mode="lines", fill="tozeroy",
@@ -1064,26 +1462,94 @@ elif page == "📉  Performance Report":
     </div>
     """, unsafe_allow_html=True)
 
-    threshold  = st.slider("Classification Threshold", 0.01, 0.99, 0.50, 0.01)
-    y_pred_t   = (y_p >= threshold).astype(int)
-    c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Precision", f"{precision_score(y_t,y_pred_t,zero_division=0)*100:.2f}%")
-    c2.metric("Recall",    f"{recall_score(y_t,y_pred_t,zero_division=0)*100:.2f}%")
-    c3.metric("F1-Score",  f"{f1_score(y_t,y_pred_t,zero_division=0)*100:.2f}%")
-    c4.metric("Accuracy",  f"{accuracy_score(y_t,y_pred_t)*100:.2f}%")
-
-    # Precision-Recall curve for context
-    from sklearn.metrics import precision_recall_curve
-    prec_curve, rec_curve, thresholds = precision_recall_curve(y_t, y_p)
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=rec_curve, y=prec_curve, mode="lines",
-                             name="Precision-Recall",
-                             line=dict(color="#0D9E7E", width=2.5)))
-    fig.add_vline(x=recall_score(y_t,y_pred_t,zero_division=0),
-                  line=dict(color="#B8860B", dash="dot", width=1.5),
-                  annotation_text=f"Threshold {threshold:.2f}",
-                  annotation_font_color="#B8860B")
-    fig.update_layout(title="Precision vs Recall Curve",
-                      xaxis_title="Recall", yaxis_title="Precision")
-    apply_theme(fig)
-    st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+    @st.fragment
+    def threshold_tuning():
+        # Only this block reruns on slider moves; each tick is a sweep lookup
+        stored = decision_threshold(load_meta(st.session_state.model_id))
+        threshold = st.slider("Classification Threshold", 0.01, 0.99,
+                              float(np.clip(round(stored, 2), 0.01, 0.99)), 0.01)
+        tm = sweep.metrics(threshold)
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Precision", f"{tm['Precision']*100:.2f}%")
+        c2.metric("Recall",    f"{tm['Recall']*100:.2f}%")
+        c3.metric("F1-Score",  f"{tm['F1-Score']*100:.2f}%")
+        c4.metric("Accuracy",  f"{tm['Accuracy']*100:.2f}%")
+
+        # Precision-Recall curve for context
+        rec_curve, prec_curve = sweep.pr_points()
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=rec_curve, y=prec_curve, mode="lines",
+                                 name="Precision-Recall",
+                                 line=dict(color="#0D9E7E", width=2.5)))
+        fig.add_vline(x=tm["Recall"],
+                      line=dict(color="#B8860B", dash="dot", width=1.5),
+                      annotation_text=f"Threshold {threshold:.2f}",
+                      annotation_font_color="#B8860B")
+        fig.update_layout(title="Precision vs Recall Curve",
+                          xaxis_title="Recall", yaxis_title="Precision")
+        apply_theme(fig)
+        st.plotly_chart(fig, use_container_width=True)
+
+    threshold_tuning()
+
+    st.markdown('<div class="sf-sep"></div>', unsafe_allow_html=True)
+
+    # Cost-Based Threshold
+    st.subheader("💰 Cost-Based Threshold")
+    st.markdown("""
+    <div style="font-size:0.83rem; color:#374151; margin-bottom:16px;">
+        Expected cost = <span style="color:#B8860B;">review cost</span> × alerts +
+        <span style="color:#D93025;">loss on missed fraud</span>, evaluated at every threshold
+        on the test set. The recommended threshold can be saved with the model and is then
+        used by the Transaction Scan, the scoring service and batch scoring.
+    </div>
+    """, unsafe_allow_html=True)
+
+    @st.fragment
+    def cost_threshold():
+        c1, c2, c3 = st.columns(3)
+        review_cost = c1.number_input("Review cost per alert (₹)", min_value=0.0,
+                                      value=500.0, step=100.0)
+        bases = (["Transaction amount"] if sweep.has_loss else []) + ["Flat loss per fraud"]
+        basis = c2.selectbox("Fraud loss", bases)
+        fraud_loss = None
+        if basis == "Flat loss per fraud":
+            fraud_loss = c3.number_input("Loss per missed fraud (₹)", min_value=0.0,
+                                         value=100000.0, step=10000.0)
+
+        thresholds, cost = sweep.cost_curve(review_cost, fraud_loss)
+        best = int(np.argmin(cost))
+        best_t = float(thresholds[best])
+        stored = decision_threshold(load_meta(st.session_state.model_id))
+        # cost[k] flags the k highest distinct scores
+        at_stored = cost[np.searchsorted(-sweep.thresholds, -stored, side="right")]
+        tm = sweep.metrics(best_t)
+
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("Recommended Threshold", f"{min(best_t, 1.0):.4f}")
+        k2.metric("Expected Cost",         f"₹{cost[best]:,.0f}")
+        k3.metric(f"Cost at {stored:.4g}",  f"₹{at_stored:,.0f}",
+                  delta=f"₹{at_stored - cost[best]:,.0f} saved", delta_color="off")
+        k4.metric("Alerts",                f"{tm['TP'] + tm['FP']:,}",
+                  delta=f"{tm['Recall']*100:.1f}% recall", delta_color="off")
+
+        idx = np.unique(np.linspace(0, len(cost) - 1, min(len(cost), 2000)).astype(int))
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=np.minimum(thresholds[idx], 1.0), y=cost[idx], mode="lines",
+                                 name="Expected cost", line=dict(color="#B8860B", width=2.5)))
+        fig.add_vline(x=min(best_t, 1.0), line=dict(color="#0D9E7E", dash="dot", width=1.5),
+                      annotation_text=f"Min cost {min(best_t, 1.0):.3f}",
+                      annotation_font_color="#0D9E7E")
+        fig.update_layout(title="Expected Cost vs Threshold",
+                          xaxis_title="Threshold", yaxis_title="Expected cost (₹)")
+        apply_theme(fig)
+        st.plotly_chart(fig, use_container_width=True)
+
+        if st.button("💾 Use as the model's decision threshold"):
+            update_meta(st.session_state.model_id, threshold=best_t,
+                        threshold_policy={"review_cost": review_cost, "basis": basis,
+                                          "fraud_loss": fraud_loss,
+                                          "expected_cost": float(cost[best])})
+            st.success(f"Model `{st.session_state.model_id}` now flags scores ≥ {best_t:.4f}.")
+
+    cost_threshold()